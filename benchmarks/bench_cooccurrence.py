@@ -0,0 +1,69 @@
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ugc_backend.core.cooccurrence import calculate_cooccurrence
+
+
+def build_index(post_count: int, tag_count: int, seed: int = 42):
+    """
+    synthetic hashtag index with zipf-like tag popularity
+    posts carry 1-8 tags, matching what we see on tiktok captions
+    """
+    rng = random.Random(seed)
+    tags = [f"tag{i}" for i in range(tag_count)]
+    weights = [1.0 / (rank + 1) for rank in range(tag_count)]
+
+    index = defaultdict(list)
+    for row in range(post_count):
+        for tag in set(rng.choices(tags, weights=weights, k=rng.randint(1, 8))):
+            index[tag].append(row)
+    return dict(index)
+
+
+def pairwise_cooccurrence(hashtag_index, min_shared: int):
+    cooccurrence = {}
+    hashtags = list(hashtag_index.keys())
+    for i, tag1 in enumerate(hashtags):
+        for tag2 in hashtags[i + 1:]:
+            posts1 = set(hashtag_index[tag1])
+            posts2 = set(hashtag_index[tag2])
+            shared = len(posts1 & posts2)
+            if shared >= min_shared:
+                cooccurrence[(tag1, tag2)] = shared
+    return cooccurrence
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="co-occurrence scaling benchmark")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--tags-per-post-ratio", type=float, default=0.02)
+    parser.add_argument("--pairwise-max-posts", type=int, default=10000)
+    parser.add_argument("--min-shared", type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{'posts':>10} {'tags':>8} {'pairs':>10} {'inverted_s':>12} {'pairwise_s':>12}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        tag_count = max(int(size * args.tags_per_post_ratio), 100)
+        index = build_index(size, tag_count)
+
+        result, inverted_s = timed(calculate_cooccurrence, index, args.min_shared)
+
+        pairwise = "skipped"
+        if size <= args.pairwise_max_posts:
+            expected, pairwise_s = timed(pairwise_cooccurrence, index, args.min_shared)
+            assert expected == result, "inverted index diverged from pairwise scan"
+            pairwise = f"{pairwise_s:.3f}"
+
+        print(f"{size:>10} {len(index):>8} {len(result):>10} {inverted_s:>12.3f} {pairwise:>12}")
@@ -0,0 +1,82 @@
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ugc_backend.core.models import ContentPost, CreatorProfile, Platform, ContentType, MarketRegion, CreatorTier
+from ugc_backend.db.models import Base
+from ugc_backend.db.repository import PostRepository
+from ugc_backend.db.session import Database
+
+
+def build_posts(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.now()
+    tags = [f"tag{i}" for i in range(500)]
+    posts = []
+    for i in range(count):
+        creator = CreatorProfile(
+            creator_id=f"creator_{rng.randrange(count // 5 + 1)}",
+            username=f"user_{i}",
+            platform=Platform.tiktok,
+            follower_count=rng.randint(1000, 500000),
+            avg_engagement_rate=0.0,
+            tier=CreatorTier.micro,
+            region=rng.choice(list(MarketRegion)),
+        )
+        posts.append(ContentPost(
+            post_id=f"post_{i}",
+            creator=creator,
+            platform=Platform.tiktok,
+            content_type=ContentType.video,
+            caption="benchmark",
+            hashtags=rng.sample(tags, rng.randint(1, 8)),
+            timestamp=now - timedelta(hours=rng.uniform(0, 336)),
+            views=rng.randint(100, 1000000),
+            likes=rng.randint(0, 50000),
+            comments=rng.randint(0, 5000),
+            shares=rng.randint(0, 5000),
+            saves=rng.randint(0, 5000),
+            first_seen=now,
+            last_captured=now,
+        ))
+    return posts
+
+
+def timed_save(database: Database, method: str, posts):
+    session = database.get_session()
+    try:
+        start = time.perf_counter()
+        result = getattr(PostRepository(session), method)(posts)
+        return result, time.perf_counter() - start
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="post ingest benchmark, bulk upsert vs per-row loop")
+    parser.add_argument("--sizes", default="500,5000,20000")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary sqlite file")
+    args = parser.parse_args()
+
+    print(f"{'posts':>8} {'path':>8} {'insert_s':>10} {'recapture_s':>12} {'inserted':>9} {'updated':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [int(s) for s in args.sizes.split(",")]:
+            posts = build_posts(size)
+            for path, method in (("per_row", "_save_posts_per_row"), ("bulk", "save_posts")):
+                database = Database(args.database_url or f"sqlite:///{tmp}/{path}_{size}.db")
+                Base.metadata.drop_all(bind=database.engine)
+                database.init_db()
+
+                inserted, insert_s = timed_save(database, method, posts)
+                updated, recapture_s = timed_save(database, method, posts)
+                print(
+                    f"{size:>8} {path:>8} {insert_s:>10.3f} {recapture_s:>12.3f}"
+                    f" {inserted['inserted']:>9} {updated['updated']:>8}"
+                )
+                database.engine.dispose()
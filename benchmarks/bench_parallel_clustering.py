@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.run_suite import git_commit, parse_scale
+from benchmarks.workload import Workload
+from ugc_backend.core.cluster import ClusteringEngine
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.utils.profiling import StageProfiler
+
+
+def run(frame: PostFrame, workers: int):
+    engine = ClusteringEngine(
+        min_hashtag_df=2,
+        max_hashtag_df=0.5,
+        merge_mode="lsh",
+        workers=workers,
+        parallel_min_clusters=0,
+    )
+    profiler = StageProfiler()
+    with profiler.activate():
+        with profiler.stage("cluster", len(frame)):
+            clusters = engine.cluster_frame(frame)
+    timings = {timing["stage"]: timing for timing in profiler.timings()}
+    signature = [(cluster.cluster_id, cluster.rows.tolist()) for cluster in clusters]
+    return timings, signature
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="ClusteringEngine scaling over lsh merge workers; checks every worker count "
+        "produces the single-process clusters and ids"
+    )
+    parser.add_argument("--posts", default="100k")
+    parser.add_argument("--workers", default="1,2,4,8,16")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None, help="defaults to benchmarks/results/parallel_<commit>.json")
+    args = parser.parse_args()
+
+    posts = parse_scale(args.posts)
+    frame = PostFrame.from_posts(Workload(posts, seed=args.seed).generate())
+
+    results = []
+    baseline = None
+    print(f"{'workers':>8} {'cluster_ms':>11} {'merge_ms':>10} {'speedup':>8} {'clusters':>9} {'identical':>10}")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        timings, signature = run(frame, workers)
+        if baseline is None:
+            baseline = (timings, signature)
+        wall_ms = timings["cluster"]["wall_ms"]
+        result = {
+            "workers": workers,
+            "cluster_ms": wall_ms,
+            "merge_ms": timings["cluster.merge"]["wall_ms"],
+            "speedup": round(baseline[0]["cluster"]["wall_ms"] / wall_ms, 3),
+            "clusters": len(signature),
+            "identical": signature == baseline[1],
+        }
+        results.append(result)
+        print(
+            f"{workers:>8} {result['cluster_ms']:>11.1f} {result['merge_ms']:>10.1f}"
+            f" {result['speedup']:>7.2f}x {result['clusters']:>9} {str(result['identical']):>10}"
+        )
+
+    commit = git_commit()
+    output = Path(args.output or Path(__file__).parent / "results" / f"parallel_{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "cpus": os.cpu_count(),
+        "posts": posts,
+        "seed": args.seed,
+        "results": results,
+    }, indent=2))
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select
+from ugc_backend.api.routes import _load_proof_tiles
+from ugc_backend.api.schemas import ProofTileResponse, ProofTilesResponse, TrendMetrics, SuggestedAction
+from ugc_backend.db.models import ProofTileModel
+from ugc_backend.db.repository import TILE_COLUMNS, upsert_rows
+from ugc_backend.db.session import AsyncDatabase, Database
+
+
+METRIC_NAMES = list(TrendMetrics.model_fields)
+
+
+def build_tile_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        tags = [f"tag{rng.randrange(500)}" for _ in range(5)]
+        rows.append(dict(
+            tile_id=f"tile_{i:08d}",
+            trend_id=f"trend_{i:08d}",
+            headline=f"emerging trend: {', '.join(tags[:3])} - {rng.randint(10, 300)} creators",
+            urgency=rng.choice(["high", "medium", "low"]),
+            recommendation="prepare: develop concepts",
+            status="validated",
+            metrics={name: rng.random() * 1000 for name in METRIC_NAMES},
+            suggested_action={"hashtags": tags, "formats": ["video"], "platforms": ["tiktok"]},
+            example_posts=[
+                {
+                    "post_id": f"post_{i}_{j}",
+                    "platform": "tiktok",
+                    "caption": "benchmark caption " * 8,
+                    "hashtags": tags,
+                    "engagement": rng.randint(0, 100000),
+                    "views": rng.randint(0, 1000000),
+                    "likes": rng.randint(0, 50000),
+                    "comments": rng.randint(0, 5000),
+                    "shares": rng.randint(0, 5000),
+                    "timestamp": (now - timedelta(hours=j)).isoformat(),
+                }
+                for j in range(5)
+            ],
+            creator_samples=[
+                {
+                    "creator_id": f"creator_{i}_{j}",
+                    "username": f"user_{i}_{j}",
+                    "platform": "tiktok",
+                    "follower_count": rng.randint(1000, 500000),
+                    "tier": "micro",
+                    "region": "us",
+                    "post_count": rng.randint(1, 10),
+                    "total_engagement": rng.randint(0, 100000),
+                }
+                for j in range(5)
+            ],
+        ))
+    return rows
+
+
+async def pydantic_path(session, limit: int) -> bytes:
+    """
+    the previous handler: orm rows -> nested pydantic models, then fastapi's
+    response_model validation, jsonable_encoder and json.dumps
+    """
+    db_tiles = (await session.scalars(
+        select(ProofTileModel).filter_by(status="validated").order_by(ProofTileModel.created_at.desc()).limit(limit)
+    )).all()
+    tiles = []
+    for db_tile in db_tiles:
+        metrics = db_tile.metrics or {}
+        action = db_tile.suggested_action or {}
+        tiles.append(ProofTileResponse(
+            tile_id=db_tile.tile_id,
+            headline=db_tile.headline,
+            urgency=db_tile.urgency,
+            recommendation=db_tile.recommendation,
+            metrics=TrendMetrics(**{name: metrics.get(name, 0.0) for name in METRIC_NAMES}),
+            suggested_action=SuggestedAction(**{name: action.get(name, []) for name in SuggestedAction.model_fields}),
+            example_posts=db_tile.example_posts or [],
+            creator_samples=db_tile.creator_samples or [],
+            status=db_tile.status,
+            created_at=db_tile.created_at,
+            updated_at=db_tile.updated_at,
+        ))
+    response = ProofTilesResponse.model_validate(ProofTilesResponse(tiles=tiles).model_dump())
+    return json.dumps(jsonable_encoder(response)).encode()
+
+
+async def orjson_path(session, limit: int) -> bytes:
+    return await _load_proof_tiles(session, "validated", None, "created_at", limit, None, TILE_COLUMNS)
+
+
+async def measure(database: AsyncDatabase, path, limit: int, repeat: int):
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        async with database.get_session() as session:
+            start = time.perf_counter()
+            body = await path(session, limit)
+            timings.append(time.perf_counter() - start)
+            size = len(body)
+    return statistics.median(timings), size
+
+
+async def run(sizes, repeat: int, tmp: str):
+    print(f"{'tiles':>8} {'path':>9} {'median_ms':>10} {'bytes':>11}")
+    for size in sizes:
+        url = f"sqlite:///{tmp}/tiles_{size}.db"
+        database = Database(url)
+        database.init_db()
+        session = database.get_session()
+        upsert_rows(session, ProofTileModel, build_tile_rows(size), "tile_id")
+        session.commit()
+        session.close()
+        database.engine.dispose()
+
+        async_database = AsyncDatabase(url)
+        results = {}
+        for name, path in (("pydantic", pydantic_path), ("orjson", orjson_path)):
+            await measure(async_database, path, size, 1)
+            median, body_size = await measure(async_database, path, size, repeat)
+            results[name] = median
+            print(f"{size:>8} {name:>9} {median * 1000:>10.1f} {body_size:>11}")
+        print(f"{size:>8} {'speedup':>9} {results['pydantic'] / results['orjson']:>10.2f}x")
+        await async_database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="GET /api/v1/tiles handler latency (db read + build + serialize, no http), "
+        "pydantic models vs orjson with spliced json columns"
+    )
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        asyncio.run(run([int(s) for s in args.sizes.split(",")], args.repeat, tmp))
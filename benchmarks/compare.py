@@ -0,0 +1,45 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+
+def load(path: str) -> Tuple[str, Dict[Tuple[int, str], Dict]]:
+    report = json.loads(Path(path).read_text())
+    return report.get("commit", path), {(result["scale"], result["benchmark"]): result for result in report["results"]}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="compare two run_suite.py result files, exits 1 when a benchmark slowed down past the threshold"
+    )
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed wall time increase, 0.10 = 10%%")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="ignore benchmarks faster than this in the baseline")
+    args = parser.parse_args()
+
+    base_commit, baseline = load(args.baseline)
+    new_commit, candidate = load(args.candidate)
+
+    regressions = 0
+    print(f"{'scale':>9} {'benchmark':<24} {base_commit:>12} {new_commit:>12} {'ratio':>7}")
+    for key in sorted(baseline.keys() & candidate.keys()):
+        before = baseline[key]["wall_ms"]
+        after = candidate[key]["wall_ms"]
+        ratio = after / before if before > 0 else float("inf")
+        flag = ""
+        if before >= args.min_ms and ratio > 1.0 + args.threshold:
+            flag = "  regression"
+            regressions += 1
+        print(f"{key[0]:>9} {key[1]:<24} {before:>12.1f} {after:>12.1f} {ratio:>6.2f}x{flag}")
+
+    for key in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{key[0]:>9} {key[1]:<24} only in {'baseline' if key in baseline else 'candidate'}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
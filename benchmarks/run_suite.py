@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from benchmarks.workload import Workload
+from ugc_backend.api.routes import _load_proof_tiles
+from ugc_backend.core.cluster import ClusteringEngine
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.proof_tile import ProofTileGenerator
+from ugc_backend.core.trend import TrendValidator
+from ugc_backend.core.window import WindowManager, WindowType
+from ugc_backend.db.models import Base
+from ugc_backend.db.repository import TILE_COLUMNS, DiscoveryWriter, PostRepository
+from ugc_backend.db.session import AsyncDatabase, Database
+from ugc_backend.utils.profiling import StageProfiler, StageRecord, _process_peak_rss_mb
+
+def parse_scale(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def tiles_api(profiler: StageProfiler, database_url: str, limits: List[int], repeat: int):
+    """
+    GET /api/v1/tiles handler work (db read + orjson body), median of repeat
+    runs per page size
+    """
+    database = AsyncDatabase(database_url)
+    try:
+        for limit in limits:
+            timings = []
+            body = b""
+            for _ in range(repeat + 1):
+                async with database.get_session() as session:
+                    wall = time.perf_counter()
+                    cpu = time.thread_time()
+                    body = await _load_proof_tiles(session, None, None, "created_at", limit, None, TILE_COLUMNS)
+                    timings.append((time.perf_counter() - wall, time.thread_time() - cpu))
+            # first run warms the connection and statement caches
+            timings = timings[1:]
+            record = StageRecord(f"tiles_api.limit_{limit}", body.count(b'"tile_id"'))
+            record.wall_ms = statistics.median(wall for wall, _ in timings) * 1000.0
+            record.cpu_ms = statistics.median(cpu for _, cpu in timings) * 1000.0
+            record.process_peak_rss_mb = _process_peak_rss_mb()
+            profiler.records.append(record)
+    finally:
+        await database.engine.dispose()
+
+
+def run_scale(scale: int, seed: int, database_url: str, chunk_size: int, repeat: int, clustering: Dict) -> List[Dict]:
+    """
+    one pass over the pipeline at a scale: ingest the workload, load the
+    saturation window, cluster, validate, generate and persist tiles, then
+    read tiles the way the api does
+    """
+    database = Database(database_url)
+    Base.metadata.drop_all(bind=database.engine)
+    database.init_db()
+
+    profiler = StageProfiler()
+    workload = Workload(scale, seed=seed)
+    with profiler.activate():
+        session = database.get_session()
+        try:
+            with profiler.stage("ingest") as record:
+                for chunk in workload.iter_chunks(chunk_size):
+                    PostRepository(session).save_posts(chunk)
+                    record.items += len(chunk)
+
+            with profiler.stage("window_load") as record:
+                window = WindowManager().create_window(WindowType.saturation)
+                frame = PostFrame.from_chunks(
+                    PostRepository(session).stream_posts_by_window(window.start, window.end)
+                )
+                record.items = len(frame)
+
+            with profiler.stage("cluster", len(frame)):
+                clusters = ClusteringEngine(**clustering).cluster_frame(frame)
+
+            with profiler.stage("validate", len(clusters)):
+                validator = TrendValidator()
+                now = datetime.now()
+                signals = [validator.validate_cluster(cluster, now) for cluster in clusters]
+
+            with profiler.stage("generate", len(signals)):
+                generator = ProofTileGenerator()
+                tiles = [generator.generate(signal) for signal in signals]
+
+            with profiler.stage("persist", len(tiles)):
+                writer = DiscoveryWriter(session)
+                for signal, tile in zip(signals, tiles):
+                    writer.add(signal.cluster, signal, tile)
+                writer.flush()
+        finally:
+            session.close()
+            database.engine.dispose()
+
+    asyncio.run(tiles_api(profiler, database_url, [50, 500], repeat))
+
+    results = []
+    for timing in profiler.timings():
+        seconds = timing["wall_ms"] / 1000.0
+        timing["items_per_sec"] = round(timing["items"] / seconds, 1) if seconds > 0 else None
+        results.append({"scale": scale, "benchmark": timing.pop("stage"), **timing})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="end-to-end benchmark suite over a seeded synthetic workload; "
+        "writes json results to compare across commits with benchmarks/compare.py"
+    )
+    parser.add_argument("--scales", default="10k,100k,1m", help="post counts, k / m suffixes allowed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10000, help="posts per ingest batch")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per tiles_api measurement")
+    parser.add_argument("--min-hashtag-df", type=float, default=2, help="values >= 1 are post counts")
+    parser.add_argument("--max-hashtag-df", type=float, default=0.5, help="values <= 1 are shares of the window")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary sqlite file per scale")
+    parser.add_argument("--output", default=None, help="defaults to benchmarks/results/<commit>.json")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    output = Path(args.output or Path(__file__).parent / "results" / f"{commit}.json")
+    scales = [parse_scale(scale) for scale in args.scales.split(",")]
+    clustering = dict(
+        min_hashtag_df=int(args.min_hashtag_df) if args.min_hashtag_df >= 1 else args.min_hashtag_df,
+        max_hashtag_df=int(args.max_hashtag_df) if args.max_hashtag_df > 1 else args.max_hashtag_df,
+    )
+
+    results = []
+    print(f"{'scale':>9} {'benchmark':<24} {'wall_ms':>11} {'cpu_ms':>11} {'items':>9} {'items/s':>12} {'peak_rss':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            database_url = args.database_url or f"sqlite:///{tmp}/bench_{scale}.db"
+            for result in run_scale(scale, args.seed, database_url, args.chunk_size, args.repeat, clustering):
+                results.append(result)
+                print(
+                    f"{scale:>9} {result['benchmark']:<24} {result['wall_ms']:>11.1f} {result['cpu_ms']:>11.1f}"
+                    f" {result['items']:>9} {result['items_per_sec'] or 0:>12.1f} {result['process_peak_rss_mb']:>8.1f}"
+                )
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "seed": args.seed,
+        "clustering": clustering,
+        "scales": scales,
+        "results": results,
+    }
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
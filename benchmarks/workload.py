@@ -0,0 +1,151 @@
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, List, Optional
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ugc_backend.core.models import ContentPost, ContentType, CreatorProfile, MarketRegion, Platform
+
+REGIONS = list(MarketRegion)
+REGION_WEIGHTS = [0.30, 0.12, 0.25, 0.10, 0.08, 0.15]
+PLATFORMS = list(Platform)
+PLATFORM_WEIGHTS = [0.45, 0.20, 0.10, 0.10, 0.15]
+CONTENT_TYPES = list(ContentType)
+CONTENT_TYPE_WEIGHTS = [0.55, 0.20, 0.05, 0.20]
+GENERIC_TAGS = ["fyp", "foryou", "viral", "trending", "explore"]
+
+
+def _zipf_weights(count: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+@dataclass
+class Workload:
+    """
+    seeded synthetic ugc posts shaped like what the adapters bring in:
+    - hashtag popularity is zipfian (rank ** -hashtag_exponent)
+    - posts mostly belong to a topic, a handful of co-posted core tags with
+      zipfian topic popularity, so clustering finds real groups; the rest
+      of a caption's tags come from the global zipf distribution
+    - creator activity is power law (pareto weights), follower counts are
+      log-normal so every CreatorProfile.determine_tier tier shows up
+    - generic_share of posts carry platform-generic tags (#fyp, #viral ..)
+      and typo_share carry a one-off misspelling of one of their tags
+    - creators have a home platform and region, posts spread over the
+      last window_hours (inside the 336h saturation window)
+    the same seed and sizes give the same posts, ids and counters; only
+    the timestamps move with now
+    """
+
+    posts: int
+    seed: int = 42
+    hashtags: Optional[int] = None
+    creators: Optional[int] = None
+    topics: Optional[int] = None
+    hashtag_exponent: float = 1.1
+    creator_alpha: float = 1.5
+    topic_share: float = 0.7
+    generic_share: float = 0.5
+    typo_share: float = 0.05
+    window_hours: float = 330.0
+
+    def __post_init__(self):
+        if self.hashtags is None:
+            self.hashtags = max(self.posts // 20, 500)
+        if self.creators is None:
+            self.creators = max(self.posts // 10, 100)
+        if self.topics is None:
+            self.topics = max(self.posts // 400, 20)
+
+    def iter_chunks(self, chunk_size: int = 10000, now: Optional[datetime] = None) -> Iterator[List[ContentPost]]:
+        """
+        posts in chunks, so 1m posts never need to be alive at once
+        """
+        now = now or datetime.now()
+        rng = np.random.default_rng(self.seed)
+
+        tag_weights = _zipf_weights(self.hashtags, self.hashtag_exponent)
+        topic_tags = [
+            rng.choice(self.hashtags, size=rng.integers(3, 6), replace=False, p=tag_weights)
+            for _ in range(self.topics)
+        ]
+        topic_weights = _zipf_weights(self.topics, 1.0)
+
+        activity = rng.pareto(self.creator_alpha, self.creators) + 1.0
+        activity /= activity.sum()
+        followers = np.clip(rng.lognormal(np.log(20000), 1.8, self.creators), 100, 50_000_000).astype(np.int64)
+        creator_regions = rng.choice(len(REGIONS), size=self.creators, p=REGION_WEIGHTS)
+        creator_platforms = rng.choice(len(PLATFORMS), size=self.creators, p=PLATFORM_WEIGHTS)
+        engagement_rates = np.clip(rng.beta(2, 30, self.creators), 0.0, 1.0)
+        creators: List[Optional[CreatorProfile]] = [None] * self.creators
+
+        for start in range(0, self.posts, chunk_size):
+            size = min(chunk_size, self.posts - start)
+            creator_rows = rng.choice(self.creators, size=size, p=activity)
+            in_topic = rng.random(size) < self.topic_share
+            topic_rows = rng.choice(self.topics, size=size, p=topic_weights)
+            core_counts = rng.integers(2, 4, size)
+            extra_counts = rng.integers(0, 4, size)
+            extra_tags = rng.choice(self.hashtags, size=(size, 3), p=tag_weights)
+            content_types = rng.choice(len(CONTENT_TYPES), size=size, p=CONTENT_TYPE_WEIGHTS)
+            hours_ago = rng.uniform(0, self.window_hours, size)
+            reach = rng.lognormal(-0.5, 1.0, size)
+            counter_shares = rng.beta(2, 20, (size, 4))
+            generic = rng.random(size) < self.generic_share
+            generic_tags = rng.choice(len(GENERIC_TAGS), size=(size, 2))
+            typo = rng.random(size) < self.typo_share
+
+            chunk = []
+            for i in range(size):
+                row = int(creator_rows[i])
+                creator = creators[row]
+                if creator is None:
+                    creator = creators[row] = CreatorProfile.model_construct(
+                        creator_id=f"creator_{row}",
+                        username=f"user_{row}",
+                        platform=PLATFORMS[creator_platforms[row]],
+                        follower_count=int(followers[row]),
+                        avg_engagement_rate=float(engagement_rates[row]),
+                        follower_growth_rate=0.0,
+                        tier=CreatorProfile.determine_tier(int(followers[row])),
+                        region=REGIONS[creator_regions[row]],
+                    )
+
+                tags = []
+                if in_topic[i]:
+                    tags.extend(topic_tags[topic_rows[i]][:core_counts[i]])
+                tags.extend(extra_tags[i][:extra_counts[i]])
+                hashtags = list(dict.fromkeys(f"tag{tag}" for tag in tags))
+                if typo[i] and hashtags:
+                    hashtags.append(f"{hashtags[-1]}_{start + i}")
+                if generic[i]:
+                    hashtags.extend(dict.fromkeys(GENERIC_TAGS[tag] for tag in generic_tags[i]))
+
+                views = int(creator.follower_count * reach[i]) + 1
+                likes, comments, shares, saves = (int(views * share) for share in counter_shares[i] * (1.0, 0.1, 0.1, 0.1))
+                timestamp = now - timedelta(hours=float(hours_ago[i]))
+                chunk.append(ContentPost.model_construct(
+                    post_id=f"post_{start + i:08d}",
+                    creator=creator,
+                    platform=creator.platform,
+                    content_type=CONTENT_TYPES[content_types[i]],
+                    caption=" ".join(f"#{tag}" for tag in hashtags),
+                    hashtags=hashtags,
+                    timestamp=timestamp,
+                    views=views,
+                    likes=likes,
+                    comments=comments,
+                    shares=shares,
+                    saves=saves,
+                    first_seen=timestamp,
+                    last_captured=now,
+                    capture_count=1,
+                ))
+            yield chunk
+
+    def generate(self, now: Optional[datetime] = None) -> List[ContentPost]:
+        return [post for chunk in self.iter_chunks(now=now) for post in chunk]
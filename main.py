@@ -1,10 +1,27 @@
 import os
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from ugc_backend.api.routes import router
-from ugc_backend.api.dependencies import init_db
+from ugc_backend.api.dependencies import (
+    init_db,
+    init_live_clustering,
+    init_job_queue,
+    init_tile_cache,
+    init_recapture,
+    shutdown_job_queue,
+    shutdown_recapture,
+    close_tile_cache,
+    close_db,
+)
 from ugc_backend.config import get_settings
+from ugc_backend.core.hashtag_filter import DEFAULT_STOPLIST
+from ugc_backend.core.window import WindowManager
+from ugc_backend.core.vocab import load_vocabularies, save_vocabularies
+from ugc_backend.ingestion.manager import create_ingestion_manager
+from ugc_backend.ingestion.recapture import recapture_budgets
 from ugc_backend.utils.logging import setup_logging
+from ugc_backend.utils.metrics import MetricsMiddleware
 
 settings = get_settings()
 
@@ -17,6 +34,7 @@ app = FastAPI(
     title="ugc intelligence backend",
     description="transparent social media trend detection system",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 if settings.cors_enabled:
@@ -28,6 +46,7 @@ if settings.cors_enabled:
         allow_headers=["*"],
     )
 
+app.add_middleware(MetricsMiddleware)
 app.include_router(router)
 
 init_db(settings.database_url)
@@ -36,11 +55,62 @@ init_db(settings.database_url)
 @app.on_event("startup")
 async def startup():
     logger.info("starting ugc intelligence backend", version="1.0.0")
+    if load_vocabularies(settings.vocabulary_path):
+        logger.info("loaded vocabularies", path=settings.vocabulary_path)
+    window_hours = dict(
+        early_detection_hours=settings.early_detection_hours,
+        validation_hours=settings.validation_hours,
+        saturation_hours=settings.saturation_hours,
+    )
+    clustering = dict(
+        min_shared_hashtags=settings.min_shared_hashtags,
+        min_posts_per_cluster=settings.min_posts_per_cluster,
+        hashtag_similarity=settings.hashtag_similarity,
+        creator_diversity_weight=settings.creator_diversity_weight,
+        engagement_strength_weight=settings.engagement_strength_weight,
+        velocity_weight=settings.velocity_weight,
+    )
+    if settings.cache_enabled:
+        init_tile_cache(
+            ttl=settings.cache_ttl,
+            max_entries=settings.cache_max_entries,
+            redis_url=settings.redis_url if settings.cache_backend == "redis" else None,
+        )
+    if settings.incremental_clustering:
+        live_state = init_live_clustering(WindowManager(**window_hours), **clustering)
+        logger.info("incremental clustering enabled", posts=len(live_state))
+    # batch-only ClusteringEngine options, the incremental clusterer has no equivalent
+    batch_clustering = dict(
+        min_hashtag_df=settings.min_hashtag_df,
+        max_hashtag_df=settings.max_hashtag_df,
+        hashtag_stoplist=sorted(DEFAULT_STOPLIST | set(settings.hashtag_stoplist_extra)),
+        workers=settings.clustering_workers,
+    )
+    init_job_queue(
+        settings.database_url,
+        max_workers=settings.discovery_workers,
+        profile_dir=settings.discovery_profile_dir,
+        window_hours=window_hours,
+        clustering={**clustering, **batch_clustering},
+    )
+    if settings.recapture_enabled:
+        scheduler = init_recapture(
+            create_ingestion_manager(settings),
+            recapture_budgets(settings),
+            settings.recapture_interval_minutes,
+        )
+        logger.info("recapture scheduler started", tracked=len(scheduler))
 
 
 @app.on_event("shutdown")
 async def shutdown():
     logger.info("shutting down ugc intelligence backend")
+    await shutdown_recapture()
+    shutdown_job_queue()
+    await close_tile_cache()
+    await close_db()
+    if save_vocabularies(settings.vocabulary_path):
+        logger.info("saved vocabularies", path=settings.vocabulary_path)
 
 
 if __name__ == "__main__":
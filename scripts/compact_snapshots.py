@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ugc_backend.config import get_settings
+from ugc_backend.db.repository import SnapshotRepository
+from ugc_backend.db.session import Database
+
+if __name__ == "__main__":
+    # run daily, e.g. from cron
+    settings = get_settings()
+    db = Database(settings.database_url)
+
+    session = db.get_session()
+    try:
+        counts = SnapshotRepository(session).compact()
+    finally:
+        session.close()
+    print(f"snapshots expired: {counts['expired']}, downsampled: {counts['downsampled']}")
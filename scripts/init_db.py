@@ -4,6 +4,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from ugc_backend.config import get_settings
+from ugc_backend.db.repository import PostRepository
 from ugc_backend.db.session import Database
 
 if __name__ == "__main__":
@@ -11,3 +12,10 @@ if __name__ == "__main__":
     db = Database(settings.database_url)
     db.init_db()
     print("database initialized successfully")
+
+    session = db.get_session()
+    try:
+        scanned = PostRepository(session).backfill_post_hashtags()
+    finally:
+        session.close()
+    print(f"post_hashtags backfilled for {scanned} posts")
@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+
+REGIONS = ["us", "uk", "china", "japan", "korea"]
+
+
+def make_batch(rng: random.Random, start_id: int, size: int, tags: int):
+    now = datetime.now()
+    return {
+        "posts": [
+            {
+                "post_id": f"load_{start_id + i}",
+                "platform": "tiktok",
+                "creator_id": f"creator_{rng.randrange(size * 50)}",
+                "creator_username": "load",
+                "creator_follower_count": rng.randint(1000, 500000),
+                "creator_region": rng.choice(REGIONS),
+                "content_type": "video",
+                "caption": "load test",
+                "hashtags": [f"tag{rng.randrange(tags)}" for _ in range(rng.randint(1, 6))],
+                "timestamp": (now - timedelta(hours=rng.uniform(0, 40))).isoformat(),
+                "views": rng.randint(100, 100000),
+                "likes": rng.randint(0, 5000),
+                "comments": rng.randint(0, 500),
+                "shares": rng.randint(0, 500),
+                "saves": rng.randint(0, 500),
+            }
+            for i in range(size)
+        ]
+    }
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+async def ingest_latencies(client, rng, next_id, args):
+    latencies = []
+    for _ in range(args.requests):
+        payload = make_batch(rng, next_id[0], args.batch_size, args.tags)
+        next_id[0] += args.batch_size
+        start = time.perf_counter()
+        response = await client.post("/api/v1/posts/ingest", json=payload)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        response.raise_for_status()
+        await asyncio.sleep(args.interval)
+    return latencies
+
+
+async def discovery_loop(client, stop: asyncio.Event, runs: list, min_confidence: float):
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": min_confidence}
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.post("/api/v1/discovery/run", json=request)
+        response.raise_for_status()
+        job = response.json()
+        while job["status"] not in ("completed", "failed"):
+            await asyncio.sleep(0.25)
+            job = (await client.get(f"/api/v1/discovery/jobs/{job['job_id']}")).json()
+        if job["status"] == "failed":
+            raise RuntimeError(f"discovery job failed: {job['error']}")
+        runs.append(time.perf_counter() - start)
+
+
+def report(label: str, latencies):
+    print(
+        f"{label:>18} n={len(latencies):<5} p50={statistics.median(latencies):8.1f}ms"
+        f" p95={percentile(latencies, 0.95):8.1f}ms p99={percentile(latencies, 0.99):8.1f}ms"
+    )
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    next_id = [0]
+    async with httpx.AsyncClient(base_url=args.url, timeout=600.0) as client:
+        for _ in range(args.seed_posts // args.seed_batch_size):
+            payload = make_batch(rng, next_id[0], args.seed_batch_size, args.tags)
+            next_id[0] += args.seed_batch_size
+            (await client.post("/api/v1/posts/ingest", json=payload)).raise_for_status()
+
+        report("ingest idle", await ingest_latencies(client, rng, next_id, args))
+
+        stop = asyncio.Event()
+        runs = []
+        discoveries = [
+            asyncio.create_task(discovery_loop(client, stop, runs, args.min_confidence))
+            for _ in range(args.discovery_concurrency)
+        ]
+        report("ingest+discovery", await ingest_latencies(client, rng, next_id, args))
+        stop.set()
+        await asyncio.gather(*discoveries)
+        print(f"{'discovery runs':>18} n={len(runs):<5} mean={statistics.mean(runs):8.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ingest latency with and without a concurrent discovery run")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--seed-posts", type=int, default=20000)
+    parser.add_argument("--seed-batch-size", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--tags", type=int, default=300)
+    parser.add_argument("--discovery-concurrency", type=int, default=1)
+    parser.add_argument("--min-confidence", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
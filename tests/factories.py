@@ -0,0 +1,57 @@
+import random
+from datetime import datetime, timedelta
+from typing import List
+from ugc_backend.core.models import ContentPost, CreatorProfile, Platform, ContentType, MarketRegion, CreatorTier
+
+
+def make_post(post_id: str, creator_id: str, hashtags, hours_ago: float = 2.0) -> ContentPost:
+    creator = CreatorProfile(
+        creator_id=creator_id,
+        username=f"user_{creator_id}",
+        platform=Platform.tiktok,
+        follower_count=10000,
+        avg_engagement_rate=0.05,
+        tier=CreatorTier.micro,
+        region=MarketRegion.us,
+    )
+    return ContentPost(
+        post_id=post_id,
+        creator=creator,
+        platform=Platform.tiktok,
+        content_type=ContentType.video,
+        caption="test",
+        hashtags=hashtags,
+        timestamp=datetime.now() - timedelta(hours=hours_ago),
+        views=1000,
+        likes=50,
+        comments=5,
+        shares=10,
+        saves=5,
+        first_seen=datetime.now() - timedelta(hours=hours_ago),
+        last_captured=datetime.now(),
+    )
+
+
+def make_random_posts(seed: int, count: int = 200, vocabulary: int = 40) -> List[ContentPost]:
+    """
+    seeded posts drawing up to 6 of vocabulary tags, about 4 posts per
+    creator, random counters (some posts with no views) and ages within
+    the last day
+    """
+    rng = random.Random(seed)
+    tags = [f"tag{i}" for i in range(vocabulary)]
+    posts = []
+    for i in range(count):
+        post = make_post(
+            f"post_{i}",
+            f"creator_{rng.randrange(max(count // 4, 1))}",
+            rng.sample(tags, rng.randint(0, 6)),
+            hours_ago=rng.uniform(1.0, 20.0),
+        )
+        post.views = rng.choice([0, rng.randint(1, 1_000_000)])
+        post.likes = rng.randint(0, 50_000)
+        post.comments = rng.randint(0, 5_000)
+        post.shares = rng.randint(0, 5_000)
+        post.saves = rng.randint(0, 5_000)
+        posts.append(post)
+    return posts
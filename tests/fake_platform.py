@@ -0,0 +1,87 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+class FakePlatformServer:
+    """
+    local http server answering tiktok-shaped hashtag/user/post endpoints
+    after an injected delay; records (path, params, arrival time) per request
+    """
+
+    def __init__(self, latency: float = 0.1, keyword_latency: Optional[Dict[str, float]] = None, posts_per_page: int = 3):
+        self.latency = latency
+        self.keyword_latency = keyword_latency or {}
+        self.posts_per_page = posts_per_page
+        self.requests: List[Tuple[str, Dict[str, str], float]] = []
+        self.peers = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakePlatformServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def items(self, path: str, params: Dict[str, str]) -> List[dict]:
+        if path.startswith("/post/"):
+            return [self.item(path.rsplit("/", 1)[-1], "recapture")]
+        key = params.get("hashtag") or path.strip("/").split("/")[1]
+        return [self.item(f"{key}_{i}", key) for i in range(self.posts_per_page)]
+
+    @staticmethod
+    def item(post_id: str, hashtag: str) -> dict:
+        return {
+            "id": post_id,
+            "description": f"fake post #{hashtag} #fyp",
+            "create_time": 1767225600,
+            "author": {"id": f"creator_{post_id}", "username": f"user_{post_id}", "follower_count": 5000},
+            "statistics": {"play_count": 1000, "digg_count": 100, "comment_count": 10, "share_count": 5, "collect_count": 2},
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                with server._lock:
+                    server.requests.append((parsed.path, params, time.monotonic()))
+                    server.peers.add(self.client_address)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                time.sleep(server.keyword_latency.get(params.get("hashtag"), server.latency))
+                with server._lock:
+                    server.in_flight -= 1
+
+                items = server.items(parsed.path, params)
+                data = items[0] if parsed.path.startswith("/post/") else items
+                body = json.dumps({"data": data}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
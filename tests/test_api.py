@@ -0,0 +1,369 @@
+import asyncio
+import pstats
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from ugc_backend.api import dependencies
+from ugc_backend.api.cache import ResponseCache
+from ugc_backend.api.routes import router
+from ugc_backend.api.schemas import ProofTileResponse
+from ugc_backend.core.models import Platform
+from ugc_backend.core.window import WindowManager, WindowType
+from ugc_backend.db.async_repository import AsyncPostRepository
+from ugc_backend.discovery import jobs
+from ugc_backend.db.models import ProofTileModel
+from ugc_backend.db.repository import PostRepository, SnapshotRepository
+from ugc_backend.utils.metrics import REGISTRY, MetricsMiddleware
+from ugc_backend.utils.profiling import StageProfiler, profile_stage
+from tests.factories import make_post
+from tests.test_ingestion import FakeRecaptureManager
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    database_url = f"sqlite:///{tmp_path / 'api.db'}"
+    monkeypatch.setattr(dependencies, "_live_state", None)
+    monkeypatch.setattr(dependencies, "_tile_cache", None)
+    dependencies.init_db(database_url)
+    dependencies.init_job_queue(database_url, max_workers=1)
+    app = FastAPI()
+    app.include_router(router)
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        dependencies.shutdown_job_queue()
+
+
+def wait_for_job(client, job_id: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/v1/discovery/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def ingest_payload(count: int = 30):
+    regions = ["us", "uk", "japan"]
+    return {
+        "posts": [
+            {
+                "post_id": f"post_{i}",
+                "platform": "tiktok",
+                "creator_id": f"creator_{i}",
+                "creator_username": f"user_{i}",
+                "creator_follower_count": 20000,
+                "creator_region": regions[i % 3],
+                "content_type": "video",
+                "caption": "test",
+                "hashtags": ["glowup", "skincare", f"extra{i % 2}"],
+                "timestamp": (datetime.now() - timedelta(hours=5)).isoformat(),
+                "views": 10000,
+                "likes": 800,
+                "comments": 40,
+                "shares": 60,
+                "saves": 30,
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def test_ingest_discover_and_read_tiles(client):
+    response = client.post("/api/v1/posts/ingest", json=ingest_payload())
+    assert response.json() == {"ingested": 30, "updated": 0, "total_posts": 30}
+    response = client.post("/api/v1/posts/ingest", json=ingest_payload(5))
+    assert response.json() == {"ingested": 0, "updated": 5, "total_posts": 5}
+
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    response = client.post("/api/v1/discovery/run", json=request)
+    assert response.status_code == 202
+    job = response.json()
+    coalesced = client.post("/api/v1/discovery/run", json=request).json()
+    assert coalesced["job_id"] == job["job_id"]
+    # runs are not platform scoped, so other platforms share the job too
+    other_platforms = {**request, "platforms": ["xiaohongshu", "tiktok"]}
+    assert client.post("/api/v1/discovery/run", json=other_platforms).json()["job_id"] == job["job_id"]
+    assert "platforms" not in job
+
+    first = wait_for_job(client, job["job_id"])
+    assert first["status"] == "completed", first["error"]
+    assert [stage["status"] for stage in first["stages"]] == ["completed"] * 5
+    assert first["stages"][0]["items"] == 30
+    assert first["result"]["trends_validated"] >= 1
+    assert first["result"]["hashtag_filter"]["hashtags"] == 4
+
+    rerun = client.post("/api/v1/discovery/run", json=request).json()
+    assert rerun["job_id"] != job["job_id"]
+    rerun = wait_for_job(client, rerun["job_id"])
+    assert rerun["result"]["tile_ids"] == first["result"]["tile_ids"]
+    assert client.get("/api/v1/discovery/jobs/missing").status_code == 404
+
+    tiles = client.get("/api/v1/tiles", params={"status": "validated"}).json()["tiles"]
+    widest = max(tiles, key=lambda tile: tile["metrics"]["creator_replication"])
+    trend_id = widest["tile_id"][len("tile_"):]
+    detail = client.get(f"/api/v1/trends/{trend_id}").json()
+    assert detail["post_count"] == 30
+
+    health = client.get("/api/v1/health").json()
+    assert health["metrics"]["total_posts"] == 30
+
+
+def test_live_state_jobs_run_in_process(client):
+    client.post("/api/v1/posts/ingest", json=ingest_payload())
+    dependencies.shutdown_job_queue()
+    live_state = dependencies.init_live_clustering(WindowManager(), seed_chunk_size=7)
+    assert len(live_state) == 30
+    queue = dependencies.init_job_queue("unused://", max_workers=1)
+    assert queue.live_state is live_state
+
+    # clients send aware iso timestamps, the live windows compare naive ones
+    aware = ingest_payload(3)
+    for i, post in enumerate(aware["posts"]):
+        post["post_id"] = f"aware_{i}"
+        post["timestamp"] = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat().replace("+00:00", "Z")
+    response = client.post("/api/v1/posts/ingest", json=aware)
+    assert response.status_code == 200, response.text
+    assert len(live_state) == 33
+
+    live = live_state.clusters(WindowType.early_detection)
+    live_ids = [cluster.cluster_id for cluster in live]
+    live_health = [cluster.calculate_health() for cluster in live]
+
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    job = wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+    assert job["status"] == "completed", job["error"]
+    assert job["result"]["clusters_found"] == len(live_state.clusters(WindowType.early_detection))
+
+    # the run re-keys and rescores copies, the shared live clusters keep theirs
+    assert [cluster.cluster_id for cluster in live] == live_ids
+    assert [cluster.calculate_health() for cluster in live] == live_health
+
+
+def test_live_jobs_use_the_queue_settings(client, monkeypatch):
+    client.post("/api/v1/posts/ingest", json=ingest_payload())
+    dependencies.shutdown_job_queue()
+    dependencies.init_live_clustering(WindowManager())
+    weights = {"creator_diversity_weight": 1.0, "engagement_strength_weight": 0.0, "velocity_weight": 0.0}
+    dependencies.init_job_queue("unused://", max_workers=1, window_hours={"early_detection_hours": 12}, clustering=weights)
+
+    built = []
+
+    class RecordingPipeline(jobs.DiscoveryPipeline):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            built.append(self)
+
+    monkeypatch.setattr(jobs, "DiscoveryPipeline", RecordingPipeline)
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    job = wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+    assert job["status"] == "completed", job["error"]
+    assert built[0].clustering_engine.creator_diversity_weight == 1.0
+    assert built[0].clustering_engine.velocity_weight == 0.0
+    assert built[0].window_manager.early_detection_hours == 12
+
+
+def test_discovery_reports_stage_timings_and_profiles_on_request(client, tmp_path):
+    client.post("/api/v1/posts/ingest", json=ingest_payload())
+    dependencies.shutdown_job_queue()
+    dependencies.init_job_queue(f"sqlite:///{tmp_path / 'api.db'}", max_workers=1, profile_dir=str(tmp_path / "profiles"))
+
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    job = wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+    assert job["status"] == "completed", job["error"]
+    timings = {timing["stage"]: timing for timing in job["result"]["timings"]}
+    for stage in ("load", "load.query", "load.hashtag_counts", "load.deltas", "load.frame", "cluster", "cluster.index", "cluster.merge", "validate", "generate", "persist"):
+        assert timings[stage]["wall_ms"] >= 0.0
+    assert timings["load"]["items"] == 30
+    assert timings["load.query"]["items"] == 30
+    assert timings["cluster"]["wall_ms"] >= timings["cluster.index"]["wall_ms"]
+    assert timings["load"]["process_peak_rss_mb"] > 0
+    assert "rss_growth_mb" in timings["load"]
+    assert timings["load"]["peak_alloc_mb"] is None
+    assert job["result"]["profile_path"] is None
+
+    profiled = client.post("/api/v1/discovery/run", params={"profile": 1}, json=request).json()
+    profiled = wait_for_job(client, profiled["job_id"])
+    assert profiled["status"] == "completed", profiled["error"]
+    assert profiled["result"]["profile_path"].endswith(f"discovery_{profiled['job_id']}.prof")
+    profiled_timings = {timing["stage"]: timing for timing in profiled["result"]["timings"]}
+    assert profiled_timings["cluster"]["peak_alloc_mb"] >= profiled_timings["cluster.index"]["peak_alloc_mb"] > 0
+    stats = pstats.Stats(profiled["result"]["profile_path"])
+    assert any(function == "cluster_frame" for _, _, function in stats.stats)
+
+
+def test_stage_rss_growth_is_per_stage_not_the_process_peak():
+    profiler = StageProfiler()
+    with profiler.activate():
+        with profile_stage("allocate"):
+            block = bytearray(64 * 1024 * 1024)
+        del block
+        with profile_stage("idle"):
+            pass
+    timings = {timing["stage"]: timing for timing in profiler.timings()}
+    if timings["allocate"]["rss_growth_mb"] is None:
+        pytest.skip("no /proc/self/statm")
+    assert timings["allocate"]["rss_growth_mb"] > 32
+    assert abs(timings["idle"]["rss_growth_mb"]) < 8
+    assert timings["idle"]["process_peak_rss_mb"] >= timings["allocate"]["process_peak_rss_mb"]
+
+
+def test_recapture_cycle_saves_snapshots_and_boosts_live_clusters(tmp_path, monkeypatch):
+    monkeypatch.setattr(dependencies, "_live_state", None)
+    dependencies.init_db(f"sqlite:///{tmp_path / 'recapture.db'}")
+    posts = [make_post(f"p{i}", f"c{i}", ["glowup", "skincare"], hours_ago=3) for i in range(4)]
+    posts.append(make_post("lone", "c9", ["solo"], hours_ago=3))
+    for post in posts:
+        post.last_captured = datetime.now() - timedelta(hours=2)
+    session = dependencies._db_instance.SessionLocal()
+    PostRepository(session).save_posts(posts)
+    dependencies.init_live_clustering(WindowManager())
+
+    async def run():
+        manager = FakeRecaptureManager({"p0": 100, "lone": 50})
+        scheduler = dependencies.init_recapture(manager, {Platform.tiktok: 4}, interval_minutes=60)
+        assert len(scheduler) == 5
+        try:
+            counts = await dependencies.run_recapture_cycle()
+        finally:
+            await dependencies.shutdown_recapture()
+            await dependencies.close_db()
+        clustered = {post_id for post_id, entry in scheduler.entries.items() if entry.clustered}
+        return counts, clustered, manager.requests
+
+    counts, clustered, requests = asyncio.run(run())
+    assert counts == {"recaptured": 1, "inserted": 0, "updated": 1}
+    assert clustered == {"p0", "p1", "p2", "p3"}
+    # the clustered posts outrank the lone one at equal velocity
+    assert sorted(requests[0][1]) == ["p0", "p1", "p2", "p3"]
+    snapshots = SnapshotRepository(session).get_snapshots("p0")
+    assert [snapshot.likes for snapshot in snapshots] == [50, 150]
+    session.close()
+
+
+def test_metrics_endpoint_and_health_reads_cached_counters(client, monkeypatch):
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(router)
+    client = TestClient(app)
+    client.post("/api/v1/posts/ingest", json=ingest_payload())
+    assert client.get("/api/v1/health").json()["metrics"]["total_posts"] == 30
+
+    async def no_scans(self):
+        raise AssertionError("health scanned the posts table")
+
+    monkeypatch.setattr(AsyncPostRepository, "count_posts", no_scans)
+    more = ingest_payload(35)
+    more["posts"] = more["posts"][30:]
+    client.post("/api/v1/posts/ingest", json=more)
+    assert client.get("/api/v1/health").json()["metrics"]["total_posts"] == 35
+
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    job = wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+    monkeypatch.undo()
+    health = client.get("/api/v1/health").json()["metrics"]
+    assert health["total_posts"] == 35
+    assert health["active_clusters"] == job["result"]["clusters_found"] > 0
+
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'ugc_stored_posts 35.0' in response.text
+    sample = REGISTRY.get_sample_value
+    assert sample(
+        "ugc_http_request_duration_seconds_count",
+        {"method": "POST", "route": "/api/v1/posts/ingest", "status": "200"},
+    ) >= 2
+    assert sample(
+        "ugc_http_request_duration_seconds_count",
+        {"method": "GET", "route": "/api/v1/discovery/jobs/{job_id}", "status": "200"},
+    ) >= 1
+    assert sample("ugc_ingest_batch_size_sum") >= 35
+    assert sample("ugc_discovery_stage_duration_seconds_count", {"stage": "cluster"}) >= 1
+
+
+def test_tiles_are_cached_with_etag_until_discovery_writes(client):
+    cache = dependencies.init_tile_cache(ttl=60)
+    client.post("/api/v1/posts/ingest", json=ingest_payload())
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+
+    first = client.get("/api/v1/tiles", params={"status": "validated"})
+    etag = first.headers["etag"]
+    assert first.json()["tiles"]
+    assert len(cache) == 1
+
+    not_modified = client.get("/api/v1/tiles", params={"status": "validated"}, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    session = next(dependencies.get_db())
+    session.query(ProofTileModel).update({"headline": "edited"})
+    session.commit()
+    session.close()
+    cached = client.get("/api/v1/tiles", params={"status": "validated"})
+    assert cached.headers["etag"] == etag
+    assert cached.content == first.content
+
+    wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+    assert len(cache) == 0
+    fresh = client.get("/api/v1/tiles", params={"status": "validated"}, headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+
+
+def test_response_cache_expires_and_evicts_least_recent():
+    now = [0.0]
+    cache = ResponseCache(ttl=10, max_entries=2, clock=lambda: now[0])
+
+    async def scenario():
+        await cache.set("a", b"1")
+        await cache.set("b", b"2")
+        assert (await cache.get("a")).body == b"1"
+        await cache.set("c", b"3")
+        assert await cache.get("b") is None
+        now[0] = 11.0
+        assert await cache.get("a") is None
+        stale = await cache.set("d", b"4", generation=cache.generation - 1)
+        assert stale.body == b"4" and await cache.get("d") is None
+
+    asyncio.run(scenario())
+
+
+def test_tiles_paginate_sort_and_project(client):
+    client.post("/api/v1/posts/ingest", json=ingest_payload())
+    request = {"window_type": "early_detection", "platforms": ["tiktok"], "min_confidence": 0.0}
+    wait_for_job(client, client.post("/api/v1/discovery/run", json=request).json()["job_id"])
+    everything = client.get("/api/v1/tiles", params={"limit": 500}).json()
+    assert everything["next_cursor"] is None
+    assert len(everything["tiles"]) >= 3
+    for tile in everything["tiles"]:
+        assert ProofTileResponse.model_validate(tile).model_dump(mode="json") == tile
+
+    for sort in ("created_at", "urgency", "validation_confidence"):
+        pages, cursor = [], None
+        while True:
+            params = {"sort": sort, "limit": 2, "fields": "tile_id,urgency,metrics"}
+            if cursor:
+                params["cursor"] = cursor
+            page = client.get("/api/v1/tiles", params=params).json()
+            pages.extend(page["tiles"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert sorted(tile["tile_id"] for tile in pages) == sorted(tile["tile_id"] for tile in everything["tiles"])
+        assert all(set(tile) == {"tile_id", "urgency", "metrics"} for tile in pages)
+        if sort == "validation_confidence":
+            confidences = [tile["metrics"]["validation_confidence"] for tile in pages]
+            assert confidences == sorted(confidences, reverse=True)
+        if sort == "urgency":
+            ranks = [{"high": 3, "medium": 2, "low": 1}[tile["urgency"]] for tile in pages]
+            assert ranks == sorted(ranks, reverse=True)
+
+    assert client.get("/api/v1/tiles", params={"fields": "secret"}).status_code == 400
+    assert client.get("/api/v1/tiles", params={"sort": "views"}).status_code == 400
+    assert client.get("/api/v1/tiles", params={"cursor": "garbage"}).status_code == 400
@@ -0,0 +1,314 @@
+import math
+import random
+import pytest
+from collections import Counter
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+from ugc_backend.core import cluster as cluster_module
+from ugc_backend.core.cluster import ClusteringEngine
+from ugc_backend.core.incremental import IncrementalClusterer, LiveClusterState
+from ugc_backend.core.lsh import DisjointSet, jaccard
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.hashtag_filter import HashtagFilter
+from ugc_backend.core.metrics import calculate_cluster_health, calculate_creator_diversity
+from ugc_backend.core.vocab import Vocabulary, hashtag_vocabulary
+from ugc_backend.core.window import WindowManager, WindowType
+from tests.factories import make_post, make_random_posts
+
+
+def pairwise_cooccurrence(hashtag_index, min_shared):
+    cooccurrence = {}
+    hashtags = list(hashtag_index.keys())
+    for i, tag1 in enumerate(hashtags):
+        for tag2 in hashtags[i + 1:]:
+            posts1 = set(hashtag_index[tag1])
+            posts2 = set(hashtag_index[tag2])
+            shared = len(posts1 & posts2)
+            if shared >= min_shared:
+                cooccurrence[(tag1, tag2)] = shared
+    return cooccurrence
+
+
+def test_cooccurrence_matches_pairwise_scan():
+    engine = ClusteringEngine()
+    for seed in range(5):
+        posts = make_random_posts(seed)
+        index = engine._build_hashtag_index(PostFrame.from_posts(posts))
+        expected = pairwise_cooccurrence(index, engine.min_shared_hashtags)
+        actual = engine._calculate_hashtag_cooccurrence(index)
+        assert actual == expected
+        assert list(actual) == list(expected)
+
+
+def test_cooccurrence_counts_repeated_tags_once():
+    engine = ClusteringEngine(min_shared_hashtags=1)
+    posts = [make_post("post_1", "c1", ["a", "a", "b"])]
+    index = engine._build_hashtag_index(PostFrame.from_posts(posts))
+    a, b = hashtag_vocabulary.get("a"), hashtag_vocabulary.get("b")
+    assert engine._calculate_hashtag_cooccurrence(index) == {(a, b): 1}
+
+
+def test_hashtag_filter_drops_rare_common_and_stoplisted_tags():
+    posts = [
+        make_post(f"post_{i}", f"c{i}", ["fyp", "everywhere", "glowup", "skincare"] + (["glowup", "typo"] if i == 0 else []))
+        for i in range(6)
+    ] + [make_post(f"post_{i}", f"c{i}", ["everywhere", "other"]) for i in range(6, 10)]
+    frame = PostFrame.from_posts(posts)
+
+    lists, stats = HashtagFilter(min_df=2, max_df=0.8).apply(frame)
+    assert [hashtag_vocabulary.lookup_many(tags) for tags in lists[:1] + lists[-1:]] == [
+        ["glowup", "skincare", "glowup"],
+        ["other"],
+    ]
+    assert stats == {
+        "posts": 10,
+        "hashtags": 6,
+        "hashtags_kept": 3,
+        "dropped_rare": 1,
+        "dropped_common": 1,
+        "dropped_stoplist": 1,
+        "occurrences_dropped": 17,
+        "posts_emptied": 0,
+    }
+    assert HashtagFilter(min_df=0.5, max_df=4, stoplist=[]).bounds(10) == (5, 4)
+    _, absolute = HashtagFilter(min_df=5, max_df=9, stoplist=[]).apply(frame)
+    _, relative = HashtagFilter(min_df=0.5, max_df=0.9, stoplist=[]).apply(frame)
+    assert absolute == relative
+    assert (absolute["dropped_rare"], absolute["dropped_common"]) == (2, 1)
+
+    counted = Counter(tag for post in posts for tag in set(post.hashtags))
+    assert HashtagFilter(min_df=2, max_df=0.8).apply(frame, dict(counted)) == (lists, stats)
+    with pytest.raises(ValueError):
+        HashtagFilter(max_df=1)
+
+
+def test_clustering_ignores_filtered_tags():
+    posts = [make_post(f"a_{i}", f"ca{i}", ["fyp", "glowup", "skincare"]) for i in range(4)]
+    posts += [make_post(f"b_{i}", f"cb{i}", ["fyp", "running", "marathon"]) for i in range(4)]
+    engine = ClusteringEngine(max_hashtag_df=0.6)
+    clusters = engine.cluster_posts(posts)
+    assert sorted(sorted(cluster.primary_hashtags) for cluster in clusters) == [
+        ["glowup", "skincare"],
+        ["marathon", "running"],
+    ]
+    assert engine.last_filter_stats["dropped_stoplist"] == 1
+    # the filter only narrows what clustering looks at, posts keep every tag
+    assert all("fyp" in post.hashtags for cluster in clusters for post in cluster.posts)
+
+
+def test_lsh_merge_is_transitive_and_order_independent():
+    engine = ClusteringEngine(merge_mode="lsh", hashtag_similarity=0.5)
+    a = frozenset(["a", "b", "c"])
+    b = frozenset(["a", "b", "c", "d"])
+    c = frozenset(["b", "c", "d", "e"])
+    unrelated = frozenset(["x", "y"])
+    clusters = {a: {"p1"}, unrelated: {"p4"}, b: {"p2"}, c: {"p3"}}
+
+    merged = engine._merge_overlapping_clusters(clusters)
+    assert merged == {a: {"p1", "p2", "p3"}, unrelated: {"p4"}}
+
+    reordered = {c: {"p3"}, b: {"p2"}, unrelated: {"p4"}, a: {"p1"}}
+    merged = engine._merge_overlapping_clusters(reordered)
+    assert sorted(map(sorted, merged.values())) == [["p1", "p2", "p3"], ["p4"]]
+
+
+def test_lsh_merge_matches_exact_on_separated_clusters():
+    exact = ClusteringEngine(merge_mode="exact")
+    lsh = ClusteringEngine(merge_mode="lsh")
+    clusters = {}
+    for group in range(50):
+        base = [f"g{group}_{i}" for i in range(4)]
+        clusters[frozenset(base)] = {f"post_{group}_0"}
+        clusters[frozenset(base + [f"g{group}_extra"])] = {f"post_{group}_1"}
+
+    assert lsh._merge_overlapping_clusters(dict(clusters)) == exact._merge_overlapping_clusters(dict(clusters))
+
+
+def test_parallel_lsh_merge_matches_serial_for_any_worker_count():
+    posts = make_random_posts(11, count=400, vocabulary=30)
+    serial = ClusteringEngine(merge_mode="lsh").cluster_posts(posts)
+    expected = [(cluster.cluster_id, sorted(cluster.post_ids), cluster.primary_hashtags) for cluster in serial]
+    assert len(expected) > 5
+
+    for workers in (2, 3):
+        engine = ClusteringEngine(merge_mode="lsh", workers=workers, parallel_min_clusters=0)
+        clusters = engine.cluster_posts(posts)
+        assert [(cluster.cluster_id, sorted(cluster.post_ids), cluster.primary_hashtags) for cluster in clusters] == expected
+        assert [cluster.calculate_health().post_count for cluster in clusters] == [cluster.post_count for cluster in serial]
+
+
+def test_auto_merge_mode_switches_on_cluster_count():
+    engine = ClusteringEngine(merge_mode="auto", lsh_min_clusters=3)
+    posts = make_random_posts(7)
+    assert engine.cluster_posts(posts)
+
+
+def test_vocabulary_ids_are_stable_after_reload():
+    vocab = Vocabulary(["fyp", "skincare"])
+    assert vocab.intern("glowup") == 2
+    assert vocab.lookup(1) == "skincare"
+
+    reloaded = Vocabulary()
+    reloaded.extend(vocab.tokens)
+    assert reloaded.get("glowup") == 2
+    assert not reloaded.dirty
+
+
+def test_vocabulary_compaction_releases_unused_tokens_after_a_grace_period():
+    vocab = Vocabulary(["fyp", "skincare", "typo"])
+    assert vocab.compact([0, 1]) == 0
+    assert vocab.get("typo") == 2
+    assert vocab.compact([0, 1]) == 1
+    assert "typo" not in vocab and len(vocab) == 2
+    # the released id goes to the next new token, used ids never move
+    assert vocab.intern("glowup") == 2
+    assert vocab.get("fyp") == 0 and vocab.lookup(2) == "glowup"
+
+    vocab.compact([0, 2])
+    vocab.compact([0, 2])
+    reloaded = Vocabulary()
+    reloaded.extend(vocab.tokens)
+    assert reloaded.tokens == ["fyp", None, "glowup"]
+    assert reloaded.intern("haul") == 1
+    assert len(vocab.tokens) == 3
+
+
+def test_live_state_evictions_release_hashtags_no_stored_post_uses():
+    live = LiveClusterState(WindowManager(early_detection_hours=1, validation_hours=1, saturation_hours=1))
+    start = datetime(2026, 1, 1)
+    typo = make_post("typo_post", "one_off_creator", ["skincare", "skincaer"])
+    typo.timestamp = start
+    live.apply_batch([typo], start)
+    typo_id = hashtag_vocabulary.get("skincaer")
+    assert typo_id is not None
+
+    for hours in range(1, 6):
+        post = make_post(f"post_{hours}", "creator_1", ["skincare", "glowup"])
+        post.timestamp = start + timedelta(hours=hours)
+        live.apply_batch([post], post.timestamp)
+
+    assert "typo_post" not in live.store
+    assert "skincaer" not in hashtag_vocabulary
+    assert "skincare" in hashtag_vocabulary
+    assert hashtag_vocabulary.get("skincare") == live.store["post_5"].hashtag_ids[0]
+
+
+def test_clusters_decode_primary_hashtags():
+    posts = [make_post(f"post_{i}", f"creator_{i}", ["#GlowUp", "#skincare"]) for i in range(4)]
+    clusters = ClusteringEngine().cluster_posts(posts)
+    assert [cluster.primary_hashtags for cluster in clusters] == [["glowup", "skincare"]]
+    assert clusters[0].unique_creators == {f"creator_{i}" for i in range(4)}
+
+
+def test_frame_materializes_rows_lazily():
+    post = make_post("post_1", "creator_1", ["#a", "#b"])
+    row = SimpleNamespace(
+        post_id=post.post_id,
+        creator_id=post.creator.creator_id,
+        creator_username=post.creator.username,
+        creator_follower_count=post.creator.follower_count,
+        creator_tier=post.creator.tier.value,
+        creator_region=post.creator.region.value,
+        platform=post.platform.value,
+        content_type=post.content_type.value,
+        caption=post.caption,
+        hashtags=post.hashtags,
+        timestamp=post.timestamp,
+        views=post.views,
+        likes=post.likes,
+        comments=post.comments,
+        shares=post.shares,
+        saves=post.saves,
+        first_seen=post.first_seen,
+        last_captured=post.last_captured,
+        capture_count=post.capture_count,
+    )
+    frame = PostFrame.from_rows([row])
+    assert frame._materialized == {}
+    not_stored = {"creator": {"avg_engagement_rate"}}
+    assert frame.post(0).model_dump(exclude=not_stored) == post.model_dump(exclude=not_stored)
+    assert frame.post(0) is frame.post(0)
+
+
+def test_frame_cluster_health_matches_scalar_metrics():
+    posts = make_random_posts(3)
+    for cluster in ClusteringEngine().cluster_posts(posts):
+        health = cluster.calculate_health()
+        assert math.isclose(health.health_score, calculate_cluster_health(cluster.posts), rel_tol=1e-6)
+        assert health.creator_diversity == calculate_creator_diversity(cluster.posts)
+        assert health.post_count == len(cluster.posts)
+        assert health.creator_count == cluster.creator_count
+
+
+def exact_similar_groups(sets, threshold, **kwargs):
+    groups = DisjointSet(len(sets))
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            if sets[i] and sets[j] and jaccard(sets[i], sets[j]) >= threshold:
+                groups.union(i, j)
+    return groups
+
+
+def test_incremental_clusterer_matches_batch_clustering(monkeypatch):
+    monkeypatch.setattr(cluster_module, "lsh_similar_groups", exact_similar_groups)
+    posts = make_random_posts(1, count=300, vocabulary=50)
+    expected = ClusteringEngine(merge_mode="lsh").cluster_posts(posts)
+
+    clusterer = IncrementalClusterer()
+    for start in range(0, len(posts), 37):
+        clusterer.apply_batch(posts[start:start + 37])
+    live = clusterer.clusters()
+
+    assert sorted(sorted(c.post_ids) for c in live) == sorted(sorted(c.post_ids) for c in expected)
+    assert clusterer.dirty_count == 0
+
+
+def test_incremental_recapture_only_rebuilds_touched_clusters():
+    clusterer = IncrementalClusterer()
+    clusterer.apply_batch([make_post(f"a{i}", f"c{i}", ["a", "b"]) for i in range(3)])
+    clusterer.apply_batch([make_post(f"x{i}", f"c{i}", ["x", "y"]) for i in range(3)])
+    before = {c.primary_hashtags[0]: c for c in clusterer.clusters()}
+
+    recaptured = make_post("a0", "c0", ["a", "b"])
+    recaptured.likes = 10_000
+    assert clusterer.apply_batch([recaptured]) == {"added": 0, "updated": 1}
+
+    after = {c.primary_hashtags[0]: c for c in clusterer.clusters()}
+    assert after["x"] is before["x"]
+    assert after["a"] is not before["a"]
+    assert after["a"].total_engagement > before["a"].total_engagement
+
+
+def test_live_state_retracts_posts_that_slide_out_of_windows():
+    rng = random.Random(11)
+    tags = [f"tag{i}" for i in range(30)]
+    start = datetime(2026, 1, 1)
+    posts = []
+    for i in range(400):
+        post = make_post(f"post_{i}", f"creator_{rng.randrange(80)}", rng.sample(tags, rng.randint(0, 5)))
+        post.timestamp = start + timedelta(hours=i)
+        posts.append(post)
+
+    windows = WindowManager()
+    live = LiveClusterState(windows)
+    for offset in range(0, len(posts), 40):
+        batch = posts[offset:offset + 40]
+        now = batch[-1].timestamp
+        live.apply_batch(batch, now)
+
+        for window_type in WindowType:
+            window_start = windows.create_window(window_type, now).start
+            fresh = IncrementalClusterer()
+            fresh.apply_batch([post for post in posts[:offset + 40] if post.timestamp >= window_start])
+            expected = sorted(sorted(c.post_ids) for c in fresh.clusters())
+            assert sorted(sorted(c.post_ids) for c in live.clusters(window_type, now)) == expected
+
+    assert len(live) == len(live.clusterers[WindowType.saturation]) == 337
+
+
+def test_live_state_counts_a_recapture_once():
+    live = LiveClusterState()
+    post = make_post("post_1", "creator_1", ["a", "b"])
+    live.apply_batch([post])
+    assert live.apply_batch([make_post("post_1", "creator_1", ["a", "b"])]) == {"updated": 3}
+    assert live.store["post_1"].capture_count == 2
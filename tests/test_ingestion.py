@@ -0,0 +1,198 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List
+import httpx
+from ugc_backend.core.models import Platform
+from ugc_backend.ingestion.manager import IngestionManager
+from ugc_backend.ingestion.ratelimit import TokenBucket
+from ugc_backend.ingestion.recapture import RecaptureScheduler
+from ugc_backend.ingestion.tiktok import TikTokAdapter
+from ugc_backend.ingestion.xiaohongshu import XiaohongshuAdapter
+from ugc_backend.utils.metrics import REGISTRY
+from tests.fake_platform import FakePlatformServer
+from tests.factories import make_post
+
+
+class FakeXiaohongshuAdapter(XiaohongshuAdapter):
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+
+    def _scrape_search_results(self, keyword: str) -> List[dict]:
+        response = httpx.get(f"{self.base_url}/search/{keyword}", timeout=10.0)
+        response.raise_for_status()
+        return [dict(item, create_time="2026-01-01T00:00:00Z") for item in response.json()["data"]]
+
+
+def collect(manager, platforms, keywords):
+    async def run():
+        return [post async for post in manager.stream_posts(platforms, keywords)]
+
+    return asyncio.run(run())
+
+
+def test_stream_posts_fans_out_across_platforms_and_keywords():
+    keywords = ["glowup", "skincare", "ootd", "matcha"]
+    with FakePlatformServer(latency=0.2) as server:
+        manager = IngestionManager({
+            Platform.tiktok: TikTokAdapter(rate_limit=0, base_url=server.url),
+            Platform.xiaohongshu: FakeXiaohongshuAdapter(server.url, rate_limit=0),
+        })
+        platforms = [Platform.tiktok, Platform.xiaohongshu]
+
+        started = time.perf_counter()
+        sequential = manager.discover_posts(platforms, keywords)
+        sequential_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        streamed = collect(manager, platforms, keywords)
+        streamed_seconds = time.perf_counter() - started
+
+    assert sorted(p.post_id for p in streamed) == sorted(p.post_id for p in sequential)
+    assert len(streamed) == 2 * len(keywords) * 3
+    assert sequential_seconds >= 0.8
+    assert streamed_seconds < sequential_seconds / 2
+
+
+def test_stream_posts_yields_fast_keywords_first():
+    with FakePlatformServer(latency=0.05, keyword_latency={"slow": 0.5}) as server:
+        manager = IngestionManager({Platform.tiktok: TikTokAdapter(rate_limit=0, base_url=server.url)})
+        posts = collect(manager, [Platform.tiktok], ["slow", "fast"])
+
+    assert [post.post_id.split("_")[0] for post in posts] == ["fast"] * 3 + ["slow"] * 3
+
+
+def test_stream_posts_respects_adapter_rate_limit():
+    keywords = [f"tag{i}" for i in range(6)]
+    with FakePlatformServer(latency=0.01) as server:
+        manager = IngestionManager(
+            {Platform.tiktok: TikTokAdapter(rate_limit=600, base_url=server.url)},
+            max_concurrency=6,
+        )
+        collect(manager, [Platform.tiktok], keywords)
+        arrivals = sorted(arrival for _, _, arrival in server.requests)
+
+    assert len(arrivals) == len(keywords)
+    assert arrivals[-1] - arrivals[0] >= 0.45
+
+
+def test_token_bucket_queues_callers_in_reservation_order():
+    now = [0.0]
+    bucket = TokenBucket(60, burst=2, clock=lambda: now[0])
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+    now[0] = 10.0
+    assert bucket.reserve() == 0.0
+    assert TokenBucket(0).reserve() == 0.0
+
+
+def test_tiktok_adapter_pools_connections_and_bounds_concurrency():
+    post_ids = [f"post{i}" for i in range(24)]
+    with FakePlatformServer(latency=0.05) as server:
+        adapter = TikTokAdapter(rate_limit=0, base_url=server.url, max_concurrency=4)
+        posts = adapter.recapture_posts(post_ids)
+
+    assert sorted(post.post_id for post in posts) == sorted(post_ids)
+    assert all(post.capture_count == 2 for post in posts)
+    assert server.max_in_flight <= 4
+    assert len(server.peers) <= 4
+
+
+def test_tiktok_adapter_keeps_client_across_calls_on_one_loop():
+    async def run(adapter):
+        first = await adapter.amonitor_watchlist(["alice", "bob"])
+        client = adapter._client
+        second = await adapter.adiscover_posts(["glowup"])
+        assert adapter._client is client
+        # a sync call from inside the loop runs on its own loop and client
+        recaptured = adapter.recapture_posts(["alice_0"])
+        assert [post.post_id for post in recaptured] == ["alice_0"]
+        assert adapter._client is client
+        await adapter.aclose()
+        return first + second
+
+    with FakePlatformServer(latency=0.01) as server:
+        adapter = TikTokAdapter(rate_limit=0, base_url=server.url, api_key="secret", max_concurrency=2)
+        posts = asyncio.run(run(adapter))
+        paths = sorted(path for path, _, _ in server.requests)
+
+    assert len(posts) == 9
+    assert paths == ["/hashtag/posts", "/post/alice_0", "/user/alice/posts", "/user/bob/posts"]
+    assert len(server.peers) <= 3
+
+
+def test_tiktok_request_latency_excludes_rate_limit_waits():
+    def observed(name):
+        return REGISTRY.get_sample_value(name, {"platform": "tiktok", "endpoint": "post", "outcome": "ok"}) or 0.0
+
+    before = observed("ugc_adapter_request_duration_seconds_sum"), observed("ugc_adapter_request_duration_seconds_count")
+    with FakePlatformServer(latency=0.01) as server:
+        # 300 per minute spaces the four requests 0.2s apart
+        adapter = TikTokAdapter(rate_limit=300, base_url=server.url, max_concurrency=1)
+        started = time.perf_counter()
+        adapter.recapture_posts([f"post{i}" for i in range(4)])
+        elapsed = time.perf_counter() - started
+
+    total = observed("ugc_adapter_request_duration_seconds_sum") - before[0]
+    assert observed("ugc_adapter_request_duration_seconds_count") - before[1] == 4
+    assert elapsed >= 0.6
+    assert total < elapsed - 0.5
+
+
+class FakeRecaptureManager:
+    def __init__(self, growth):
+        self.growth = growth
+        self.requests = []
+        self.adapters = {}
+
+    async def arecapture_posts(self, platform, post_ids):
+        self.requests.append((platform, list(post_ids)))
+        posts = []
+        for post_id in post_ids:
+            if post_id in self.growth:
+                post = make_post(post_id, f"creator_{post_id}", ["a"], hours_ago=10)
+                post.likes += self.growth[post_id]
+                posts.append(post)
+        return posts
+
+
+def test_recapture_scheduler_spends_budget_on_fast_movers():
+    now = datetime.now()
+    posts = []
+    for i, likes in enumerate([10, 5000, 200, 80000, 0]):
+        post = make_post(f"p{i}", f"c{i}", ["a"], hours_ago=10)
+        post.likes = likes
+        post.last_captured = now - timedelta(hours=2)
+        posts.append(post)
+
+    scheduler = RecaptureScheduler({Platform.tiktok: 2, Platform.xiaohongshu: 0})
+    scheduler.track(posts)
+    assert scheduler.next_batch(Platform.tiktok, now) == ["p3", "p1"]
+
+    scheduler.mark_clustered(["p2"])
+    scheduler.entries["p2"].velocity = scheduler.entries["p1"].velocity
+    assert scheduler.next_batch(Platform.tiktok, now) == ["p3", "p2"]
+    assert scheduler.next_batch(Platform.xiaohongshu, now) == []
+
+
+def test_recapture_cycle_uses_deltas_and_drops_dead_posts():
+    now = datetime.now()
+    posts = [make_post(f"p{i}", f"c{i}", ["a"], hours_ago=10) for i in range(3)]
+    for post in posts:
+        post.last_captured = now - timedelta(hours=1)
+
+    scheduler = RecaptureScheduler({Platform.tiktok: 10}, max_failures=2)
+    scheduler.track(posts)
+    manager = FakeRecaptureManager({"p0": 0, "p1": 500})
+    recaptured = asyncio.run(scheduler.run_cycle(manager, now))
+
+    assert sorted(post.post_id for post in recaptured) == ["p0", "p1"]
+    assert scheduler.entries["p0"].velocity == 0.0
+    assert scheduler.entries["p1"].velocity > scheduler.entries["p0"].velocity
+    assert scheduler.entries["p2"].retry_after == now + scheduler.min_interval
+    assert scheduler.next_batch(Platform.tiktok, now) == []
+
+    later = now + timedelta(hours=1)
+    asyncio.run(scheduler.run_cycle(manager, later))
+    assert "p2" not in scheduler
+    assert manager.requests[-1] == (Platform.tiktok, ["p1", "p2", "p0"])
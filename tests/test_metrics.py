@@ -1,4 +1,8 @@
+import random
 from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from ugc_backend.core.frame import PostFrame
 from ugc_backend.core.models import ContentPost, CreatorProfile, Platform, ContentType, MarketRegion, CreatorTier
 from ugc_backend.core.metrics import (
     calculate_engagement_rate,
@@ -7,7 +11,16 @@ from ugc_backend.core.metrics import (
     calculate_cluster_health,
     calculate_detection_confidence,
     calculate_validation_confidence,
+    calculate_engagement_strength,
+    batch_engagement_rates,
+    batch_velocity_scores,
+    batch_creator_diversity,
+    batch_engagement_strength,
+    batch_cluster_metrics,
 )
+from ugc_backend.core.cluster import Cluster, calculate_cluster_healths
+from ugc_backend.core.snapshot import EngagementDelta
+from tests.factories import make_post, make_random_posts
 
 
 def test_engagement_rate():
@@ -72,6 +85,38 @@ def test_velocity_score():
     assert velocity > 0
 
 
+def test_batch_velocity_prefers_snapshot_deltas():
+    now = datetime(2026, 3, 2, 12)
+    first_seen = np.array([now - timedelta(hours=10)] * 3, dtype="datetime64[us]")
+    velocities = batch_velocity_scores(
+        np.array([100, 100, 100]),
+        first_seen,
+        now,
+        delta_engagement=np.array([60, 0, 5]),
+        delta_hours=np.array([2.0, 0.0, 0.5]),
+    )
+    assert velocities.tolist() == [30.0, 10.0, 10.0]
+
+
+def test_cluster_health_scores_velocity_on_snapshot_deltas():
+    posts = [make_post(f"post_{i}", f"creator_{i % 4}", ["a", "b"]) for i in range(12)]
+    now = datetime.now()
+    deltas = {
+        post.post_id: EngagementDelta(post.post_id, now - timedelta(hours=2), now, 0, 1900, 40, 40, 20)
+        for post in posts[:6]
+    }
+    lifetime = Cluster("lifetime", posts, ["a", "b"])
+    recent = Cluster("recent", posts, ["a", "b"])
+    calculate_cluster_healths([lifetime])
+    calculate_cluster_healths([recent], deltas=deltas)
+
+    expected = np.mean([calculate_velocity_score(post, deltas.get(post.post_id)) for post in posts])
+    assert recent.calculate_health().velocity_score == pytest.approx(expected, rel=1e-6)
+    assert recent.calculate_health().velocity_score > lifetime.calculate_health().velocity_score
+    assert recent.calculate_health().health_score > lifetime.calculate_health().health_score
+    assert recent.calculate_health().creator_diversity == lifetime.calculate_health().creator_diversity
+
+
 def test_creator_diversity():
     creator1 = CreatorProfile(
         creator_id="test_1",
@@ -158,3 +203,38 @@ def test_cluster_health():
     
     health = calculate_cluster_health(posts)
     assert 0.0 <= health <= 1.0
+
+
+def random_segments(rng: random.Random, count: int):
+    """
+    random cluster memberships (posts may sit in several clusters, clusters may be empty)
+    """
+    segments = [rng.sample(range(count), rng.randint(0, count)) for _ in range(rng.randint(1, 8))]
+    rows = np.array([row for segment in segments for row in segment], dtype=np.int64)
+    offsets = np.cumsum([0] + [len(segment) for segment in segments])
+    return segments, rows, offsets
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_batch_metrics_match_scalar_reference(seed):
+    rng = random.Random(seed)
+    posts = make_random_posts(seed, rng.randint(1, 60))
+    frame = PostFrame.from_posts(posts)
+    segments, rows, offsets = random_segments(rng, len(posts))
+
+    rates = batch_engagement_rates(frame.views, frame.likes, frame.comments, frame.shares)
+    assert np.allclose(rates, [calculate_engagement_rate(post) for post in posts])
+
+    velocities = batch_velocity_scores(frame.total_engagement, frame.first_seen)
+    assert np.allclose(velocities, [calculate_velocity_score(post) for post in posts], rtol=1e-4)
+
+    diversity = batch_creator_diversity(frame.creator_keys[rows], offsets)
+    strength = batch_engagement_strength(rates[rows], offsets)
+    metrics = batch_cluster_metrics(frame, rows, offsets)
+    for idx, segment in enumerate(segments):
+        members = [posts[row] for row in segment]
+        assert diversity[idx] == pytest.approx(calculate_creator_diversity(members))
+        assert strength[idx] == pytest.approx(calculate_engagement_strength(members))
+        assert metrics["health_score"][idx] == pytest.approx(calculate_cluster_health(members), rel=1e-4)
+        assert metrics["post_count"][idx] == len(members)
+        assert metrics["creator_count"][idx] == len(set(post.creator.creator_id for post in members))
@@ -0,0 +1,288 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import combinations
+import pytest
+from sqlalchemy import event
+from ugc_backend.core.cluster import ClusteringEngine, content_cluster_id
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.proof_tile import ProofTileGenerator
+from ugc_backend.core.trend import TrendValidator
+from ugc_backend.core.metrics import calculate_velocity_score
+from ugc_backend.core.window import WindowType
+from ugc_backend.db.models import (
+    PostModel,
+    PostHashtagModel,
+    EngagementSnapshotModel,
+    ClusterModel,
+    TrendModel,
+    ProofTileModel,
+)
+from ugc_backend.db.repository import PostRepository, SnapshotRepository, DiscoveryWriter
+from ugc_backend.db.async_repository import AsyncPostRepository
+from ugc_backend.db.session import AsyncDatabase, Database
+from ugc_backend.discovery.pipeline import DiscoveryPipeline
+from tests.factories import make_post, make_random_posts
+
+
+@pytest.fixture
+def session(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'test.db'}")
+    database.init_db()
+    session = database.get_session()
+    yield session
+    session.close()
+
+
+def test_save_posts_reports_inserted_and_updated(session):
+    repo = PostRepository(session, chunk_size=3)
+    posts = [make_post(f"post_{i}", f"creator_{i}", ["a", "b"]) for i in range(5)]
+    assert repo.save_posts(posts) == {"inserted": 5, "updated": 0}
+
+    recaptured = [make_post(f"post_{i}", f"creator_{i}", ["a", "b"]) for i in range(3, 8)]
+    for post in recaptured:
+        post.views = 9999
+        post.first_seen = datetime.now() + timedelta(days=1)
+    assert repo.save_posts(recaptured) == {"inserted": 3, "updated": 2}
+
+    stored = {model.post_id: model for model in session.query(PostModel).all()}
+    assert len(stored) == 8
+    assert stored["post_3"].views == 9999
+    assert stored["post_3"].capture_count == 2
+    assert stored["post_3"].first_seen == posts[3].first_seen
+    assert stored["post_0"].views == posts[0].views
+    assert stored["post_7"].created_at is not None
+
+
+def test_save_posts_keeps_last_copy_of_repeated_post(session):
+    repo = PostRepository(session)
+    first = make_post("post_1", "creator_1", ["a"])
+    second = make_post("post_1", "creator_1", ["a"])
+    second.likes = 123
+    assert repo.save_posts([first, second]) == {"inserted": 1, "updated": 0}
+    assert session.query(PostModel).one().likes == 123
+
+
+def test_bulk_and_per_row_paths_store_the_same_rows(tmp_path):
+    rows = {}
+    for name, save in (("bulk", "save_posts"), ("per_row", "_save_posts_per_row")):
+        database = Database(f"sqlite:///{tmp_path / name}.db")
+        database.init_db()
+        session = database.get_session()
+        repo = PostRepository(session)
+        posts = [make_post(f"post_{i}", f"creator_{i}", ["a", "b"]) for i in range(10)]
+        assert getattr(repo, save)(posts) == {"inserted": 10, "updated": 0}
+        assert getattr(repo, save)(posts[:4]) == {"inserted": 0, "updated": 4}
+        rows[name] = sorted(
+            (model.post_id, model.views, model.capture_count, model.hashtags)
+            for model in session.query(PostModel).all()
+        )
+        session.close()
+    assert rows["bulk"] == rows["per_row"]
+
+
+def discovery_results(seed: int = 3):
+    clusters = ClusteringEngine().cluster_posts(make_random_posts(seed))
+    validator = TrendValidator()
+    generator = ProofTileGenerator()
+    results = []
+    for cluster in clusters:
+        signal = validator.validate_cluster(cluster, datetime.now())
+        results.append((cluster, signal, generator.generate(signal)))
+    return results
+
+
+def test_discovery_writer_upserts_a_rerun_in_one_commit(session):
+    results = discovery_results()
+    assert results
+
+    writer = DiscoveryWriter(session)
+    for cluster, signal, tile in results:
+        writer.add(cluster, signal, tile)
+    counts = {"clusters": len(results), "trends": len(results), "tiles": len(results)}
+    assert writer.flush() == counts
+
+    commits = []
+    event.listen(session, "after_commit", lambda s: commits.append(s))
+    for cluster, signal, tile in discovery_results():
+        signal._validation_confidence = 0.99
+        writer.add(cluster, signal, tile)
+    assert writer.flush() == counts
+    assert len(commits) == 1
+
+    assert session.query(ClusterModel).count() == len(results)
+    assert session.query(ProofTileModel).count() == len(results)
+    assert {trend.validation_confidence for trend in session.query(TrendModel)} == {0.99}
+
+
+def test_rerun_discovery_updates_rows_of_the_same_trends(session):
+    pipeline = DiscoveryPipeline(session)
+    first = pipeline.run(WindowType.early_detection, 0.0, clusters=ClusteringEngine().cluster_posts(make_random_posts(3)))
+    detected = {trend.signal_id: trend.first_detected for trend in session.query(TrendModel)}
+    created = {tile.tile_id: tile.created_at for tile in session.query(ProofTileModel)}
+    assert len(first["tile_ids"]) == len(detected) > 2
+
+    # fewer clusters in another order: positional ids would land on other trends
+    rerun = ClusteringEngine().cluster_posts(make_random_posts(3))[::-1][1:]
+    second = pipeline.run(WindowType.early_detection, 0.0, clusters=rerun)
+    assert set(second["tile_ids"]) < set(first["tile_ids"])
+    for trend in session.query(TrendModel):
+        assert trend.first_detected == detected[trend.signal_id]
+    for tile in session.query(ProofTileModel):
+        assert tile.created_at == created[tile.tile_id]
+    for cluster in session.query(ClusterModel):
+        assert cluster.cluster_id == content_cluster_id("early_detection", cluster.primary_hashtags)
+
+    third = pipeline.run(WindowType.validation, 0.0, clusters=ClusteringEngine().cluster_posts(make_random_posts(3)))
+    assert not set(third["tile_ids"]) & set(first["tile_ids"])
+    assert session.query(TrendModel).count() == 2 * len(detected)
+
+
+def test_streamed_window_frame_matches_orm_frame(session):
+    repo = PostRepository(session)
+    posts = make_random_posts(5, count=50)
+    posts[7].hashtags = []
+    repo.save_posts(posts)
+    start, end = datetime.now() - timedelta(days=1), datetime.now()
+
+    chunks = list(repo.stream_posts_by_window(start, end, chunk_size=8))
+    assert [len(chunk) for chunk in chunks] == [8] * 6 + [2]
+
+    streamed = PostFrame.from_chunks(repo.stream_posts_by_window(start, end, chunk_size=8))
+    loaded = PostFrame.from_rows(repo.get_posts_by_window(start, end))
+    assert streamed.post_ids == loaded.post_ids
+    assert streamed.hashtag_lists() == loaded.hashtag_lists()
+    assert (streamed.total_engagement == loaded.total_engagement).all()
+    assert (streamed.timestamp == loaded.timestamp).all()
+    assert streamed.post(7).model_dump() == loaded.post(7).model_dump()
+
+
+def test_hashtag_counts_and_cooccurrence_come_from_post_hashtags(session):
+    repo = PostRepository(session, chunk_size=16)
+    posts = make_random_posts(9, count=80, vocabulary=15)
+    repo.save_posts(posts)
+    repo.save_posts(posts[:10])
+    start, end = datetime.now() - timedelta(days=1), datetime.now()
+
+    assert session.query(PostHashtagModel).count() == sum(len(set(post.hashtags)) for post in posts)
+
+    expected_counts = Counter(tag for post in posts for tag in set(post.hashtags))
+    assert repo.get_hashtag_counts(start, end) == dict(expected_counts)
+    assert repo.get_hashtag_counts(start, end, min_posts=20, max_posts=30) == {
+        tag: count for tag, count in expected_counts.items() if 20 <= count <= 30
+    }
+
+    pairs = Counter(pair for post in posts for pair in combinations(sorted(set(post.hashtags)), 2))
+    assert repo.get_hashtag_cooccurrence(start, end, min_shared=3) == {
+        pair: count for pair, count in pairs.items() if count >= 3
+    }
+
+    frequent = {tag for tag, count in expected_counts.items() if count >= 25}
+    assert repo.get_hashtag_cooccurrence(start, end, min_shared=1, min_posts=25) == {
+        pair: count for pair, count in pairs.items() if set(pair) <= frequent
+    }
+
+    tag = posts[0].hashtags[0]
+    assert sorted(repo.get_post_ids_by_hashtag(tag, start, end)) == sorted(
+        post.post_id for post in posts if tag in post.hashtags
+    )
+    assert repo.get_hashtag_counts(end, end + timedelta(days=1)) == {}
+    assert repo.get_hashtag_cooccurrence(end, end + timedelta(days=1)) == {}
+
+    # discovery filters hashtags on these counts instead of counting the frame
+    frame = PostFrame.from_chunks(repo.stream_posts_by_window(start, end))
+    engine = ClusteringEngine(min_hashtag_df=20, max_hashtag_df=30)
+    counted = [cluster.primary_hashtags for cluster in engine.cluster_frame(frame)]
+    stats = engine.last_filter_stats
+    from_sql = [cluster.primary_hashtags for cluster in engine.cluster_frame(frame, repo.get_hashtag_counts(start, end))]
+    assert from_sql == counted and engine.last_filter_stats == stats
+    assert stats["dropped_rare"] > 0
+
+
+def test_async_hashtag_queries_match_the_sync_repository(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'test.db'}"
+    database = Database(database_url)
+    database.init_db()
+    with database.get_session() as session:
+        repo = PostRepository(session)
+        repo.save_posts(make_random_posts(4, count=40, vocabulary=10))
+        start, end = datetime.now() - timedelta(days=1), datetime.now()
+        counts = repo.get_hashtag_counts(start, end, min_posts=2)
+        pairs = repo.get_hashtag_cooccurrence(start, end, min_shared=2)
+
+    async def read():
+        async_database = AsyncDatabase(database_url)
+        try:
+            async with async_database.get_session() as session:
+                async_repo = AsyncPostRepository(session)
+                return (
+                    await async_repo.get_hashtag_counts(start, end, min_posts=2),
+                    await async_repo.get_hashtag_cooccurrence(start, end, min_shared=2),
+                )
+        finally:
+            await async_database.engine.dispose()
+
+    assert asyncio.run(read()) == (counts, pairs)
+    assert pairs
+
+
+def test_backfill_post_hashtags_is_idempotent(session):
+    repo = PostRepository(session)
+    repo.save_posts(make_random_posts(2, count=20))
+    expected = session.query(PostHashtagModel).count()
+    session.query(PostHashtagModel).delete()
+    session.commit()
+
+    assert repo.backfill_post_hashtags() == 20
+    assert repo.backfill_post_hashtags() == 20
+    assert session.query(PostHashtagModel).count() == expected
+
+
+def capture(post_id: str, captured_at: datetime, likes: int):
+    post = make_post(post_id, "creator_1", ["a"])
+    post.first_seen = datetime(2026, 3, 1)
+    post.last_captured = captured_at
+    post.likes = likes
+    return post
+
+
+def test_recaptures_append_snapshots_and_report_deltas(session):
+    repo = PostRepository(session)
+    start = datetime(2026, 3, 2, 8)
+    for hour, likes in enumerate([50, 80, 140, 260]):
+        repo.save_posts([capture("post_1", start + timedelta(hours=hour), likes), capture("post_2", start, 10)])
+
+    snapshots = SnapshotRepository(session)
+    assert [s.likes for s in snapshots.get_snapshots("post_1")] == [50, 80, 140, 260]
+    assert session.query(EngagementSnapshotModel).count() == 5
+
+    deltas = snapshots.get_deltas(start + timedelta(hours=1), start + timedelta(hours=3))
+    assert list(deltas) == ["post_1"]
+    delta = deltas["post_1"]
+    assert (delta.likes, delta.views, delta.hours) == (180, 0, 2.0)
+    assert delta.velocity == 90.0
+
+    post = capture("post_1", start + timedelta(hours=3), 260)
+    assert calculate_velocity_score(post, delta) == 90.0
+    assert calculate_velocity_score(post) == pytest.approx(post.velocity)
+    assert snapshots.get_deltas(start, start + timedelta(hours=3), post_ids=["post_2"]) == {}
+
+
+def test_compact_expires_and_downsamples_old_days(session):
+    now = datetime(2026, 3, 20, 12)
+    posts = PostRepository(session)
+    for days_ago in (1, 5, 16):
+        day = now - timedelta(days=days_ago)
+        for minute in (0, 20, 40, 70):
+            posts.save_posts([capture("post_1", day + timedelta(minutes=minute), minute)])
+
+    counts = SnapshotRepository(session).compact(now)
+    assert counts == {"expired": 4, "downsampled": 2}
+
+    remaining = [s.captured_at for s in SnapshotRepository(session).get_snapshots("post_1")]
+    old_day = now - timedelta(days=5)
+    recent_day = now - timedelta(days=1)
+    assert remaining == [old_day + timedelta(minutes=40), old_day + timedelta(minutes=70)] + [
+        recent_day + timedelta(minutes=minute) for minute in (0, 20, 40, 70)
+    ]
+    assert SnapshotRepository(session).compact(now) == {"expired": 0, "downsampled": 0}
@@ -0,0 +1,26 @@
+from collections import Counter
+from datetime import datetime
+from benchmarks.workload import Workload
+from ugc_backend.core.models import CreatorProfile, CreatorTier
+
+
+def test_workload_is_seeded_and_shaped_like_real_traffic():
+    now = datetime(2026, 1, 1)
+    posts = Workload(5000, seed=7).generate(now)
+    again = Workload(5000, seed=7).generate(now)
+    assert [post.model_dump() for post in posts] == [post.model_dump() for post in again]
+    assert Workload(5000, seed=8).generate(now)[0].model_dump() != posts[0].model_dump()
+
+    assert len({post.post_id for post in posts}) == 5000
+    for post in posts:
+        assert post.creator.tier == CreatorProfile.determine_tier(post.creator.follower_count)
+        assert post.platform == post.creator.platform
+        assert post.first_seen <= post.last_captured == now
+    assert {post.creator.tier for post in posts} == set(CreatorTier)
+    assert len({post.creator.region for post in posts}) >= 4
+    assert len({post.platform for post in posts}) >= 4
+
+    tags = Counter(tag for post in posts for tag in post.hashtags).most_common()
+    assert tags[0][1] > 5 * tags[len(tags) // 2][1]
+    creators = Counter(post.creator.creator_id for post in posts).most_common()
+    assert creators[0][1] > 10 * creators[len(creators) // 2][1]
@@ -0,0 +1,153 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+from ugc_backend.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes) -> "CachedResponse":
+        return cls(body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        If-None-Match check, weak comparison as http caches expect
+        """
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any(tag.removeprefix("W/") == self.etag for tag in tags)
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl: float = 3600.0,
+        max_entries: int = 256,
+        redis_url: Optional[str] = None,
+        namespace: str = "tiles",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        serialized responses in an in-process LRU with a ttl, optionally
+        shared through redis
+        with redis, entries live under a generation number that invalidate()
+        bumps, so every replica drops its local copies on its next read;
+        redis errors degrade to the local cache instead of failing requests
+        invalidate() may run on any thread (discovery jobs finish on the job
+        queue's callback threads), hence the sync client next to the async one
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.namespace = namespace
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_sync = None
+        if redis_url:
+            import redis
+            import redis.asyncio
+
+            self._redis = redis.asyncio.Redis.from_url(redis_url, socket_timeout=0.5)
+            self._redis_sync = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+
+    @property
+    def generation_key(self) -> str:
+        return f"{self.namespace}:generation"
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        if self._redis is not None:
+            await self._sync_generation()
+
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, cached = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return cached
+                del self._entries[key]
+
+        if self._redis is None:
+            return None
+        try:
+            body = await self._redis.get(self._redis_key(key))
+        except Exception as e:
+            logger.warning("cache read failed", key=key, error=str(e))
+            return None
+        if body is None:
+            return None
+        cached = CachedResponse.from_body(body)
+        self._store(key, cached)
+        return cached
+
+    async def set(self, key: str, body: bytes, generation: Optional[int] = None) -> CachedResponse:
+        """
+        pass the generation read before building body; if an invalidation
+        happened since, the now stale body is returned but not cached
+        """
+        cached = CachedResponse.from_body(body)
+        if generation is not None and generation != self._generation:
+            return cached
+        self._store(key, cached)
+        if self._redis is not None:
+            try:
+                await self._redis.set(self._redis_key(key), body, ex=max(int(self.ttl), 1))
+            except Exception as e:
+                logger.warning("cache write failed", key=key, error=str(e))
+        return cached
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+        if self._redis_sync is not None:
+            try:
+                self._redis_sync.incr(self.generation_key)
+            except Exception as e:
+                logger.warning("cache invalidation failed", error=str(e))
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis_sync.close()
+
+    def _store(self, key: str, cached: CachedResponse):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, cached)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{self._generation}:{key}"
+
+    async def _sync_generation(self):
+        try:
+            generation = int(await self._redis.get(self.generation_key) or 0)
+        except Exception as e:
+            logger.warning("cache generation read failed", error=str(e))
+            return
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
@@ -1,21 +1,45 @@
-from typing import Generator
+import asyncio
+from datetime import datetime
+from typing import AsyncGenerator, Dict, Generator, Optional, Set
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from ugc_backend.db.session import Database
+from ugc_backend.api.cache import ResponseCache
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.incremental import LiveClusterState
+from ugc_backend.core.window import WindowManager, WindowType
+from ugc_backend.discovery.jobs import DiscoveryJobQueue
+from ugc_backend.ingestion.manager import IngestionManager
+from ugc_backend.ingestion.recapture import RecaptureScheduler
+from ugc_backend.db.async_repository import AsyncPostRepository
+from ugc_backend.db.session import Database, AsyncDatabase
 from ugc_backend.db.repository import (
     PostRepository,
     ClusterRepository,
     TrendRepository,
     ProofTileRepository,
 )
+from ugc_backend.utils.logging import get_logger
+from ugc_backend.utils.metrics import STORE
+
+logger = get_logger("ugc_backend.recapture")
 
 
 _db_instance: Database = None
+_async_db_instance: AsyncDatabase = None
+_live_state: Optional[LiveClusterState] = None
+_job_queue: Optional[DiscoveryJobQueue] = None
+_tile_cache: Optional[ResponseCache] = None
+_recapture: Optional[RecaptureScheduler] = None
+_recapture_manager: Optional[IngestionManager] = None
+_recapture_task: Optional[asyncio.Task] = None
 
 
 def init_db(database_url: str):
-    global _db_instance
+    global _db_instance, _async_db_instance
     _db_instance = Database(database_url)
     _db_instance.init_db()
+    _async_db_instance = AsyncDatabase(database_url)
+    STORE.expire()
 
 
 def get_db():
@@ -28,6 +52,192 @@ def get_db():
         session.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if _async_db_instance is None:
+        raise RuntimeError("database not initialized. call init_db() first")
+    async with _async_db_instance.get_session() as session:
+        yield session
+
+
+async def close_db():
+    if _async_db_instance is not None:
+        await _async_db_instance.engine.dispose()
+
+
+def init_live_clustering(
+    window_manager: WindowManager,
+    seed_chunk_size: int = 5000,
+    **clusterer_kwargs,
+) -> LiveClusterState:
+    """
+    create the process-wide incremental clusterers and seed them with
+    every stored post inside the widest (saturation) window
+    the window is streamed chunk by chunk, so besides the posts the live
+    store keeps only one chunk's rows and frame are alive at a time
+    """
+    global _live_state
+    live_state = LiveClusterState(window_manager, **clusterer_kwargs)
+
+    now = datetime.now()
+    window = window_manager.create_window(WindowType.saturation, now)
+    session = _db_instance.SessionLocal()
+    try:
+        for chunk in PostRepository(session).stream_posts_by_window(window.start, window.end, seed_chunk_size):
+            frame = PostFrame.from_rows(chunk)
+            live_state.apply_batch(frame.posts(range(len(frame))), now)
+    finally:
+        session.close()
+
+    _live_state = live_state
+    return live_state
+
+
+def get_live_state() -> Optional[LiveClusterState]:
+    return _live_state
+
+
+def init_recapture(
+    manager: IngestionManager,
+    budgets: Dict,
+    interval_minutes: float,
+    seed_chunk_size: int = 5000,
+    **scheduler_kwargs,
+) -> RecaptureScheduler:
+    """
+    create the recapture scheduler, track the stored posts young enough to
+    recapture, and start the task running a cycle every interval_minutes
+    call from the app's event loop (startup); ingested posts are tracked by
+    the ingest route
+    """
+    global _recapture, _recapture_manager, _recapture_task
+    scheduler = RecaptureScheduler(budgets, **scheduler_kwargs)
+
+    now = datetime.now()
+    session = _db_instance.SessionLocal()
+    try:
+        chunks = PostRepository(session).stream_posts_by_window(now - scheduler.max_age, now, seed_chunk_size)
+        for chunk in chunks:
+            frame = PostFrame.from_rows(chunk)
+            scheduler.track(frame.posts(range(len(frame))))
+    finally:
+        session.close()
+
+    _recapture = scheduler
+    _recapture_manager = manager
+    _recapture_task = asyncio.create_task(_recapture_loop(interval_minutes * 60.0))
+    return scheduler
+
+
+def get_recapture_scheduler() -> Optional[RecaptureScheduler]:
+    return _recapture
+
+
+async def run_recapture_cycle(now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    one recapture cycle: boost the posts in live clusters, recapture through
+    the async adapters, then save the results (recording their engagement
+    snapshots) and apply them to the live clusters
+    """
+    loop = asyncio.get_running_loop()
+    if _live_state is not None:
+        _recapture.mark_clustered(await loop.run_in_executor(None, _live_cluster_post_ids))
+
+    posts = await _recapture.run_cycle(_recapture_manager, now)
+    saved = {"inserted": 0, "updated": 0}
+    if posts:
+        async with _async_db_instance.get_session() as session:
+            saved = await AsyncPostRepository(session).save_posts(posts)
+        if _live_state is not None:
+            await loop.run_in_executor(None, _live_state.apply_batch, posts)
+    return {"recaptured": len(posts), **saved}
+
+
+def _live_cluster_post_ids() -> Set[str]:
+    return set(
+        post_id
+        for window_type in WindowType
+        for cluster in _live_state.clusters(window_type)
+        for post_id in cluster.post_ids
+    )
+
+
+async def _recapture_loop(interval_seconds: float):
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            counts = await run_recapture_cycle()
+            logger.info("recapture cycle", tracked=len(_recapture), **counts)
+        except Exception as e:
+            logger.error("recapture cycle failed", error=str(e))
+
+
+async def shutdown_recapture():
+    global _recapture, _recapture_manager, _recapture_task
+    if _recapture_task is not None:
+        _recapture_task.cancel()
+        try:
+            await _recapture_task
+        except asyncio.CancelledError:
+            pass
+    if _recapture_manager is not None:
+        for adapter in _recapture_manager.adapters.values():
+            if hasattr(adapter, "aclose"):
+                await adapter.aclose()
+    _recapture = _recapture_manager = _recapture_task = None
+
+
+def init_job_queue(database_url: str, **queue_kwargs) -> DiscoveryJobQueue:
+    """
+    start the discovery job queue, jobs run against the live state when
+    incremental clustering is enabled; a job that writes tiles invalidates
+    the tile cache
+    """
+    global _job_queue
+    queue_kwargs.setdefault("on_complete", _invalidate_tile_cache)
+    _job_queue = DiscoveryJobQueue(
+        database_url,
+        session_factory=_db_instance.SessionLocal,
+        live_state=_live_state,
+        **queue_kwargs,
+    )
+    return _job_queue
+
+
+def get_job_queue() -> DiscoveryJobQueue:
+    if _job_queue is None:
+        raise RuntimeError("job queue not initialized. call init_job_queue() first")
+    return _job_queue
+
+
+def shutdown_job_queue():
+    global _job_queue
+    if _job_queue is not None:
+        _job_queue.shutdown()
+        _job_queue = None
+
+
+def init_tile_cache(**cache_kwargs) -> ResponseCache:
+    global _tile_cache
+    _tile_cache = ResponseCache(namespace="tiles", **cache_kwargs)
+    return _tile_cache
+
+
+def get_tile_cache() -> Optional[ResponseCache]:
+    return _tile_cache
+
+
+async def close_tile_cache():
+    global _tile_cache
+    if _tile_cache is not None:
+        await _tile_cache.close()
+        _tile_cache = None
+
+
+def _invalidate_tile_cache(job, result):
+    if _tile_cache is not None and result["proof_tiles_generated"]:
+        _tile_cache.invalidate()
+
+
 def get_post_repository(session: Session = None) -> PostRepository:
     if session is None:
         session = next(get_db())
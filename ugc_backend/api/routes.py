@@ -1,37 +1,55 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import asyncio
+import base64
+import json
+import time
+from typing import List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+import orjson
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from sqlalchemy.ext.asyncio import AsyncSession
 from ugc_backend.api.schemas import (
     BulkIngestRequest,
     IngestResponse,
     DiscoveryRequest,
-    DiscoveryResponse,
+    DiscoveryJobResponse,
     ProofTilesResponse,
-    ProofTileResponse,
+    TrendMetrics,
+    SuggestedAction,
     TrendDetailResponse,
     HealthResponse,
 )
-from ugc_backend.api.dependencies import get_db
-from ugc_backend.core.models import TrendStatus, ContentPost, CreatorProfile, Platform, MarketRegion, ContentType, CreatorTier
-from ugc_backend.core.window import WindowManager, WindowType
-from ugc_backend.core.cluster import ClusteringEngine
-from ugc_backend.core.trend import TrendValidator
-from ugc_backend.core.proof_tile import ProofTileGenerator
-from ugc_backend.db.repository import PostRepository, ClusterRepository, TrendRepository, ProofTileRepository
+from ugc_backend.api.cache import CachedResponse
+from ugc_backend.api.dependencies import (
+    get_async_db,
+    get_live_state,
+    get_job_queue,
+    get_recapture_scheduler,
+    get_tile_cache,
+)
+from ugc_backend.core.models import TrendStatus, ContentPost, CreatorProfile
+from ugc_backend.core.window import WindowType
+from ugc_backend.db.async_repository import (
+    AsyncPostRepository,
+    AsyncClusterRepository,
+    AsyncTrendRepository,
+    AsyncProofTileRepository,
+)
+from ugc_backend.db.repository import TILE_COLUMNS, TILE_RAW_JSON_COLUMNS, TILE_SORTS
+from ugc_backend.utils.metrics import INGEST_BATCH_SIZE, INGEST_ROWS, INGEST_ROWS_PER_SECOND, REGISTRY, STORE
 from datetime import datetime
 
 router = APIRouter()
 
 
 @router.post("/api/v1/posts/ingest", response_model=IngestResponse)
-def ingest_posts(
+async def ingest_posts(
     request: BulkIngestRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if not request.posts:
         raise HTTPException(status_code=400, detail="no posts provided")
     
-    post_repo = PostRepository(db)
+    post_repo = AsyncPostRepository(db)
     
     posts = []
     for req_post in request.posts:
@@ -64,165 +82,203 @@ def ingest_posts(
         )
         posts.append(post)
 
-    ingested = post_repo.save_posts(posts)
+    start = time.perf_counter()
+    saved = await post_repo.save_posts(posts)
+    elapsed = time.perf_counter() - start
     total = len(posts)
+    INGEST_BATCH_SIZE.observe(total)
+    if elapsed > 0:
+        INGEST_ROWS_PER_SECOND.observe(total / elapsed)
+    INGEST_ROWS.labels("inserted").inc(saved["inserted"])
+    INGEST_ROWS.labels("updated").inc(saved["updated"])
+    STORE.add_posts(saved["inserted"])
 
-    return IngestResponse(ingested=ingested, total_posts=total)
+    live_state = get_live_state()
+    if live_state is not None:
+        await asyncio.get_running_loop().run_in_executor(None, live_state.apply_batch, posts)
 
+    scheduler = get_recapture_scheduler()
+    if scheduler is not None:
+        scheduler.track(posts)
 
-@router.post("/api/v1/discovery/run", response_model=DiscoveryResponse)
-def run_discovery(
-    request: DiscoveryRequest,
-    db: Session = Depends(get_db),
-):
+    return IngestResponse(
+        ingested=saved["inserted"],
+        updated=saved["updated"],
+        total_posts=total,
+    )
+
+
+@router.post("/api/v1/discovery/run", response_model=DiscoveryJobResponse, status_code=202)
+async def run_discovery(request: DiscoveryRequest, profile: bool = Query(False)):
+    """
+    enqueue a discovery job and return it right away, poll
+    /api/v1/discovery/jobs/{job_id} for stage progress, tile_ids and stage
+    timings; ?profile=1 also traces allocations and writes a cProfile dump
+    whose path comes back in the result
+    runs cover every platform in the window, platforms is only validated
+    """
     if not request.platforms:
         raise HTTPException(status_code=400, detail="no platforms specified")
     
-    post_repo = PostRepository(db)
-    cluster_repo = ClusterRepository(db)
-    trend_repo = TrendRepository(db)
-    tile_repo = ProofTileRepository(db)
-    
     try:
         window_type = WindowType(request.window_type)
     except ValueError:
         raise HTTPException(status_code=400, detail=f"invalid window_type: {request.window_type}")
-    
-    window_manager = WindowManager()
-    window = window_manager.create_window(window_type)
 
-    db_posts = post_repo.get_posts_by_window(window.start, window.end)
-    
-    posts = []
-    for db_post in db_posts:
-        creator = CreatorProfile(
-            creator_id=db_post.creator_id,
-            username=db_post.creator_username,
-            platform=Platform(db_post.platform),
-            follower_count=db_post.creator_follower_count,
-            avg_engagement_rate=0.0,
-            follower_growth_rate=0.0,
-            tier=CreatorTier(db_post.creator_tier),
-            region=MarketRegion(db_post.creator_region),
-        )
-        post = ContentPost(
-            post_id=db_post.post_id,
-            creator=creator,
-            platform=Platform(db_post.platform),
-            content_type=ContentType(db_post.content_type),
-            caption=db_post.caption,
-            hashtags=db_post.hashtags or [],
-            timestamp=db_post.timestamp,
-            views=db_post.views,
-            likes=db_post.likes,
-            comments=db_post.comments,
-            shares=db_post.shares,
-            saves=db_post.saves,
-            first_seen=db_post.first_seen,
-            last_captured=db_post.last_captured,
-            capture_count=db_post.capture_count,
-        )
-        posts.append(post)
+    job = get_job_queue().submit(window_type, request.min_confidence, profile=profile)
+    return DiscoveryJobResponse(**job.to_dict())
 
-    clustering_engine = ClusteringEngine()
-    clusters = clustering_engine.cluster_posts(posts)
-
-    validator = TrendValidator()
-    validated_count = 0
-    tile_ids = []
-    tile_generator = ProofTileGenerator()
-
-    for cluster in clusters:
-        signal = validator.validate_cluster(cluster, datetime.now())
-        
-        if signal.validation_confidence >= request.min_confidence:
-            cluster_repo.save_cluster(cluster)
-            trend_repo.save_trend(signal)
-            validated_count += 1
-
-            tile = tile_generator.generate(signal)
-            tile_repo.save_tile(tile)
-            tile_ids.append(tile.tile_id)
-
-    return DiscoveryResponse(
-        clusters_found=len(clusters),
-        trends_validated=validated_count,
-        proof_tiles_generated=len(tile_ids),
-        tile_ids=tile_ids,
-    )
+
+@router.get("/api/v1/discovery/jobs/{job_id}", response_model=DiscoveryJobResponse)
+async def get_discovery_job(job_id: str):
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return DiscoveryJobResponse(**job.to_dict())
 
 
 @router.get("/api/v1/tiles", response_model=ProofTilesResponse)
-def get_proof_tiles(
+async def get_proof_tiles(
+    request: Request,
     status: Optional[str] = Query(None),
     urgency: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    sort: str = Query("created_at"),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    tile_repo = ProofTileRepository(db)
+    """
+    one page of tiles, newest first or sorted by urgency /
+    validation_confidence; pass next_cursor back as cursor for the next
+    page. fields= (comma separated) selects only those tile columns, so
+    list views can leave example_posts / creator_samples in the database
+    served from the tile cache when enabled, keyed by the full query and
+    invalidated when a discovery job writes tiles; responses carry an ETag
+    and a matching If-None-Match gets an empty 304
+    """
+    if sort not in TILE_SORTS:
+        raise HTTPException(status_code=400, detail=f"invalid sort: {sort}")
+    columns = TILE_COLUMNS
+    if fields:
+        requested = set(name.strip() for name in fields.split(",") if name.strip())
+        unknown = requested - set(TILE_COLUMNS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(sorted(unknown))}")
+        columns = tuple(name for name in TILE_COLUMNS if name in requested)
+    after = _decode_cursor(cursor, sort) if cursor else None
+
+    cache = get_tile_cache()
+    key = str(request.query_params)
+    cached = await cache.get(key) if cache is not None else None
+
+    if cached is None:
+        generation = cache.generation if cache is not None else None
+        body = await _load_proof_tiles(db, status, urgency, sort, limit, after, columns)
+        if cache is not None:
+            cached = await cache.set(key, body, generation)
+        else:
+            cached = CachedResponse.from_body(body)
+
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if cached.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def _encode_cursor(row) -> str:
+    sort_key, created_at, tile_id = row[:3]
+    if isinstance(sort_key, datetime):
+        sort_key = sort_key.isoformat()
+    payload = json.dumps([sort_key, created_at.isoformat(), tile_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    try:
+        sort_key, created_at, tile_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(created_at)
+        if sort == "created_at":
+            sort_key = datetime.fromisoformat(sort_key)
+        return sort_key, created_at, int(tile_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+
+
+async def _load_proof_tiles(
+    db: AsyncSession,
+    status: Optional[str],
+    urgency: Optional[str],
+    sort: str,
+    limit: int,
+    after: Optional[tuple],
+    columns: Sequence[str],
+) -> bytes:
+    """
+    serialized page of tiles and the cursor of the next page
+    """
+    tile_repo = AsyncProofTileRepository(db)
     
     if status:
-        db_tiles = tile_repo.get_tiles_by_status(TrendStatus(status))
+        filters = {"status": TrendStatus(status).value}
     elif urgency:
-        db_tiles = tile_repo.get_tiles_by_urgency(urgency)
+        filters = {"urgency": urgency}
     else:
-        db_tiles = tile_repo.get_tiles_by_status(TrendStatus.validated)
+        filters = {"status": TrendStatus.validated.value}
 
-    from ugc_backend.api.schemas import TrendMetrics, SuggestedAction
-    
-    tiles = []
-    for db_tile in db_tiles:
-        metrics_dict = db_tile.metrics or {}
-        metrics = TrendMetrics(
-            total_engagement=metrics_dict.get("total_engagement", 0.0),
-            growth_rate_24h=metrics_dict.get("growth_rate_24h", 0.0),
-            saturation_estimate=metrics_dict.get("saturation_estimate", 0.0),
-            creator_replication=metrics_dict.get("creator_replication", 0.0),
-            detection_confidence=metrics_dict.get("detection_confidence", 0.0),
-            validation_confidence=metrics_dict.get("validation_confidence", 0.0),
-            cluster_health=metrics_dict.get("cluster_health", 0.0),
-            creator_diversity=metrics_dict.get("creator_diversity", 0.0),
-            engagement_strength=metrics_dict.get("engagement_strength", 0.0),
-            velocity_score=metrics_dict.get("velocity_score", 0.0),
-        )
-        
-        action_dict = db_tile.suggested_action or {}
-        suggested_action = SuggestedAction(
-            hashtags=action_dict.get("hashtags", []),
-            formats=action_dict.get("formats", []),
-            platforms=action_dict.get("platforms", []),
-        )
-        
-        tile = ProofTileResponse(
-            tile_id=db_tile.tile_id,
-            headline=db_tile.headline,
-            urgency=db_tile.urgency,
-            recommendation=db_tile.recommendation,
-            metrics=metrics,
-            suggested_action=suggested_action,
-            example_posts=db_tile.example_posts or [],
-            creator_samples=db_tile.creator_samples or [],
-            status=db_tile.status,
-            created_at=db_tile.created_at,
-            updated_at=db_tile.updated_at,
-        )
-        tiles.append(tile)
+    rows = await tile_repo.get_tiles_page(
+        sort=sort,
+        limit=limit + 1,
+        after=after,
+        columns=columns,
+        raw_json=True,
+        **filters,
+    )
+    next_cursor = _encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    tiles = [_tile_values(row, columns) for row in rows[:limit]]
+    return orjson.dumps({"tiles": tiles, "next_cursor": next_cursor})
 
-    return ProofTilesResponse(tiles=tiles)
+
+METRIC_FIELDS = tuple(TrendMetrics.model_fields)
+ACTION_FIELDS = tuple(SuggestedAction.model_fields)
+
+
+def _tile_values(row, columns: Sequence[str]) -> dict:
+    """
+    a ProofTileResponse as plain json-ready values, built straight from our
+    own rows without constructing and re-validating the pydantic models
+    metrics / suggested_action are normalized to their schema's keys,
+    example_posts / creator_samples arrive as stored json text and are
+    spliced into the output as is
+    """
+    values = {}
+    for name in columns:
+        value = getattr(row, name)
+        if name == "metrics":
+            metrics = value or {}
+            value = {field: float(metrics.get(field, 0.0)) for field in METRIC_FIELDS}
+        elif name == "suggested_action":
+            action = value or {}
+            value = {field: list(action.get(field, [])) for field in ACTION_FIELDS}
+        elif name in TILE_RAW_JSON_COLUMNS:
+            value = orjson.Fragment(value or "[]")
+        values[name] = value
+    return values
 
 
 @router.get("/api/v1/trends/{trend_id}", response_model=TrendDetailResponse)
-def get_trend_details(
+async def get_trend_details(
     trend_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    trend_repo = TrendRepository(db)
-    cluster_repo = ClusterRepository(db)
+    trend_repo = AsyncTrendRepository(db)
+    cluster_repo = AsyncClusterRepository(db)
     
-    trend = trend_repo.get_trend(trend_id)
+    trend = await trend_repo.get_trend(trend_id)
     if not trend:
         raise HTTPException(status_code=404, detail="trend not found")
 
-    cluster = cluster_repo.get_cluster(trend.cluster_id)
+    cluster = await cluster_repo.get_cluster(trend.cluster_id)
     if not cluster:
         raise HTTPException(status_code=404, detail="cluster not found")
 
@@ -257,27 +313,39 @@ def get_trend_details(
     )
 
 
-@router.get("/api/v1/health", response_model=HealthResponse)
-def health_check(db: Session = Depends(get_db)):
-    from ugc_backend.db.models import PostModel, TrendModel, ProofTileModel
-    
+@router.get("/metrics")
+async def metrics():
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+async def _refresh_store_counters(db: AsyncSession):
     try:
-        total_posts = db.query(PostModel).count()
+        total_posts = await AsyncPostRepository(db).count_posts()
     except:
         total_posts = 0
 
     try:
-        active_trends = db.query(TrendModel).filter(
-            TrendModel.status.in_([TrendStatus.validated.value, TrendStatus.validating.value])
-        ).count()
+        active_trends = await AsyncTrendRepository(db).count_active_trends()
     except:
         active_trends = 0
 
     try:
-        tiles_count = db.query(ProofTileModel).filter_by(status=TrendStatus.validated.value).count()
+        tiles_count = await AsyncProofTileRepository(db).count_tiles(TrendStatus.validated)
     except:
         tiles_count = 0
 
+    STORE.update(total_posts, active_trends, tiles_count)
+
+
+@router.get("/api/v1/health", response_model=HealthResponse)
+async def health_check(db: AsyncSession = Depends(get_async_db)):
+    """
+    counts come from the in-process store counters, the tables are only
+    recounted when a discovery run or max_age made the counters stale
+    """
+    if STORE.stale:
+        await _refresh_store_counters(db)
+
     return HealthResponse(
         status="healthy",
         version="1.0",
@@ -288,9 +356,9 @@ def health_check(db: Session = Depends(get_db)):
             "generation": "operational",
         },
         metrics={
-            "total_posts": total_posts,
-            "active_clusters": 0,
-            "validated_trends": active_trends,
-            "proof_tiles": tiles_count,
+            "total_posts": STORE.posts,
+            "active_clusters": STORE.active_clusters,
+            "validated_trends": STORE.trends,
+            "proof_tiles": STORE.tiles,
         },
     )
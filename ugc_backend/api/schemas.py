@@ -28,6 +28,7 @@ class BulkIngestRequest(BaseModel):
 
 class IngestResponse(BaseModel):
     ingested: int
+    updated: int = 0
     total_posts: int
 
 
@@ -37,11 +38,55 @@ class DiscoveryRequest(BaseModel):
     min_confidence: float = Field(default=0.7, ge=0.0, le=1.0)
 
 
+class StageTiming(BaseModel):
+    stage: str
+    wall_ms: float
+    cpu_ms: float
+    items: int = 0
+    rss_growth_mb: Optional[float] = None
+    process_peak_rss_mb: float
+    peak_alloc_mb: Optional[float] = None
+
+
+class HashtagFilterStats(BaseModel):
+    posts: int
+    hashtags: int
+    hashtags_kept: int
+    dropped_rare: int
+    dropped_common: int
+    dropped_stoplist: int
+    occurrences_dropped: int
+    posts_emptied: int
+
+
 class DiscoveryResponse(BaseModel):
     clusters_found: int
     trends_validated: int
     proof_tiles_generated: int
     tile_ids: List[str]
+    timings: Optional[List[StageTiming]] = None
+    hashtag_filter: Optional[HashtagFilterStats] = None
+    profile_path: Optional[str] = None
+
+
+class DiscoveryStageProgress(BaseModel):
+    stage: str
+    status: str
+    items: int = 0
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class DiscoveryJobResponse(BaseModel):
+    job_id: str
+    status: str
+    window_type: str
+    min_confidence: float
+    stages: List[DiscoveryStageProgress]
+    result: Optional[DiscoveryResponse] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
 
 
 class TrendMetrics(BaseModel):
@@ -78,7 +123,12 @@ class ProofTileResponse(BaseModel):
 
 
 class ProofTilesResponse(BaseModel):
+    """
+    with fields= each tile only carries the requested keys
+    next_cursor is set while more tiles follow
+    """
     tiles: List[ProofTileResponse]
+    next_cursor: Optional[str] = None
 
 
 class TrendDetailResponse(BaseModel):
@@ -1,13 +1,32 @@
-from typing import List, Dict, Set, Optional
+import hashlib
+from typing import List, Dict, Set, Optional, Sequence, Iterable
 from collections import defaultdict
 from dataclasses import dataclass
+import numpy as np
 from ugc_backend.core.models import ContentPost
-from ugc_backend.core.metrics import (
-    calculate_cluster_health,
-    calculate_creator_diversity,
-    calculate_detection_confidence,
-)
+from ugc_backend.core.frame import PostFrame, PLATFORMS, REGIONS, CONTENT_TYPES
+from ugc_backend.core.cooccurrence import calculate_cooccurrence
+from ugc_backend.core.hashtag_filter import HashtagFilter, Threshold
+from ugc_backend.core.lsh import lsh_similar_groups
+from ugc_backend.core.parallel import parallel_lsh_similar_groups
+from ugc_backend.core.vocab import hashtag_vocabulary, creator_vocabulary
+from ugc_backend.core.metrics import batch_cluster_metrics
+from ugc_backend.core.snapshot import EngagementDelta
 from ugc_backend.utils.exceptions import ClusteringError
+from ugc_backend.utils.profiling import profile_stage
+
+
+MERGE_MODES = ("auto", "exact", "lsh")
+
+
+def content_cluster_id(namespace: str, primary_hashtags: Iterable[str]) -> str:
+    """
+    id derived from what a cluster is about (its primary hashtags within a
+    namespace such as the window type) instead of its position in one run,
+    so re-running discovery updates the same rows
+    """
+    key = "\x1f".join([namespace, *sorted(primary_hashtags)])
+    return f"cluster_{hashlib.sha1(key.encode()).hexdigest()[:16]}"
 
 
 @dataclass
@@ -22,23 +41,102 @@ class ClusterHealth:
 
 
 class Cluster:
-    def __init__(self, cluster_id: str, posts: List[ContentPost], primary_hashtags: List[str]):
+    def __init__(
+        self,
+        cluster_id: str,
+        posts: Optional[List[ContentPost]],
+        primary_hashtags: List[str],
+        frame: Optional[PostFrame] = None,
+        rows: Optional[Sequence[int]] = None,
+    ):
+        """
+        a cluster is a set of rows in a PostFrame
+        passing posts directly builds a frame from them; engine-built
+        clusters share the window's frame and only materialize ContentPost
+        objects when .posts is read
+        """
+        if frame is None:
+            posts = list(posts or [])
+            frame = PostFrame.from_posts(posts)
+            rows = range(len(posts))
         self.cluster_id = cluster_id
-        self.posts = posts
+        self.frame = frame
+        self.rows = np.asarray(rows, dtype=np.int64)
         self.primary_hashtags = primary_hashtags
+        self._posts: Optional[List[ContentPost]] = posts
         self._health: Optional[ClusterHealth] = None
 
+    @classmethod
+    def from_frame(
+        cls,
+        cluster_id: str,
+        frame: PostFrame,
+        rows: Sequence[int],
+        primary_hashtags: List[str],
+    ) -> "Cluster":
+        return cls(cluster_id, None, primary_hashtags, frame=frame, rows=rows)
+
+    def copy(self) -> "Cluster":
+        """
+        the same rows of the same frame, with its own id and health so a
+        discovery run can re-key and rescore it without touching the original
+        """
+        clone = Cluster.from_frame(self.cluster_id, self.frame, self.rows, list(self.primary_hashtags))
+        clone._posts = self._posts
+        clone._health = self._health
+        return clone
+
+    @property
+    def posts(self) -> List[ContentPost]:
+        if self._posts is None:
+            self._posts = self.frame.posts(self.rows)
+        return self._posts
+
+    @property
+    def post_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def post_ids(self) -> List[str]:
+        post_ids = self.frame.post_ids
+        return [post_ids[row] for row in self.rows.tolist()]
+
+    @property
+    def unique_creator_keys(self) -> Set[int]:
+        return set(np.unique(self.frame.creator_keys[self.rows]).tolist())
+
     @property
     def unique_creators(self) -> Set[str]:
-        return set(post.creator.creator_id for post in self.posts)
+        return set(creator_vocabulary.lookup_many(self.unique_creator_keys))
+
+    @property
+    def creator_count(self) -> int:
+        return len(np.unique(self.frame.creator_keys[self.rows]))
 
     @property
     def platforms(self) -> Set[str]:
-        return set(post.platform.value for post in self.posts)
+        return set(PLATFORMS[code].value for code in np.unique(self.frame.platform[self.rows]))
 
     @property
     def regions(self) -> Set[str]:
-        return set(post.creator.region.value for post in self.posts)
+        return set(REGIONS[code].value for code in np.unique(self.frame.region[self.rows]))
+
+    @property
+    def content_types(self) -> Set[str]:
+        return set(CONTENT_TYPES[code].value for code in np.unique(self.frame.content_type[self.rows]))
+
+    @property
+    def total_engagement(self) -> int:
+        return int(self.frame.total_engagement[self.rows].sum())
+
+    def top_posts(self, limit: int) -> List[ContentPost]:
+        """
+        highest total_engagement posts, ties kept in cluster order
+        only these rows are materialized as ContentPost
+        """
+        engagement = self.frame.total_engagement[self.rows]
+        order = np.argsort(-engagement, kind="stable")[:limit]
+        return self.frame.posts(self.rows[order])
 
     def calculate_health(
         self,
@@ -47,39 +145,72 @@ class Cluster:
         velocity_weight: float = 0.3,
     ) -> ClusterHealth:
         if self._health is None:
-            from ugc_backend.core.metrics import (
-                calculate_engagement_strength,
-                calculate_velocity_score,
-                normalize_velocity,
-            )
-
-            diversity = calculate_creator_diversity(self.posts)
-            engagement = calculate_engagement_strength(self.posts)
-            
-            velocities = [calculate_velocity_score(post) for post in self.posts]
-            avg_velocity = sum(velocities) / len(velocities) if velocities else 0.0
-            velocity_norm = normalize_velocity(avg_velocity)
-
-            health_score = calculate_cluster_health(
-                self.posts,
+            calculate_cluster_healths(
+                [self],
                 creator_diversity_weight,
                 engagement_strength_weight,
                 velocity_weight,
             )
+        return self._health
 
-            detection_conf = calculate_detection_confidence(health_score, diversity)
-
-            self._health = ClusterHealth(
-                health_score=health_score,
-                creator_diversity=diversity,
-                engagement_strength=engagement,
-                velocity_score=avg_velocity,
-                detection_confidence=detection_conf,
-                post_count=len(self.posts),
-                creator_count=len(self.unique_creators),
-            )
 
-        return self._health
+def calculate_cluster_healths(
+    clusters: List[Cluster],
+    creator_diversity_weight: float = 0.4,
+    engagement_strength_weight: float = 0.3,
+    velocity_weight: float = 0.3,
+    deltas: Optional[Dict[str, EngagementDelta]] = None,
+):
+    """
+    compute and cache health for clusters in one batch_cluster_metrics pass
+    per frame they share instead of one pass per cluster
+    deltas: post_id -> 24h snapshot growth, see batch_cluster_metrics
+    """
+    by_frame: Dict[int, List[Cluster]] = {}
+    for cluster in clusters:
+        by_frame.setdefault(id(cluster.frame), []).append(cluster)
+    for group in by_frame.values():
+        _calculate_frame_healths(
+            group,
+            creator_diversity_weight,
+            engagement_strength_weight,
+            velocity_weight,
+            deltas,
+        )
+
+
+def _calculate_frame_healths(
+    clusters: List[Cluster],
+    creator_diversity_weight: float,
+    engagement_strength_weight: float,
+    velocity_weight: float,
+    deltas: Optional[Dict[str, EngagementDelta]],
+):
+    frame = clusters[0].frame
+    rows = np.concatenate([cluster.rows for cluster in clusters])
+    offsets = np.zeros(len(clusters) + 1, dtype=np.int64)
+    np.cumsum([cluster.post_count for cluster in clusters], out=offsets[1:])
+
+    metrics = batch_cluster_metrics(
+        frame,
+        rows,
+        offsets,
+        creator_diversity_weight,
+        engagement_strength_weight,
+        velocity_weight,
+        deltas=deltas,
+    )
+
+    for idx, cluster in enumerate(clusters):
+        cluster._health = ClusterHealth(
+            health_score=float(metrics["health_score"][idx]),
+            creator_diversity=float(metrics["creator_diversity"][idx]),
+            engagement_strength=float(metrics["engagement_strength"][idx]),
+            velocity_score=float(metrics["velocity_score"][idx]),
+            detection_confidence=float(metrics["detection_confidence"][idx]),
+            post_count=int(metrics["post_count"][idx]),
+            creator_count=int(metrics["creator_count"][idx]),
+        )
 
 
 class ClusteringEngine:
@@ -91,109 +222,196 @@ class ClusteringEngine:
         creator_diversity_weight: float = 0.4,
         engagement_strength_weight: float = 0.3,
         velocity_weight: float = 0.3,
+        merge_mode: str = "auto",
+        lsh_min_clusters: int = 2000,
+        min_hashtag_df: Threshold = 1,
+        max_hashtag_df: Threshold = 1.0,
+        hashtag_stoplist: Optional[Iterable[str]] = None,
+        workers: int = 1,
+        parallel_min_clusters: int = 20000,
     ):
+        """
+        min_hashtag_df / max_hashtag_df / hashtag_stoplist configure the
+        HashtagFilter run before indexing (see core/hashtag_filter.py), the
+        defaults only drop the stoplist; last_filter_stats holds the latest
+        cluster_frame's drop counts
+        with workers > 1, lsh merges of at least parallel_min_clusters
+        candidate clusters verify their buckets on a process pool (see
+        core/parallel.py); clusters and cluster ids come out the same as
+        with workers=1
+        """
+        if merge_mode not in MERGE_MODES:
+            raise ValueError(f"unknown merge_mode: {merge_mode}")
         self.min_shared_hashtags = min_shared_hashtags
         self.min_posts_per_cluster = min_posts_per_cluster
         self.hashtag_similarity = hashtag_similarity
         self.creator_diversity_weight = creator_diversity_weight
         self.engagement_strength_weight = engagement_strength_weight
         self.velocity_weight = velocity_weight
+        self.merge_mode = merge_mode
+        self.lsh_min_clusters = lsh_min_clusters
+        self.workers = workers
+        self.parallel_min_clusters = parallel_min_clusters
+        self.hashtag_filter = HashtagFilter(min_hashtag_df, max_hashtag_df, hashtag_stoplist)
+        self.last_filter_stats: Optional[Dict[str, int]] = None
 
     def cluster_posts(self, posts: List[ContentPost]) -> List[Cluster]:
+        """
+        cluster a list of posts, see cluster_frame
+        """
+        if not posts:
+            return []
+
+        try:
+            frame = PostFrame.from_posts(posts)
+        except Exception as e:
+            raise ClusteringError(f"failed to cluster posts: {str(e)}") from e
+        return self.cluster_frame(frame)
+
+    def cluster_frame(
+        self,
+        frame: PostFrame,
+        document_frequency: Optional[Dict[str, int]] = None,
+        deltas: Optional[Dict[str, EngagementDelta]] = None,
+    ) -> List[Cluster]:
         """
         rule-based hashtag clustering algorithm (fully transparent):
+        0. drop rare, ubiquitous and stoplisted hashtags
         1. build hashtag index (which posts have which tags)
         2. find hashtags appearing frequently together
         3. group posts sharing significant hashtags
         4. calculate cluster health metrics
+        each step is recorded as a cluster.* stage on the active profiler
+        document_frequency: hashtag -> posts in the frame's window, counted
+        by the database, so step 0 skips counting over the frame
+        deltas: post_id -> 24h snapshot growth, step 4 scores velocity on it
         """
-        if not posts:
+        if len(frame) == 0:
             return []
         
         try:
-            hashtag_index = self._build_hashtag_index(posts)
-            cooccurrence = self._calculate_hashtag_cooccurrence(hashtag_index)
-            clusters = self._group_posts_by_hashtags(
-                posts,
-                hashtag_index,
-                cooccurrence,
-            )
+            with profile_stage("cluster.filter", len(frame)):
+                hashtag_lists, self.last_filter_stats = self.hashtag_filter.apply(frame, document_frequency)
+            with profile_stage("cluster.index", len(frame)):
+                hashtag_index = self._build_hashtag_index(frame, hashtag_lists)
+            with profile_stage("cluster.cooccurrence", len(hashtag_index)):
+                cooccurrence = self._calculate_hashtag_cooccurrence(hashtag_index)
+            with profile_stage("cluster.group", len(cooccurrence)) as record:
+                clusters = self._group_posts_by_hashtags(
+                    frame,
+                    hashtag_index,
+                    cooccurrence,
+                    hashtag_lists,
+                )
+                if record is not None:
+                    record.items = len(clusters)
 
             cluster_objects = []
-            for idx, (hashtags, cluster_posts) in enumerate(clusters.items()):
-                if len(cluster_posts) < self.min_posts_per_cluster:
-                    continue
-
-                cluster = Cluster(
-                    cluster_id=f"cluster_{idx:08x}",
-                    posts=cluster_posts,
-                    primary_hashtags=sorted(hashtags),
-                )
-                cluster.calculate_health(
+            with profile_stage("cluster.build", len(clusters)):
+                for idx, (hashtags, rows) in enumerate(clusters.items()):
+                    if len(rows) < self.min_posts_per_cluster:
+                        continue
+
+                    cluster = Cluster.from_frame(
+                        cluster_id=f"cluster_{idx:08x}",
+                        frame=frame,
+                        rows=rows,
+                        primary_hashtags=sorted(hashtag_vocabulary.lookup_many(hashtags)),
+                    )
+                    cluster_objects.append(cluster)
+
+            with profile_stage("cluster.health", len(cluster_objects)):
+                calculate_cluster_healths(
+                    cluster_objects,
                     self.creator_diversity_weight,
                     self.engagement_strength_weight,
                     self.velocity_weight,
+                    deltas,
                 )
-                cluster_objects.append(cluster)
 
             return cluster_objects
         except Exception as e:
             raise ClusteringError(f"failed to cluster posts: {str(e)}") from e
 
-    def _build_hashtag_index(self, posts: List[ContentPost]) -> Dict[str, List[ContentPost]]:
+    def _build_hashtag_index(
+        self,
+        frame: PostFrame,
+        hashtag_lists: Optional[List[List[int]]] = None,
+    ) -> Dict[int, List[int]]:
+        """
+        hashtag id (see core/vocab.py) -> frame rows carrying it
+        hashtag_lists overrides the frame's tags, e.g. after filtering
+        """
+        if hashtag_lists is None:
+            hashtag_lists = frame.hashtag_lists()
         index = defaultdict(list)
-        for post in posts:
-            for hashtag in post.hashtags:
-                index[hashtag].append(post)
+        for row, hashtag_ids in enumerate(hashtag_lists):
+            for hashtag_id in hashtag_ids:
+                index[hashtag_id].append(row)
         return dict(index)
 
     def _calculate_hashtag_cooccurrence(
         self,
-        hashtag_index: Dict[str, List[ContentPost]],
+        hashtag_index: Dict[int, List[int]],
     ) -> Dict[tuple, int]:
-        cooccurrence = defaultdict(int)
-        hashtags = list(hashtag_index.keys())
-
-        for i, tag1 in enumerate(hashtags):
-            for tag2 in hashtags[i + 1:]:
-                posts1 = set(post.post_id for post in hashtag_index[tag1])
-                posts2 = set(post.post_id for post in hashtag_index[tag2])
-                shared = len(posts1 & posts2)
-                if shared >= self.min_shared_hashtags:
-                    cooccurrence[(tag1, tag2)] = shared
-
-        return dict(cooccurrence)
+        return calculate_cooccurrence(hashtag_index, self.min_shared_hashtags)
 
     def _group_posts_by_hashtags(
         self,
-        posts: List[ContentPost],
-        hashtag_index: Dict[str, List[ContentPost]],
+        frame: PostFrame,
+        hashtag_index: Dict[int, List[int]],
         cooccurrence: Dict[tuple, int],
-    ) -> Dict[frozenset, List[ContentPost]]:
-        clusters: Dict[frozenset, Set[ContentPost]] = defaultdict(set)
+        hashtag_lists: Optional[List[List[int]]] = None,
+    ) -> Dict[frozenset, List[int]]:
+        clusters: Dict[frozenset, Set[int]] = defaultdict(set)
+        row_sets: Dict[int, Set[int]] = {}
 
         for (tag1, tag2), count in cooccurrence.items():
             if count >= self.min_shared_hashtags:
                 cluster_key = frozenset([tag1, tag2])
-                posts1 = set(hashtag_index[tag1])
-                posts2 = set(hashtag_index[tag2])
-                clusters[cluster_key].update(posts1 & posts2)
-
-        for post in posts:
-            if len(post.hashtags) >= self.min_shared_hashtags:
-                post_tags = frozenset(post.hashtags)
+                for tag in (tag1, tag2):
+                    if tag not in row_sets:
+                        row_sets[tag] = set(hashtag_index[tag])
+                clusters[cluster_key].update(row_sets[tag1] & row_sets[tag2])
+
+        if hashtag_lists is None:
+            hashtag_lists = frame.hashtag_lists()
+        for row, hashtag_ids in enumerate(hashtag_lists):
+            if len(hashtag_ids) >= self.min_shared_hashtags:
+                post_tags = frozenset(hashtag_ids)
                 if post_tags not in clusters:
                     clusters[post_tags] = set()
-                clusters[post_tags].add(post)
+                clusters[post_tags].add(row)
 
-        merged_clusters = self._merge_overlapping_clusters(clusters)
+        with profile_stage("cluster.merge", len(clusters)):
+            merged_clusters = self._merge_overlapping_clusters(clusters)
 
-        return {tags: list(posts) for tags, posts in merged_clusters.items()}
+        return {tags: sorted(rows) for tags, rows in merged_clusters.items()}
 
     def _merge_overlapping_clusters(
         self,
-        clusters: Dict[frozenset, Set[ContentPost]],
-    ) -> Dict[frozenset, Set[ContentPost]]:
+        clusters: Dict[frozenset, Set[int]],
+    ) -> Dict[frozenset, Set[int]]:
+        """
+        merge modes:
+        - exact: linear scan, each cluster joins the first merged cluster
+          with jaccard >= hashtag_similarity (order dependent, quadratic)
+        - lsh: minhash + banded lsh candidates, verified with exact jaccard
+          and unioned, so merges are transitive and order independent
+        - auto: exact below lsh_min_clusters candidate clusters, lsh above
+        """
+        mode = self.merge_mode
+        if mode == "auto":
+            mode = "lsh" if len(clusters) >= self.lsh_min_clusters else "exact"
+
+        if mode == "lsh":
+            return self._merge_overlapping_clusters_lsh(clusters)
+        return self._merge_overlapping_clusters_exact(clusters)
+
+    def _merge_overlapping_clusters_exact(
+        self,
+        clusters: Dict[frozenset, Set[int]],
+    ) -> Dict[frozenset, Set[int]]:
         merged = {}
         cluster_list = list(clusters.items())
 
@@ -214,3 +432,30 @@ class ClusteringEngine:
                 merged[tags] = posts
 
         return merged
+
+    def _merge_overlapping_clusters_lsh(
+        self,
+        clusters: Dict[frozenset, Set[int]],
+    ) -> Dict[frozenset, Set[int]]:
+        """
+        each merged group is keyed by its earliest member's tags, the same
+        key the exact scan would keep for a group it merged
+        """
+        cluster_list = list(clusters.items())
+        tag_sets = [tags for tags, _ in cluster_list]
+        if self.workers > 1 and len(cluster_list) >= self.parallel_min_clusters:
+            groups = parallel_lsh_similar_groups(tag_sets, self.hashtag_similarity, self.workers)
+        else:
+            groups = lsh_similar_groups(tag_sets, self.hashtag_similarity)
+
+        merged = {}
+        root_tags = {}
+        for idx, (tags, posts) in enumerate(cluster_list):
+            root = groups.find(idx)
+            if root == idx:
+                root_tags[idx] = tags
+                merged[tags] = set(posts)
+            else:
+                merged[root_tags[root]].update(posts)
+
+        return merged
@@ -0,0 +1,49 @@
+from collections import Counter, defaultdict
+from itertools import combinations
+from typing import Dict, Hashable, Iterable, List, Set
+
+
+def count_tag_pairs(post_tag_ids: Iterable[Iterable[int]]) -> Counter:
+    """
+    sparse co-occurrence counts over integer tag ids
+    walks each post's own tag list once and enumerates its pairs,
+    so cost is Σ(tags_per_post²) instead of T² over all distinct tags
+
+    keys are (low_id, high_id) tuples, values are the number of posts
+    carrying both tags. duplicate tags within a post are counted once
+    """
+    counts: Counter = Counter()
+    for tag_ids in post_tag_ids:
+        unique = sorted(set(tag_ids))
+        if len(unique) > 1:
+            counts.update(combinations(unique, 2))
+    return counts
+
+
+def calculate_cooccurrence(
+    hashtag_index: Dict[Hashable, List],
+    min_shared: int,
+) -> Dict[tuple, int]:
+    """
+    inverted-index co-occurrence:
+    1. assign each hashtag a dense id in index order
+    2. collect each post's tag ids (index values identify posts, e.g. frame rows)
+    3. count pairs per post and keep those shared by min_shared+ posts
+
+    output matches the pairwise scan it replaces: keys are (tag1, tag2) with
+    tag1 before tag2 in index order, and dict order follows that same order
+    """
+    tags = list(hashtag_index.keys())
+
+    post_tags: Dict[Hashable, Set[int]] = defaultdict(set)
+    for tag_id, tag in enumerate(tags):
+        for post in hashtag_index[tag]:
+            post_tags[post].add(tag_id)
+
+    pair_counts = count_tag_pairs(post_tags.values())
+
+    return {
+        (tags[a], tags[b]): count
+        for (a, b), count in sorted(pair_counts.items())
+        if count >= min_shared
+    }
@@ -0,0 +1,357 @@
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from ugc_backend.core.models import (
+    ContentPost,
+    CreatorProfile,
+    Platform,
+    ContentType,
+    MarketRegion,
+    CreatorTier,
+)
+from ugc_backend.core.vocab import hashtag_vocabulary, creator_vocabulary
+
+
+PLATFORMS = tuple(Platform)
+CONTENT_TYPES = tuple(ContentType)
+REGIONS = tuple(MarketRegion)
+TIERS = tuple(CreatorTier)
+
+_PLATFORM_CODES = {member.value: code for code, member in enumerate(PLATFORMS)}
+_CONTENT_TYPE_CODES = {member.value: code for code, member in enumerate(CONTENT_TYPES)}
+_REGION_CODES = {member.value: code for code, member in enumerate(REGIONS)}
+_TIER_CODES = {member.value: code for code, member in enumerate(TIERS)}
+
+COUNTER_COLUMNS = ("views", "likes", "comments", "shares", "saves")
+
+
+class PostFrame:
+    """
+    columnar batch of posts for one discovery window
+    - counters are int64 arrays, timestamps are datetime64[us]
+    - platform / content_type / region / tier are int8 codes into the enum tuples above
+    - creators are creator_vocabulary ids, hashtags are csr arrays of
+      hashtag_vocabulary ids (row i owns hashtag_ids[hashtag_offsets[i]:hashtag_offsets[i + 1]])
+    ContentPost objects are only built on demand via post(row)
+    """
+
+    def __init__(
+        self,
+        post_ids: List[str],
+        creator_keys: np.ndarray,
+        platform: np.ndarray,
+        content_type: np.ndarray,
+        region: np.ndarray,
+        tier: np.ndarray,
+        views: np.ndarray,
+        likes: np.ndarray,
+        comments: np.ndarray,
+        shares: np.ndarray,
+        saves: np.ndarray,
+        timestamp: np.ndarray,
+        first_seen: np.ndarray,
+        last_captured: np.ndarray,
+        capture_count: np.ndarray,
+        hashtag_offsets: np.ndarray,
+        hashtag_ids: np.ndarray,
+        captions: List[str],
+        creator_usernames: List[str],
+        creator_follower_counts: np.ndarray,
+        posts: Optional[List[ContentPost]] = None,
+    ):
+        self.post_ids = post_ids
+        self.creator_keys = creator_keys
+        self.platform = platform
+        self.content_type = content_type
+        self.region = region
+        self.tier = tier
+        self.views = views
+        self.likes = likes
+        self.comments = comments
+        self.shares = shares
+        self.saves = saves
+        self.timestamp = timestamp
+        self.first_seen = first_seen
+        self.last_captured = last_captured
+        self.capture_count = capture_count
+        self.hashtag_offsets = hashtag_offsets
+        self.hashtag_ids = hashtag_ids
+        self.captions = captions
+        self.creator_usernames = creator_usernames
+        self.creator_follower_counts = creator_follower_counts
+        self._posts = posts
+        self._materialized: Dict[int, ContentPost] = {}
+
+    def __len__(self) -> int:
+        return len(self.post_ids)
+
+    @property
+    def total_engagement(self) -> np.ndarray:
+        return self.likes + self.comments + self.shares + self.saves
+
+    def hashtags_of(self, row: int) -> np.ndarray:
+        return self.hashtag_ids[self.hashtag_offsets[row]:self.hashtag_offsets[row + 1]]
+
+    def hashtag_lists(self) -> List[List[int]]:
+        flat = self.hashtag_ids.tolist()
+        offsets = self.hashtag_offsets.tolist()
+        return [flat[offsets[i]:offsets[i + 1]] for i in range(len(self))]
+
+    def post(self, row: int) -> ContentPost:
+        """
+        materialize one row as a ContentPost
+        frames built from posts hand back the original object
+        """
+        row = int(row)
+        if self._posts is not None:
+            return self._posts[row]
+
+        post = self._materialized.get(row)
+        if post is None:
+            platform = PLATFORMS[self.platform[row]]
+            creator = CreatorProfile(
+                creator_id=creator_vocabulary.lookup(int(self.creator_keys[row])),
+                username=self.creator_usernames[row],
+                platform=platform,
+                follower_count=int(self.creator_follower_counts[row]),
+                avg_engagement_rate=0.0,
+                follower_growth_rate=0.0,
+                tier=TIERS[self.tier[row]],
+                region=REGIONS[self.region[row]],
+            )
+            post = ContentPost(
+                post_id=self.post_ids[row],
+                creator=creator,
+                platform=platform,
+                content_type=CONTENT_TYPES[self.content_type[row]],
+                caption=self.captions[row],
+                hashtags=hashtag_vocabulary.lookup_many(self.hashtags_of(row).tolist()),
+                timestamp=self.timestamp[row].item(),
+                views=int(self.views[row]),
+                likes=int(self.likes[row]),
+                comments=int(self.comments[row]),
+                shares=int(self.shares[row]),
+                saves=int(self.saves[row]),
+                first_seen=self.first_seen[row].item(),
+                last_captured=self.last_captured[row].item(),
+                capture_count=int(self.capture_count[row]),
+            )
+            self._materialized[row] = post
+        return post
+
+    def posts(self, rows: Iterable[int]) -> List[ContentPost]:
+        return [self.post(row) for row in rows]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable) -> "PostFrame":
+        """
+        build from PostRepository results (PostModel objects or selected rows)
+        without creating any pydantic objects
+        """
+        columns = _ColumnBuilder()
+        for row in rows:
+            columns.append(
+                post_id=row.post_id,
+                creator_id=row.creator_id,
+                creator_username=row.creator_username,
+                creator_follower_count=row.creator_follower_count,
+                creator_tier=row.creator_tier,
+                creator_region=row.creator_region,
+                platform=row.platform,
+                content_type=row.content_type,
+                caption=row.caption,
+                hashtags=row.hashtags or [],
+                timestamp=row.timestamp,
+                views=row.views,
+                likes=row.likes,
+                comments=row.comments,
+                shares=row.shares,
+                saves=row.saves,
+                first_seen=row.first_seen,
+                last_captured=row.last_captured,
+                capture_count=row.capture_count,
+            )
+        return columns.build()
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Iterable]) -> "PostFrame":
+        """
+        build from a stream of row chunks (see PostRepository.stream_posts_by_window)
+        each chunk becomes numpy columns before the next one is read, so only
+        one chunk of python row objects is alive at a time
+        """
+        return cls.concat([cls.from_rows(chunk) for chunk in chunks])
+
+    @classmethod
+    def concat(cls, frames: Sequence["PostFrame"]) -> "PostFrame":
+        """
+        stack frames row-wise, rows keep their order
+        """
+        if len(frames) == 1:
+            return frames[0]
+        if not frames:
+            return _ColumnBuilder().build()
+
+        offsets = [np.zeros(1, dtype=np.int64)]
+        base = 0
+        for frame in frames:
+            offsets.append(frame.hashtag_offsets[1:] + base)
+            base += int(frame.hashtag_offsets[-1])
+
+        def stack(name: str) -> np.ndarray:
+            return np.concatenate([getattr(frame, name) for frame in frames])
+
+        def chain(name: str) -> list:
+            return [value for frame in frames for value in getattr(frame, name)]
+
+        return cls(
+            post_ids=chain("post_ids"),
+            creator_keys=stack("creator_keys"),
+            platform=stack("platform"),
+            content_type=stack("content_type"),
+            region=stack("region"),
+            tier=stack("tier"),
+            views=stack("views"),
+            likes=stack("likes"),
+            comments=stack("comments"),
+            shares=stack("shares"),
+            saves=stack("saves"),
+            timestamp=stack("timestamp"),
+            first_seen=stack("first_seen"),
+            last_captured=stack("last_captured"),
+            capture_count=stack("capture_count"),
+            hashtag_offsets=np.concatenate(offsets),
+            hashtag_ids=stack("hashtag_ids"),
+            captions=chain("captions"),
+            creator_usernames=chain("creator_usernames"),
+            creator_follower_counts=stack("creator_follower_counts"),
+        )
+
+    @classmethod
+    def from_posts(cls, posts: Sequence[ContentPost]) -> "PostFrame":
+        columns = _ColumnBuilder()
+        for post in posts:
+            columns.append(
+                post_id=post.post_id,
+                creator_id=post.creator.creator_id,
+                creator_username=post.creator.username,
+                creator_follower_count=post.creator.follower_count,
+                creator_tier=post.creator.tier,
+                creator_region=post.creator.region,
+                platform=post.platform,
+                content_type=post.content_type,
+                caption=post.caption,
+                hashtags=post.hashtags,
+                timestamp=post.timestamp,
+                views=post.views,
+                likes=post.likes,
+                comments=post.comments,
+                shares=post.shares,
+                saves=post.saves,
+                first_seen=post.first_seen,
+                last_captured=post.last_captured,
+                capture_count=post.capture_count,
+                hashtag_ids=post.hashtag_ids,
+                creator_key=post.creator_key,
+            )
+        return columns.build(posts=list(posts))
+
+
+def _enum_value(value) -> str:
+    return value.value if isinstance(value, Enum) else value
+
+
+class _ColumnBuilder:
+    def __init__(self):
+        self.post_ids: List[str] = []
+        self.creator_keys: List[int] = []
+        self.creator_usernames: List[str] = []
+        self.creator_follower_counts: List[int] = []
+        self.tier: List[int] = []
+        self.region: List[int] = []
+        self.platform: List[int] = []
+        self.content_type: List[int] = []
+        self.captions: List[str] = []
+        self.hashtag_ids: List[int] = []
+        self.hashtag_offsets: List[int] = [0]
+        self.timestamp: List[datetime] = []
+        self.first_seen: List[datetime] = []
+        self.last_captured: List[datetime] = []
+        self.capture_count: List[int] = []
+        self.counters: Dict[str, List[int]] = {name: [] for name in COUNTER_COLUMNS}
+
+    def append(
+        self,
+        post_id,
+        creator_id,
+        creator_username,
+        creator_follower_count,
+        creator_tier,
+        creator_region,
+        platform,
+        content_type,
+        caption,
+        hashtags,
+        timestamp,
+        views,
+        likes,
+        comments,
+        shares,
+        saves,
+        first_seen,
+        last_captured,
+        capture_count,
+        hashtag_ids=None,
+        creator_key=None,
+    ):
+        self.post_ids.append(post_id)
+        if creator_key is None:
+            creator_key = creator_vocabulary.intern(creator_id)
+        self.creator_keys.append(creator_key)
+        self.creator_usernames.append(creator_username or "")
+        self.creator_follower_counts.append(creator_follower_count or 0)
+        self.tier.append(_TIER_CODES[_enum_value(creator_tier)])
+        self.region.append(_REGION_CODES[_enum_value(creator_region)])
+        self.platform.append(_PLATFORM_CODES[_enum_value(platform)])
+        self.content_type.append(_CONTENT_TYPE_CODES[_enum_value(content_type)])
+        self.captions.append(caption or "")
+        if hashtag_ids is None:
+            hashtag_ids = hashtag_vocabulary.intern_many(hashtags)
+        self.hashtag_ids.extend(hashtag_ids)
+        self.hashtag_offsets.append(len(self.hashtag_ids))
+        self.timestamp.append(timestamp)
+        self.first_seen.append(first_seen)
+        self.last_captured.append(last_captured)
+        self.capture_count.append(capture_count or 1)
+        counters = self.counters
+        counters["views"].append(views or 0)
+        counters["likes"].append(likes or 0)
+        counters["comments"].append(comments or 0)
+        counters["shares"].append(shares or 0)
+        counters["saves"].append(saves or 0)
+
+    def build(self, posts: Optional[List[ContentPost]] = None) -> PostFrame:
+        return PostFrame(
+            post_ids=self.post_ids,
+            creator_keys=np.asarray(self.creator_keys, dtype=np.int32),
+            platform=np.asarray(self.platform, dtype=np.int8),
+            content_type=np.asarray(self.content_type, dtype=np.int8),
+            region=np.asarray(self.region, dtype=np.int8),
+            tier=np.asarray(self.tier, dtype=np.int8),
+            views=np.asarray(self.counters["views"], dtype=np.int64),
+            likes=np.asarray(self.counters["likes"], dtype=np.int64),
+            comments=np.asarray(self.counters["comments"], dtype=np.int64),
+            shares=np.asarray(self.counters["shares"], dtype=np.int64),
+            saves=np.asarray(self.counters["saves"], dtype=np.int64),
+            timestamp=np.asarray(self.timestamp, dtype="datetime64[us]"),
+            first_seen=np.asarray(self.first_seen, dtype="datetime64[us]"),
+            last_captured=np.asarray(self.last_captured, dtype="datetime64[us]"),
+            capture_count=np.asarray(self.capture_count, dtype=np.int32),
+            hashtag_offsets=np.asarray(self.hashtag_offsets, dtype=np.int64),
+            hashtag_ids=np.asarray(self.hashtag_ids, dtype=np.int32),
+            captions=self.captions,
+            creator_usernames=self.creator_usernames,
+            creator_follower_counts=np.asarray(self.creator_follower_counts, dtype=np.int64),
+            posts=posts,
+        )
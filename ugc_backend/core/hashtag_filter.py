@@ -0,0 +1,136 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.vocab import hashtag_vocabulary
+
+# platform-generic tags that ride along on any post (feed / algorithm bait,
+# platform names, editing tools) and never describe a trend
+DEFAULT_STOPLIST = frozenset([
+    # tiktok / reels
+    "fyp", "fy", "fypシ", "fypage", "foryou", "foryoupage", "foru", "xyzbca",
+    "viral", "viralvideo", "trending", "trend", "tiktok", "tiktokviral",
+    "capcut", "duet", "stitch", "greenscreen",
+    # instagram
+    "reels", "reel", "explore", "explorepage", "instagood", "instagram",
+    "instadaily", "photooftheday", "like4like", "likeforlike", "follow",
+    "followme", "follow4follow",
+    # xiaohongshu / douyin
+    "小红书", "抖音", "推荐", "热门", "上热门", "dou上热门",
+])
+
+Threshold = Union[int, float]
+
+
+class HashtagFilter:
+    def __init__(
+        self,
+        min_df: Threshold = 1,
+        max_df: Threshold = 1.0,
+        stoplist: Optional[Iterable[str]] = None,
+    ):
+        """
+        drops hashtags by document frequency (posts carrying the tag) before
+        clustering: an int threshold is a post count, a float a share of the
+        window's posts, as in min_df=2 / max_df=0.9
+        tags below min_df are one-off typos and long tail, tags above max_df
+        or on the stoplist (DEFAULT_STOPLIST unless given) carry no signal;
+        neither can form a trend but both feed co-occurrence pairs
+        the default max_df=1.0 keeps common tags: in a keyword-driven window
+        the trend tag itself (the ingest search keyword) is on most posts
+        an int max_df <= 1 is rejected, it is almost always a share written
+        without the decimal point and would drop nearly every tag
+        """
+        if isinstance(min_df, float) and not 0.0 <= min_df <= 1.0:
+            raise ValueError(f"relative min_df must be in [0, 1]: {min_df}")
+        if isinstance(max_df, float) and not 0.0 <= max_df <= 1.0:
+            raise ValueError(f"relative max_df must be in [0, 1]: {max_df}")
+        if not isinstance(max_df, float) and max_df <= 1:
+            raise ValueError(f"absolute max_df must be above 1 (use a float for a share): {max_df}")
+        self.min_df = min_df
+        self.max_df = max_df
+        self.stoplist = frozenset(
+            tag.strip("#").lower() for tag in (DEFAULT_STOPLIST if stoplist is None else stoplist)
+        )
+
+    def bounds(self, post_count: int) -> Tuple[int, int]:
+        """
+        inclusive (min, max) posts a kept tag appears in
+        """
+        min_count = math.ceil(self.min_df * post_count) if isinstance(self.min_df, float) else self.min_df
+        max_count = math.floor(self.max_df * post_count) if isinstance(self.max_df, float) else self.max_df
+        return min_count, max_count
+
+    def apply(
+        self,
+        frame: PostFrame,
+        document_frequency: Optional[Dict[str, int]] = None,
+    ) -> Tuple[List[List[int]], Dict[str, int]]:
+        """
+        the frame's per-post hashtag id lists with dropped tags removed, and
+        counts of what was dropped; the frame itself is left untouched so
+        clusters still show every tag of their posts
+        document_frequency (hashtag -> posts in the frame's window, e.g.
+        PostRepository.get_hashtag_counts) replaces counting over the frame
+        """
+        post_count = len(frame)
+        ids = frame.hashtag_ids
+        offsets = frame.hashtag_offsets
+        stats = {
+            "posts": post_count,
+            "hashtags": 0,
+            "hashtags_kept": 0,
+            "dropped_rare": 0,
+            "dropped_common": 0,
+            "dropped_stoplist": 0,
+            "occurrences_dropped": 0,
+            "posts_emptied": 0,
+        }
+        if len(ids) == 0:
+            return frame.hashtag_lists(), stats
+
+        rows = np.repeat(np.arange(post_count, dtype=np.int64), np.diff(offsets))
+        width = int(ids.max()) + 1
+        if document_frequency is None:
+            # a tag repeated within one caption counts once
+            post_tags = np.unique(rows * width + ids)
+            df = np.bincount(post_tags % width, minlength=width)
+        else:
+            df = np.zeros(width, dtype=np.int64)
+            for tag, count in document_frequency.items():
+                tag_id = hashtag_vocabulary.get(tag)
+                if tag_id is not None and tag_id < width:
+                    df[tag_id] = count
+            # only tags on the frame count as seen; ones missing from the
+            # counts (posts stored before post_hashtags was backfilled) get one
+            on_frame = np.bincount(ids, minlength=width) > 0
+            df[~on_frame] = 0
+            df[on_frame & (df == 0)] = 1
+
+        stopped = np.zeros(width, dtype=bool)
+        stop_ids = [hashtag_vocabulary.get(tag) for tag in self.stoplist]
+        stopped[[tag_id for tag_id in stop_ids if tag_id is not None and tag_id < width]] = True
+
+        min_count, max_count = self.bounds(post_count)
+        seen = df > 0
+        stopped &= seen
+        rare = seen & ~stopped & (df < min_count)
+        common = seen & ~stopped & (df > max_count)
+        keep = seen & ~(stopped | rare | common)
+
+        mask = keep[ids]
+        kept_ids = ids[mask].tolist()
+        kept_per_post = np.bincount(rows[mask], minlength=post_count)
+        kept_offsets = np.concatenate(([0], np.cumsum(kept_per_post))).tolist()
+
+        stats.update(
+            hashtags=int(seen.sum()),
+            hashtags_kept=int(keep.sum()),
+            dropped_rare=int(rare.sum()),
+            dropped_common=int(common.sum()),
+            dropped_stoplist=int(stopped.sum()),
+            occurrences_dropped=int(len(ids) - len(kept_ids)),
+            posts_emptied=int(((kept_per_post == 0) & (np.diff(offsets) > 0)).sum()),
+        )
+        lists = [kept_ids[kept_offsets[row]:kept_offsets[row + 1]] for row in range(post_count)]
+        return lists, stats
@@ -0,0 +1,484 @@
+import threading
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from itertools import combinations
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ugc_backend.core.models import ContentPost
+from ugc_backend.core.cluster import Cluster
+from ugc_backend.core.lsh import jaccard
+from ugc_backend.core.vocab import creator_vocabulary, hashtag_vocabulary
+from ugc_backend.core.window import WindowManager, WindowType
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def refresh_counters(existing: ContentPost, post: ContentPost):
+    """
+    recapture: refresh counters, keep the original first_seen and tags
+    """
+    existing.views = post.views
+    existing.likes = post.likes
+    existing.comments = post.comments
+    existing.shares = post.shares
+    existing.saves = post.saves
+    existing.last_captured = post.last_captured
+    existing.capture_count += 1
+
+
+class PostStore:
+    """
+    posts shared by every window, bucketed by timestamp
+    bucket keys are kept sorted so expiry walks buckets oldest first and
+    stops at the first bucket past the cutoff
+    """
+
+    def __init__(self, bucket_seconds: int = 3600):
+        self.bucket_size = timedelta(seconds=bucket_seconds)
+        self.posts: Dict[str, ContentPost] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+        self._bucket_keys: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.posts)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self.posts
+
+    def __getitem__(self, post_id: str) -> ContentPost:
+        return self.posts[post_id]
+
+    def bucket_of(self, timestamp: datetime) -> int:
+        return (timestamp - EPOCH) // self.bucket_size
+
+    def upsert(self, post: ContentPost) -> Tuple[ContentPost, bool]:
+        """
+        returns the stored post and whether it was new
+        """
+        existing = self.posts.get(post.post_id)
+        if existing is not None:
+            refresh_counters(existing, post)
+            return existing, False
+
+        self.posts[post.post_id] = post
+        bucket = self.bucket_of(post.timestamp)
+        if bucket not in self._buckets:
+            self._buckets[bucket] = set()
+            insort(self._bucket_keys, bucket)
+        self._buckets[bucket].add(post.post_id)
+        return post, True
+
+    def expired(self, cutoff: datetime, from_bucket: int = None) -> Iterator[ContentPost]:
+        """
+        posts with timestamp < cutoff, starting at from_bucket
+        """
+        keys = self._bucket_keys
+        start = 0 if from_bucket is None else bisect_left(keys, from_bucket)
+        last = self.bucket_of(cutoff)
+        for bucket in keys[start:]:
+            if bucket > last:
+                break
+            for post_id in list(self._buckets[bucket]):
+                post = self.posts[post_id]
+                if post.timestamp < cutoff:
+                    yield post
+
+    def evict_before(self, cutoff: datetime) -> int:
+        """
+        drop posts with timestamp < cutoff, returns how many were dropped
+        """
+        evicted = [post.post_id for post in self.expired(cutoff)]
+        for post_id in evicted:
+            post = self.posts.pop(post_id)
+            bucket = self.bucket_of(post.timestamp)
+            self._buckets[bucket].discard(post_id)
+
+        keys = self._bucket_keys
+        while keys and not self._buckets[keys[0]]:
+            del self._buckets[keys.pop(0)]
+        return len(evicted)
+
+
+class IncrementalClusterer:
+    """
+    streaming version of ClusteringEngine
+    keeps the hashtag index, pair co-occurrence counts and candidate clusters
+    in memory and applies each ingest batch as a delta:
+    - new posts update the index, their own tag pairs and candidate keys
+    - recaptured posts only update engagement counters
+    - expired posts are retracted from all of the above
+    candidate keys (co-occurring pairs and per-post tag sets, as in
+    ClusteringEngine) are grouped transitively by jaccard >= hashtag_similarity,
+    the same semantics as the lsh merge mode. only groups touched by a
+    batch are marked dirty and get their health recalculated
+    """
+
+    def __init__(
+        self,
+        min_shared_hashtags: int = 2,
+        min_posts_per_cluster: int = 3,
+        hashtag_similarity: float = 0.5,
+        creator_diversity_weight: float = 0.4,
+        engagement_strength_weight: float = 0.3,
+        velocity_weight: float = 0.3,
+        store: Optional[PostStore] = None,
+    ):
+        self.min_shared_hashtags = min_shared_hashtags
+        self.min_posts_per_cluster = min_posts_per_cluster
+        self.hashtag_similarity = hashtag_similarity
+        self.creator_diversity_weight = creator_diversity_weight
+        self.engagement_strength_weight = engagement_strength_weight
+        self.velocity_weight = velocity_weight
+
+        self.store = store if store is not None else PostStore()
+        self.post_ids: Set[str] = set()
+        self.hashtag_index: Dict[int, Set[str]] = defaultdict(set)
+        self.pair_counts: Counter = Counter()
+
+        # candidate key -> post_id -> number of reasons it belongs
+        # (shares the co-occurring pair, has exactly these tags)
+        self.candidates: Dict[frozenset, Counter] = {}
+        self._candidate_seq: Dict[frozenset, int] = {}
+        self._candidates_by_tag: Dict[int, Set[frozenset]] = defaultdict(set)
+        self._parent: Dict[frozenset, frozenset] = {}
+        self._group_keys: Dict[frozenset, Set[frozenset]] = {}
+        self._post_candidates: Dict[str, Set[frozenset]] = defaultdict(set)
+        self._next_seq = 0
+
+        self._dirty: Set[frozenset] = set()
+        self._deleted: Set[frozenset] = set()
+        self._clusters: Dict[frozenset, Cluster] = {}
+
+    def __len__(self) -> int:
+        return len(self.post_ids)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self.post_ids
+
+    def apply_batch(self, posts: Iterable[ContentPost]) -> Dict[str, int]:
+        """
+        apply one ingest batch, returns added/updated counts
+        """
+        added = 0
+        updated = 0
+        for post in posts:
+            stored, _ = self.store.upsert(post)
+            if stored.post_id in self.post_ids:
+                self.touch(stored.post_id)
+                updated += 1
+            else:
+                self.add_post(stored)
+                added += 1
+        return {"added": added, "updated": updated}
+
+    def clusters(self) -> List[Cluster]:
+        """
+        current clusters with at least min_posts_per_cluster posts
+        clean groups return their cached Cluster, dirty ones are rebuilt
+        """
+        dirty_roots = set(self._find(key) for key in self._dirty)
+        self._dirty.clear()
+
+        broken_roots = set(self._find(key) for key in self._deleted)
+        self._deleted.clear()
+        for root in broken_roots:
+            dirty_roots.discard(root)
+            dirty_roots.update(self._split_group(root))
+
+        for root in dirty_roots:
+            post_ids: Set[str] = set()
+            for key in self._group_keys[root]:
+                post_ids.update(self.candidates[key])
+
+            if len(post_ids) < self.min_posts_per_cluster:
+                self._clusters.pop(root, None)
+                continue
+
+            cluster = Cluster(
+                cluster_id=f"cluster_{self._candidate_seq[root]:08x}",
+                posts=[self.store[post_id] for post_id in sorted(post_ids)],
+                primary_hashtags=sorted(hashtag_vocabulary.lookup_many(root)),
+            )
+            cluster.calculate_health(
+                self.creator_diversity_weight,
+                self.engagement_strength_weight,
+                self.velocity_weight,
+            )
+            self._clusters[root] = cluster
+
+        return sorted(self._clusters.values(), key=lambda cluster: cluster.cluster_id)
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty) + len(self._deleted)
+
+    def add_post(self, post: ContentPost):
+        post_id = post.post_id
+        self.post_ids.add(post_id)
+        tag_ids = sorted(set(post.hashtag_ids))
+
+        for tag_id in tag_ids:
+            self.hashtag_index[tag_id].add(post_id)
+
+        for pair in combinations(tag_ids, 2):
+            self.pair_counts[pair] += 1
+            count = self.pair_counts[pair]
+            if count < self.min_shared_hashtags:
+                continue
+            key = frozenset(pair)
+            if count == self.min_shared_hashtags:
+                shared = self.hashtag_index[pair[0]] & self.hashtag_index[pair[1]]
+                for shared_post_id in shared:
+                    self._add_to_candidate(key, shared_post_id)
+            else:
+                self._add_to_candidate(key, post_id)
+
+        if len(post.hashtag_ids) >= self.min_shared_hashtags:
+            self._add_to_candidate(frozenset(post.hashtag_ids), post_id)
+
+    def touch(self, post_id: str):
+        """
+        mark the groups holding a recaptured post dirty
+        """
+        for key in self._post_candidates.get(post_id, ()):
+            self._dirty.add(self._find(key))
+
+    def remove_post(self, post_id: str):
+        """
+        retract a post, the exact inverse of add_post
+        candidate keys left without posts are deleted and their groups are
+        split again at the next clusters() call
+        """
+        post = self.store[post_id]
+        tag_ids = sorted(set(post.hashtag_ids))
+
+        for pair in combinations(tag_ids, 2):
+            count = self.pair_counts[pair]
+            if count >= self.min_shared_hashtags:
+                key = frozenset(pair)
+                if count == self.min_shared_hashtags:
+                    shared = self.hashtag_index[pair[0]] & self.hashtag_index[pair[1]]
+                    for shared_post_id in shared:
+                        self._remove_from_candidate(key, shared_post_id)
+                else:
+                    self._remove_from_candidate(key, post_id)
+            if count == 1:
+                del self.pair_counts[pair]
+            else:
+                self.pair_counts[pair] = count - 1
+
+        if len(post.hashtag_ids) >= self.min_shared_hashtags:
+            self._remove_from_candidate(frozenset(post.hashtag_ids), post_id)
+
+        for tag_id in tag_ids:
+            posts = self.hashtag_index[tag_id]
+            posts.discard(post_id)
+            if not posts:
+                del self.hashtag_index[tag_id]
+
+        self.post_ids.discard(post_id)
+        self._post_candidates.pop(post_id, None)
+
+    def _add_to_candidate(self, key: frozenset, post_id: str):
+        if key not in self.candidates:
+            self._create_candidate(key)
+        self.candidates[key][post_id] += 1
+        self._post_candidates[post_id].add(key)
+        self._dirty.add(self._find(key))
+
+    def _remove_from_candidate(self, key: frozenset, post_id: str):
+        members = self.candidates[key]
+        members[post_id] -= 1
+        if members[post_id] == 0:
+            del members[post_id]
+            self._post_candidates[post_id].discard(key)
+        self._dirty.add(self._find(key))
+        if not members:
+            self._delete_candidate(key)
+
+    def _create_candidate(self, key: frozenset):
+        self.candidates[key] = Counter()
+        if key in self._deleted:
+            # deleted since the last split, it is still wired into its old group
+            self._deleted.discard(key)
+        else:
+            self._candidate_seq[key] = self._next_seq
+            self._next_seq += 1
+            self._parent[key] = key
+            self._group_keys[key] = {key}
+
+        similar = set()
+        for tag_id in key:
+            for other in self._candidates_by_tag[tag_id]:
+                if other not in similar and jaccard(key, other) >= self.hashtag_similarity:
+                    similar.add(other)
+            self._candidates_by_tag[tag_id].add(key)
+
+        for other in similar:
+            self._union(key, other)
+
+    def _delete_candidate(self, key: frozenset):
+        """
+        union-find has no delete, so the key stays in its group (and in the
+        parent chain) until _split_group rebuilds the group without it
+        """
+        del self.candidates[key]
+        for tag_id in key:
+            keys = self._candidates_by_tag[tag_id]
+            keys.discard(key)
+            if not keys:
+                del self._candidates_by_tag[tag_id]
+        self._deleted.add(key)
+
+    def _split_group(self, root: frozenset) -> Set[frozenset]:
+        """
+        regroup the live keys of a group that lost a key
+        similarity edges only ever join keys of the same group, so checking
+        pairs inside the group is enough. returns the new roots
+        """
+        group = self._group_keys.pop(root)
+        self._clusters.pop(root, None)
+
+        keys = []
+        for key in group:
+            if key in self.candidates:
+                keys.append(key)
+            else:
+                del self._parent[key]
+                del self._candidate_seq[key]
+
+        for key in keys:
+            self._parent[key] = key
+            self._group_keys[key] = {key}
+
+        live = set(keys)
+        for key in keys:
+            for tag_id in key:
+                for other in self._candidates_by_tag[tag_id]:
+                    if other in live and self._find(key) != self._find(other):
+                        if jaccard(key, other) >= self.hashtag_similarity:
+                            self._union(key, other)
+
+        return set(self._find(key) for key in keys)
+
+    def _find(self, key: frozenset) -> frozenset:
+        parent = self._parent
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    def _union(self, a: frozenset, b: frozenset):
+        """
+        the earliest created key stays root, so cluster ids and primary
+        hashtags of an existing group survive merges with newer groups
+        """
+        root_a = self._find(a)
+        root_b = self._find(b)
+        if root_a == root_b:
+            return
+        if self._candidate_seq[root_b] < self._candidate_seq[root_a]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+
+        keys_a = self._group_keys.pop(root_a)
+        keys_b = self._group_keys.pop(root_b)
+        if len(keys_a) < len(keys_b):
+            keys_a, keys_b = keys_b, keys_a
+        keys_a.update(keys_b)
+        self._group_keys[root_a] = keys_a
+
+        self._clusters.pop(root_b, None)
+        self._dirty.add(root_a)
+
+
+class LiveClusterState:
+    """
+    process-wide incremental clusterers, one per window type, over one
+    shared PostStore
+    as time moves on each window retracts the posts that slid out of it,
+    and the store drops posts once they leave the widest window, so memory
+    stays bounded by the longest window; each eviction also compacts the
+    process-wide vocabularies down to what the store still uses
+    """
+
+    def __init__(
+        self,
+        window_manager: Optional[WindowManager] = None,
+        bucket_seconds: int = 3600,
+        **clusterer_kwargs,
+    ):
+        self.window_manager = window_manager or WindowManager()
+        self.store = PostStore(bucket_seconds)
+        self.clusterers: Dict[WindowType, IncrementalClusterer] = {
+            window_type: IncrementalClusterer(store=self.store, **clusterer_kwargs)
+            for window_type in WindowType
+        }
+        self._starts: Dict[WindowType, datetime] = {}
+        self._expired_through: Dict[WindowType, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def apply_batch(self, posts: List[ContentPost], now: Optional[datetime] = None) -> Dict[str, int]:
+        now = now or datetime.now()
+        totals: Counter = Counter()
+        with self._lock:
+            self._advance(now)
+            oldest = min(self._starts.values())
+            for post in posts:
+                if post.post_id not in self.store and post.timestamp < oldest:
+                    continue
+                stored, _ = self.store.upsert(post)
+                for window_type, clusterer in self.clusterers.items():
+                    if stored.post_id in clusterer:
+                        clusterer.touch(stored.post_id)
+                        totals["updated"] += 1
+                    elif stored.timestamp >= self._starts[window_type]:
+                        clusterer.add_post(stored)
+                        totals["added"] += 1
+        return dict(totals)
+
+    def advance(self, now: Optional[datetime] = None) -> int:
+        """
+        slide every window to now, returns how many posts left the store
+        """
+        with self._lock:
+            return self._advance(now or datetime.now())
+
+    def clusters(self, window_type: WindowType, now: Optional[datetime] = None) -> List[Cluster]:
+        with self._lock:
+            self._advance(now or datetime.now())
+            return self.clusterers[window_type].clusters()
+
+    def _advance(self, now: datetime) -> int:
+        for window_type, clusterer in self.clusterers.items():
+            start = self.window_manager.create_window(window_type, now).start
+            if window_type in self._starts and start <= self._starts[window_type]:
+                continue
+
+            for post in self.store.expired(start, self._expired_through.get(window_type)):
+                if post.post_id in clusterer:
+                    clusterer.remove_post(post.post_id)
+
+            # every bucket before the one holding start is now fully expired
+            self._expired_through[window_type] = self.store.bucket_of(start)
+            self._starts[window_type] = start
+
+        evicted = self.store.evict_before(min(self._starts.values()))
+        if evicted:
+            self._compact_vocabularies()
+        return evicted
+
+    def _compact_vocabularies(self):
+        """
+        one-off hashtags and creators would otherwise stay interned for the
+        life of the process; posts intern under self._lock, so anything
+        missing from the store here is only held by finished or running
+        discovery runs
+        """
+        posts = self.store.posts.values()
+        hashtag_vocabulary.compact(tag_id for post in posts for tag_id in post.hashtag_ids)
+        creator_vocabulary.compact(post.creator_key for post in posts)
@@ -0,0 +1,228 @@
+import zlib
+from functools import lru_cache
+from typing import Dict, Hashable, Iterator, List, Sequence, Tuple
+import numpy as np
+
+
+MERSENNE_PRIME = (1 << 31) - 1
+
+
+class DisjointSet:
+    """
+    union-find over 0..size-1 with path halving
+    the root of every set is its smallest member, so the representative
+    of a merged group never depends on the order unions were applied in
+    """
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> int:
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a == root_b:
+            return root_a
+        if root_b < root_a:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        return root_a
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    overlap = len(a & b)
+    total_unique = len(a) + len(b) - overlap
+    if total_unique == 0:
+        return 0.0
+    return overlap / total_unique
+
+
+def token_hash(token: Hashable) -> int:
+    """
+    stable 31-bit hash of a set element
+    python's hash() is salted per process, which would make lsh buckets
+    differ between runs
+    """
+    return zlib.crc32(str(token).encode("utf-8")) & MERSENNE_PRIME
+
+
+@lru_cache(maxsize=32)
+def optimal_band_params(
+    threshold: float,
+    num_perm: int,
+    min_recall: float = 0.99,
+) -> Tuple[int, int]:
+    """
+    pick (bands, rows) with bands × rows <= num_perm
+
+    candidate probability for jaccard s is 1 - (1 - s^rows)^bands
+    among settings that still surface a pair at exactly threshold with
+    probability >= min_recall, take the one with the least false positive
+    mass below threshold. recall is favoured because every candidate is
+    verified with exact jaccard, so a false positive only costs a comparison
+    """
+    def probability(s: float, bands: int, rows: int) -> float:
+        return 1.0 - (1.0 - s ** rows) ** bands
+
+    def false_positive_mass(bands: int, rows: int) -> float:
+        steps = 100
+        width = threshold / steps
+        return sum(
+            probability((i + 0.5) * width, bands, rows) * width
+            for i in range(steps)
+        )
+
+    best = (num_perm, 1)
+    best_mass = float("inf")
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if probability(threshold, bands, rows) < min_recall:
+            continue
+        mass = false_positive_mass(bands, rows)
+        if mass < best_mass:
+            best_mass = mass
+            best = (bands, rows)
+    return best
+
+
+class MinHasher:
+    """
+    minhash signatures for small sets (cluster hashtag sets)
+    permutations are (a·x + b) mod p with a fixed seed, so signatures are
+    reproducible across runs and processes
+    """
+
+    def __init__(self, num_perm: int = 128, seed: int = 1, chunk_size: int = 4096):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.chunk_size = chunk_size
+        self.a = rng.randint(1, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self.b = rng.randint(0, MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+    def signatures(self, sets: Sequence[frozenset]) -> np.ndarray:
+        """
+        returns (len(sets), num_perm) uint32 matrix
+        every distinct token is permuted once, then each set takes the
+        column-wise minimum over its tokens via a segmented reduction
+        """
+        token_ids: Dict[Hashable, int] = {}
+        flat: List[int] = []
+        offsets = [0]
+        for members in sets:
+            for token in members:
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = len(token_ids)
+                    token_ids[token] = token_id
+                flat.append(token_id)
+            offsets.append(len(flat))
+
+        hashes = np.fromiter(
+            (token_hash(token) for token in token_ids),
+            dtype=np.uint64,
+            count=len(token_ids),
+        )
+        permuted = (
+            (hashes[:, None] * self.a[None, :] + self.b[None, :]) % np.uint64(MERSENNE_PRIME)
+        ).astype(np.uint32)
+
+        flat_ids = np.asarray(flat, dtype=np.int64)
+        offsets_arr = np.asarray(offsets, dtype=np.int64)
+        result = np.empty((len(sets), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(sets), self.chunk_size):
+            stop = min(start + self.chunk_size, len(sets))
+            lo = offsets_arr[start]
+            hi = offsets_arr[stop]
+            chunk = permuted[flat_ids[lo:hi]]
+            result[start:stop] = np.minimum.reduceat(chunk, offsets_arr[start:stop] - lo, axis=0)
+        return result
+
+
+def _union_bucket(
+    groups: DisjointSet,
+    sets: Sequence[frozenset],
+    members: List[int],
+    threshold: float,
+):
+    """
+    verify one lsh bucket: members are partitioned by their current root,
+    and each member is only compared against partitions it has not already
+    joined, so buckets that are mostly merged cost close to linear time
+    """
+    partitions: Dict[int, List[int]] = {}
+    for member in members:
+        root = groups.find(member)
+        member_set = sets[member]
+        member_size = len(member_set)
+        joined = [root]
+        for other_root, other_members in partitions.items():
+            if other_root == root:
+                continue
+            for other in other_members:
+                other_size = len(sets[other])
+                if min(member_size, other_size) < threshold * max(member_size, other_size):
+                    continue
+                if jaccard(member_set, sets[other]) >= threshold:
+                    joined.append(other_root)
+                    break
+
+        combined = partitions.pop(root, [])
+        combined.append(member)
+        for other_root in joined[1:]:
+            combined.extend(partitions.pop(other_root))
+            root = groups.union(root, other_root)
+        partitions[root] = combined
+
+
+def lsh_similar_groups(
+    sets: Sequence[frozenset],
+    threshold: float,
+    num_perm: int = 128,
+    seed: int = 1,
+) -> DisjointSet:
+    """
+    group sets whose jaccard similarity is >= threshold
+    1. minhash every non-empty set
+    2. band the signatures; sets sharing any band bucket become candidates
+    3. verify candidates with exact jaccard (no false positive merges)
+    4. union verified pairs, so grouping is transitive and order independent
+    """
+    groups = DisjointSet(len(sets))
+    indices = [i for i, members in enumerate(sets) if members]
+    if len(indices) < 2:
+        return groups
+
+    bands, rows = optimal_band_params(threshold, num_perm)
+    signatures = MinHasher(num_perm=num_perm, seed=seed).signatures([sets[i] for i in indices])
+
+    index_arr = np.asarray(indices, dtype=np.int64)
+    for band in range(bands):
+        for bucket in band_buckets(signatures, index_arr, band, rows):
+            _union_bucket(groups, sets, bucket, threshold)
+
+    return groups
+
+
+def band_buckets(signatures: np.ndarray, index_arr: np.ndarray, band: int, rows: int) -> Iterator[List[int]]:
+    """
+    set indices sharing a bucket in one band, buckets of one skipped
+    signatures[i] belongs to set index_arr[i]
+    """
+    band_slice = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+    keys = band_slice.view(np.dtype((np.void, band_slice.dtype.itemsize * rows))).ravel()
+    _, bucket_ids, bucket_sizes = np.unique(keys, return_inverse=True, return_counts=True)
+
+    shared = bucket_sizes[bucket_ids.ravel()] > 1
+    if not shared.any():
+        return
+    positions = np.flatnonzero(shared)
+    order = positions[np.argsort(bucket_ids.ravel()[positions], kind="stable")]
+    boundaries = np.flatnonzero(np.diff(bucket_ids.ravel()[order])) + 1
+    for bucket in np.split(index_arr[order], boundaries):
+        yield bucket.tolist()
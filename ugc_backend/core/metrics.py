@@ -1,6 +1,9 @@
-from typing import List
+from typing import Dict, List, Optional, Sequence, Sized, Tuple
 from datetime import datetime
+import numpy as np
 from ugc_backend.core.models import ContentPost, CreatorProfile
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.snapshot import EngagementDelta
 
 
 def calculate_engagement_rate(post: ContentPost) -> float:
@@ -15,16 +18,19 @@ def calculate_engagement_rate(post: ContentPost) -> float:
     return (post.likes + post.comments + post.shares) / post.views
 
 
-def calculate_velocity_score(post: ContentPost) -> float:
+def calculate_velocity_score(post: ContentPost, delta: Optional[EngagementDelta] = None) -> float:
     """
     formula: (current_engagement - initial_engagement) / hours_elapsed
     units: engagements per hour
     interpretation: rate of growth
     threshold: >100/hour indicates viral potential
     
-    note: for initial implementation, we use total_engagement / hours_since_first_seen
-    in production, track initial_engagement separately via recapture
+    delta is the post's growth between two snapshots (see
+    SnapshotRepository.get_deltas); without one, or for a zero-length one,
+    falls back to total_engagement / hours_since_first_seen
     """
+    if delta is not None and delta.hours > 0:
+        return delta.velocity
     hours = post.hours_since_first_seen
     if hours == 0:
         return 0.0
@@ -42,7 +48,7 @@ def calculate_creator_diversity(posts: List[ContentPost]) -> float:
     """
     if not posts:
         return 0.0
-    unique_creators = len(set(post.creator.creator_id for post in posts))
+    unique_creators = len(set(post.creator_key for post in posts))
     return unique_creators / len(posts)
 
 
@@ -97,6 +103,29 @@ def calculate_cluster_health(
     
     velocities = [calculate_velocity_score(post) for post in posts]
     avg_velocity = sum(velocities) / len(velocities) if velocities else 0.0
+    
+    return combine_cluster_health(
+        diversity,
+        engagement,
+        avg_velocity,
+        creator_diversity_weight,
+        engagement_strength_weight,
+        velocity_weight,
+    )
+
+
+def combine_cluster_health(
+    diversity: float,
+    engagement: float,
+    avg_velocity: float,
+    creator_diversity_weight: float = 0.4,
+    engagement_strength_weight: float = 0.3,
+    velocity_weight: float = 0.3,
+) -> float:
+    """
+    weighted health from already computed components
+    shared by calculate_cluster_health and the frame-based path
+    """
     velocity_norm = normalize_velocity(avg_velocity)
     
     health = (
@@ -143,7 +172,7 @@ def calculate_validation_confidence(
 
 
 def calculate_saturation_level(
-    posts: List[ContentPost],
+    posts: Sized,
     days_active: float,
 ) -> float:
     """
@@ -158,3 +187,220 @@ def calculate_saturation_level(
     if days_active == 0:
         return 0.0
     return len(posts) / days_active
+
+
+def batch_engagement_rates(
+    views: np.ndarray,
+    likes: np.ndarray,
+    comments: np.ndarray,
+    shares: np.ndarray,
+) -> np.ndarray:
+    """
+    vectorized calculate_engagement_rate
+    formula: (likes + comments + shares) / views, 0.0 where views == 0
+    """
+    views = np.asarray(views, dtype=np.float64)
+    interactions = (
+        np.asarray(likes, dtype=np.float64)
+        + np.asarray(comments, dtype=np.float64)
+        + np.asarray(shares, dtype=np.float64)
+    )
+    rates = np.zeros(len(views), dtype=np.float64)
+    np.divide(interactions, views, out=rates, where=views != 0)
+    return rates
+
+
+def batch_velocity_scores(
+    total_engagement: np.ndarray,
+    first_seen: np.ndarray,
+    now: Optional[datetime] = None,
+    delta_engagement: Optional[np.ndarray] = None,
+    delta_hours: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    vectorized calculate_velocity_score
+    formula: total_engagement / hours_since_first_seen, 0.0 where hours == 0
+    first_seen is datetime64, every row is measured against the same now
+    rows with delta_hours > 0 use delta_engagement / delta_hours instead
+    """
+    if now is None:
+        now = datetime.now()
+    hours = (np.datetime64(now, "us") - np.asarray(first_seen, dtype="datetime64[us]")) / np.timedelta64(1, "h")
+    engagement = np.asarray(total_engagement, dtype=np.float64)
+    velocities = np.zeros(len(engagement), dtype=np.float64)
+    np.divide(engagement, hours, out=velocities, where=hours != 0)
+    if delta_hours is not None:
+        delta_hours = np.asarray(delta_hours, dtype=np.float64)
+        np.divide(
+            np.asarray(delta_engagement, dtype=np.float64),
+            delta_hours,
+            out=velocities,
+            where=delta_hours > 0,
+        )
+    return velocities
+
+
+def delta_arrays(
+    post_ids: Sequence[str],
+    deltas: Dict[str, EngagementDelta],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (delta_engagement, delta_hours) for batch_velocity_scores, 0 for posts
+    without a delta so they fall back to their lifetime average
+    """
+    post_deltas = [deltas.get(post_id) for post_id in post_ids]
+    delta_engagement = np.array([d.engagement if d else 0 for d in post_deltas], dtype=np.float64)
+    delta_hours = np.array([d.hours if d else 0.0 for d in post_deltas], dtype=np.float64)
+    return delta_engagement, delta_hours
+
+
+def segment_ids(offsets: np.ndarray) -> np.ndarray:
+    """
+    cluster membership offsets -> segment id per member
+    segment i owns members offsets[i]:offsets[i + 1]
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def segment_means(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    mean of values per segment, 0.0 for empty segments
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+    sums = np.bincount(segment_ids(offsets), weights=values, minlength=len(counts))
+    means = np.zeros(len(counts), dtype=np.float64)
+    np.divide(sums, counts, out=means, where=counts != 0)
+    return means
+
+
+def segment_unique_counts(keys: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    distinct keys per segment, counted as distinct (segment, key) pairs
+    after one lexsort
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    segments = segment_ids(offsets)
+    keys = np.asarray(keys)
+
+    order = np.lexsort((keys, segments))
+    sorted_segments = segments[order]
+    sorted_keys = keys[order]
+    distinct = np.ones(len(order), dtype=bool)
+    distinct[1:] = (sorted_segments[1:] != sorted_segments[:-1]) | (sorted_keys[1:] != sorted_keys[:-1])
+    return np.bincount(sorted_segments[distinct], minlength=len(offsets) - 1)
+
+
+def batch_creator_diversity(
+    creator_keys: np.ndarray,
+    offsets: np.ndarray,
+    unique_counts: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    vectorized calculate_creator_diversity per segment
+    formula: unique_creators / total_posts, 0.0 for empty segments
+    unique_counts skips recounting segment_unique_counts when already known
+    """
+    counts = np.diff(np.asarray(offsets, dtype=np.int64))
+    if unique_counts is None:
+        unique_counts = segment_unique_counts(creator_keys, offsets)
+
+    diversity = np.zeros(len(counts), dtype=np.float64)
+    np.divide(unique_counts, counts, out=diversity, where=counts != 0)
+    return diversity
+
+
+def batch_engagement_strength(rates: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    vectorized calculate_engagement_strength: mean engagement rate per segment
+    """
+    return segment_means(rates, offsets)
+
+
+def batch_cluster_health(
+    diversity: np.ndarray,
+    engagement: np.ndarray,
+    avg_velocity: np.ndarray,
+    creator_diversity_weight: float = 0.4,
+    engagement_strength_weight: float = 0.3,
+    velocity_weight: float = 0.3,
+    max_velocity: float = 1000.0,
+) -> np.ndarray:
+    """
+    vectorized combine_cluster_health, same formula and weights
+    """
+    if max_velocity == 0:
+        velocity_norm = np.zeros(len(avg_velocity), dtype=np.float64)
+    else:
+        velocity_norm = np.minimum(np.asarray(avg_velocity) / max_velocity, 1.0)
+    health = (
+        np.asarray(diversity) * creator_diversity_weight +
+        np.asarray(engagement) * engagement_strength_weight +
+        velocity_norm * velocity_weight
+    )
+    return np.minimum(health, 1.0)
+
+
+def batch_cluster_metrics(
+    frame: PostFrame,
+    rows: np.ndarray,
+    offsets: np.ndarray,
+    creator_diversity_weight: float = 0.4,
+    engagement_strength_weight: float = 0.3,
+    velocity_weight: float = 0.3,
+    now: Optional[datetime] = None,
+    deltas: Optional[Dict[str, EngagementDelta]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    health components for many clusters in one pass
+    rows holds every cluster's frame rows back to back, cluster i owning
+    rows[offsets[i]:offsets[i + 1]]; each output array has one entry per cluster
+    deltas (post_id -> 24h snapshot growth) make velocity the recent rate
+    for the posts that have one, as growth_rate_24h on the proof tile
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    counts = np.diff(offsets)
+
+    rates = batch_engagement_rates(
+        frame.views[rows],
+        frame.likes[rows],
+        frame.comments[rows],
+        frame.shares[rows],
+    )
+    delta_engagement = delta_hours = None
+    if deltas:
+        post_ids = frame.post_ids
+        delta_engagement, delta_hours = delta_arrays([post_ids[row] for row in rows.tolist()], deltas)
+    velocities = batch_velocity_scores(
+        frame.total_engagement[rows],
+        frame.first_seen[rows],
+        now,
+        delta_engagement,
+        delta_hours,
+    )
+
+    creator_counts = segment_unique_counts(frame.creator_keys[rows], offsets)
+    diversity = batch_creator_diversity(frame.creator_keys[rows], offsets, creator_counts)
+    engagement = batch_engagement_strength(rates, offsets)
+    avg_velocity = segment_means(velocities, offsets)
+    health = batch_cluster_health(
+        diversity,
+        engagement,
+        avg_velocity,
+        creator_diversity_weight,
+        engagement_strength_weight,
+        velocity_weight,
+    )
+    health[counts == 0] = 0.0
+
+    return {
+        "health_score": health,
+        "creator_diversity": diversity,
+        "engagement_strength": engagement,
+        "velocity_score": avg_velocity,
+        "detection_confidence": calculate_detection_confidence(health, diversity),
+        "post_count": counts,
+        "creator_count": creator_counts,
+    }
@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
+from ugc_backend.core.vocab import hashtag_vocabulary, creator_vocabulary
 
 
 class Platform(str, Enum):
@@ -86,6 +87,9 @@ class ContentPost(BaseModel):
     last_captured: datetime
     capture_count: int = Field(default=1, ge=1)
 
+    _hashtag_ids: Optional[Tuple[int, ...]] = PrivateAttr(default=None)
+    _creator_key: Optional[int] = PrivateAttr(default=None)
+
     @field_validator("hashtags", mode="before")
     @classmethod
     def normalize_hashtags(cls, v):
@@ -93,6 +97,38 @@ class ContentPost(BaseModel):
             return [tag.strip("#").lower() for tag in v.split() if tag.startswith("#")]
         return [tag.strip("#").lower() if isinstance(tag, str) else str(tag).lower() for tag in v]
 
+    @field_validator("timestamp", "first_seen", "last_captured")
+    @classmethod
+    def naive_local_time(cls, v: datetime) -> datetime:
+        """
+        windows, stores and the database all compare against naive
+        datetime.now(), so aware timestamps (iso strings ending in "Z" or
+        an offset) are converted to local time and stripped of tzinfo
+        """
+        if v.tzinfo is not None:
+            return v.astimezone().replace(tzinfo=None)
+        return v
+
+    def __hash__(self) -> int:
+        return hash(self.post_id)
+
+    @property
+    def hashtag_ids(self) -> Tuple[int, ...]:
+        """
+        hashtags interned into the process-wide vocabulary
+        interned on first access and cached, so clustering and metrics
+        hash each tag string once per post rather than once per stage
+        """
+        if self._hashtag_ids is None:
+            self._hashtag_ids = tuple(hashtag_vocabulary.intern_many(self.hashtags))
+        return self._hashtag_ids
+
+    @property
+    def creator_key(self) -> int:
+        if self._creator_key is None:
+            self._creator_key = creator_vocabulary.intern(self.creator.creator_id)
+        return self._creator_key
+
     @property
     def total_engagement(self) -> int:
         return self.likes + self.comments + self.shares + self.saves
@@ -0,0 +1,137 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from ugc_backend.core.lsh import DisjointSet, MinHasher, _union_bucket, band_buckets, optimal_band_params
+
+# (shared memory name, shape, dtype) of an array handed to workers
+ArraySpec = Tuple[str, Tuple[int, ...], str]
+
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_sets: List[frozenset] = []
+_worker_groups: Optional["RecordingDisjointSet"] = None
+_worker_params: Dict = {}
+
+
+class RecordingDisjointSet(DisjointSet):
+    """
+    DisjointSet that remembers every union that joined two sets, so a
+    worker's connectivity can be replayed onto the parent's forest
+    """
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.unions: List[Tuple[int, int]] = []
+
+    def union(self, a: int, b: int) -> int:
+        root_a = self.find(a)
+        root_b = self.find(b)
+        if root_a != root_b:
+            self.unions.append((root_a, root_b))
+        return super().union(root_a, root_b)
+
+    def take_unions(self) -> List[Tuple[int, int]]:
+        unions, self.unions = self.unions, []
+        return unions
+
+
+def _share(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, ArraySpec]:
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec: ArraySpec) -> np.ndarray:
+    name, shape, dtype = spec
+    # spawned workers share the parent's resource tracker, so attaching
+    # here registers nothing new and the parent's unlink cleans up
+    block = shared_memory.SharedMemory(name=name)
+    _worker_blocks.append(block)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+def _init_worker(specs: Dict[str, ArraySpec], threshold: float, rows: int):
+    global _worker_sets, _worker_groups
+    for name, spec in specs.items():
+        _worker_arrays[name] = _attach(spec)
+    members = _worker_arrays["set_members"].tolist()
+    offsets = _worker_arrays["set_offsets"].tolist()
+    _worker_sets = [frozenset(members[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+    _worker_groups = RecordingDisjointSet(len(_worker_sets))
+    _worker_params.update(threshold=threshold, rows=rows)
+
+
+def _verify_band(band: int) -> List[Tuple[int, int]]:
+    """
+    verify one band's buckets against this worker's forest, which carries
+    over from the bands it verified before; returns the new unions
+    """
+    signatures = _worker_arrays["signatures"]
+    index_arr = _worker_arrays["indices"]
+    for bucket in band_buckets(signatures, index_arr, band, _worker_params["rows"]):
+        _union_bucket(_worker_groups, _worker_sets, bucket, _worker_params["threshold"])
+    return _worker_groups.take_unions()
+
+
+def parallel_lsh_similar_groups(
+    sets: Sequence[frozenset],
+    threshold: float,
+    workers: int,
+    num_perm: int = 128,
+    seed: int = 1,
+) -> DisjointSet:
+    """
+    lsh_similar_groups with bucket verification (the expensive part)
+    sharded by lsh band over a spawn process pool
+    the sets (as csr int arrays) and their signatures go to the workers
+    through shared memory; each worker verifies whole bands against its own
+    forest and returns the unions it made, which the parent replays
+    unions only ever join verified-similar sets, and the root of a group is
+    its smallest member, so the groups and their roots are exactly those of
+    lsh_similar_groups for any worker count or band scheduling
+    sets must hold ints (e.g. hashtag vocabulary ids)
+    """
+    groups = DisjointSet(len(sets))
+    indices = [i for i, members in enumerate(sets) if members]
+    if len(indices) < 2:
+        return groups
+
+    bands, rows = optimal_band_params(threshold, num_perm)
+    signatures = MinHasher(num_perm=num_perm, seed=seed).signatures([sets[i] for i in indices])
+    set_offsets = np.zeros(len(sets) + 1, dtype=np.int64)
+    np.cumsum([len(members) for members in sets], out=set_offsets[1:])
+    set_members = np.fromiter(
+        (member for members in sets for member in members),
+        dtype=np.int64,
+        count=int(set_offsets[-1]),
+    )
+
+    blocks = []
+    specs = {}
+    try:
+        for name, array in (
+            ("signatures", signatures),
+            ("indices", np.asarray(indices, dtype=np.int64)),
+            ("set_members", set_members),
+            ("set_offsets", set_offsets),
+        ):
+            block, specs[name] = _share(array)
+            blocks.append(block)
+
+        with ProcessPoolExecutor(
+            max_workers=min(workers, bands),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(specs, threshold, rows),
+        ) as executor:
+            for unions in executor.map(_verify_band, range(bands)):
+                for a, b in unions:
+                    groups.union(a, b)
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return groups
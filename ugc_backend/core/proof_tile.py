@@ -1,9 +1,14 @@
 from datetime import datetime
 from typing import List, Dict, Optional, Tuple
 from enum import Enum
+import numpy as np
 from pydantic import BaseModel
-from ugc_backend.core.models import ContentPost, TrendStatus
+from ugc_backend.core.models import TrendStatus
+from ugc_backend.core.cluster import Cluster
+from ugc_backend.core.frame import PLATFORMS, REGIONS, TIERS
 from ugc_backend.core.trend import TrendSignal
+from ugc_backend.core.snapshot import EngagementDelta
+from ugc_backend.core.vocab import creator_vocabulary
 
 
 class UrgencyLevel(str, Enum):
@@ -36,25 +41,27 @@ class ProofTileGenerator:
     def __init__(self, urgency_threshold: float = 0.8):
         self.urgency_threshold = urgency_threshold
 
-    def generate(self, signal: TrendSignal) -> ProofTile:
+    def generate(self, signal: TrendSignal, deltas: Optional[Dict[str, EngagementDelta]] = None) -> ProofTile:
         """
         transform validated trend into actionable proof tile
         includes complete evidence and transparent metrics
+        deltas: per-post engagement growth over the last 24h, see
+        SnapshotRepository.get_deltas
         """
-        posts = signal.cluster.posts
-        health = signal.cluster.calculate_health()
+        cluster = signal.cluster
+        health = cluster.calculate_health()
 
         urgency, recommendation = self._calculate_urgency(signal)
         
         headline = self._generate_headline(signal)
         
-        metrics = self._calculate_metrics(signal, posts, health)
+        metrics = self._calculate_metrics(signal, cluster, health, deltas or {})
         
         suggested_action = self._generate_suggestions(signal)
         
-        example_posts = self._select_example_posts(posts)
+        example_posts = self._select_example_posts(cluster)
         
-        creator_samples = self._select_creator_samples(posts)
+        creator_samples = self._select_creator_samples(cluster)
 
         tile_id = f"tile_{signal.signal_id}"
         
@@ -96,18 +103,32 @@ class ProofTileGenerator:
     def _calculate_metrics(
         self,
         signal: TrendSignal,
-        posts: List[ContentPost],
+        cluster: Cluster,
         health,
+        deltas: Optional[Dict[str, EngagementDelta]] = None,
     ) -> Dict[str, float]:
-        total_engagement = sum(post.total_engagement for post in posts)
+        """
+        growth_rate_24h is the mean engagement a post gains per 24h, measured
+        from snapshot deltas where a post has them and from its lifetime
+        average otherwise
+        """
+        total_engagement = cluster.total_engagement
         
-        from ugc_backend.core.metrics import calculate_velocity_score, calculate_saturation_level
-        velocities = [calculate_velocity_score(post) for post in posts]
-        avg_velocity = sum(velocities) / len(velocities) if velocities else 0.0
+        from ugc_backend.core.metrics import batch_velocity_scores, calculate_saturation_level, delta_arrays
+        delta_engagement = delta_hours = None
+        if deltas:
+            delta_engagement, delta_hours = delta_arrays(cluster.post_ids, deltas)
+        velocities = batch_velocity_scores(
+            cluster.frame.total_engagement[cluster.rows],
+            cluster.frame.first_seen[cluster.rows],
+            delta_engagement=delta_engagement,
+            delta_hours=delta_hours,
+        )
+        avg_velocity = float(velocities.mean()) if len(velocities) else 0.0
         
         hours_active = (datetime.now() - signal.first_detected).total_seconds() / 3600.0
         days_active = max(hours_active / 24.0, 1.0)
-        saturation = calculate_saturation_level(posts, days_active)
+        saturation = calculate_saturation_level(cluster.rows, days_active)
         
         growth_rate_24h = avg_velocity * 24.0
 
@@ -127,7 +148,7 @@ class ProofTileGenerator:
     def _generate_suggestions(self, signal: TrendSignal) -> Dict[str, List[str]]:
         hashtags = signal.primary_hashtags[:5]
         
-        content_types = list(set(post.content_type.value for post in signal.cluster.posts))
+        content_types = list(signal.cluster.content_types)
         
         platforms = [p.value for p in signal.platforms]
 
@@ -137,13 +158,7 @@ class ProofTileGenerator:
             "platforms": platforms,
         }
 
-    def _select_example_posts(self, posts: List[ContentPost], limit: int = 5) -> List[Dict]:
-        sorted_posts = sorted(
-            posts,
-            key=lambda p: p.total_engagement,
-            reverse=True,
-        )[:limit]
-
+    def _select_example_posts(self, cluster: Cluster, limit: int = 5) -> List[Dict]:
         return [
             {
                 "post_id": post.post_id,
@@ -157,31 +172,46 @@ class ProofTileGenerator:
                 "shares": post.shares,
                 "timestamp": post.timestamp.isoformat(),
             }
-            for post in sorted_posts
+            for post in cluster.top_posts(limit)
         ]
 
-    def _select_creator_samples(self, posts: List[ContentPost], limit: int = 5) -> List[Dict]:
-        creator_map = {}
-        for post in posts:
-            creator_id = post.creator.creator_id
-            if creator_id not in creator_map:
-                creator_map[creator_id] = {
-                    "creator_id": creator_id,
-                    "username": post.creator.username,
-                    "platform": post.creator.platform.value,
-                    "follower_count": post.creator.follower_count,
-                    "tier": post.creator.tier.value,
-                    "region": post.creator.region.value,
-                    "post_count": 0,
-                    "total_engagement": 0,
-                }
-            creator_map[creator_id]["post_count"] += 1
-            creator_map[creator_id]["total_engagement"] += post.total_engagement
-
-        creators = sorted(
-            creator_map.values(),
-            key=lambda c: c["total_engagement"],
-            reverse=True,
-        )[:limit]
+    def _select_creator_samples(self, cluster: Cluster, limit: int = 5) -> List[Dict]:
+        """
+        per-creator post count and engagement, aggregated on frame columns
+        profile fields come from each creator's first post in the cluster
+        """
+        frame = cluster.frame
+        rows = cluster.rows
+        if len(rows) == 0:
+            return []
+
+        creator_keys, first_positions, inverse = np.unique(
+            frame.creator_keys[rows],
+            return_index=True,
+            return_inverse=True,
+        )
+        post_counts = np.bincount(inverse, minlength=len(creator_keys))
+        engagement = np.bincount(
+            inverse,
+            weights=frame.total_engagement[rows],
+            minlength=len(creator_keys),
+        )
+
+        by_first_seen = np.argsort(first_positions, kind="stable")
+        top = by_first_seen[np.argsort(-engagement[by_first_seen], kind="stable")][:limit]
+
+        creators = []
+        for creator in top:
+            row = rows[first_positions[creator]]
+            creators.append({
+                "creator_id": creator_vocabulary.lookup(int(creator_keys[creator])),
+                "username": frame.creator_usernames[row],
+                "platform": PLATFORMS[frame.platform[row]].value,
+                "follower_count": int(frame.creator_follower_counts[row]),
+                "tier": TIERS[frame.tier[row]].value,
+                "region": REGIONS[frame.region[row]].value,
+                "post_count": int(post_counts[creator]),
+                "total_engagement": int(engagement[creator]),
+            })
 
         return creators
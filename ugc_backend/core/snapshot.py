@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+
+EPOCH = datetime(1970, 1, 1)
+COUNTERS = ("views", "likes", "comments", "shares", "saves")
+
+
+def snapshot_day(captured_at: datetime) -> int:
+    """
+    partition key of a snapshot: whole days since the epoch
+    """
+    return (captured_at.replace(tzinfo=None) - EPOCH).days
+
+
+@dataclass
+class EngagementDelta:
+    """
+    counter growth of one post between its first and last snapshot in an
+    interval
+    """
+    post_id: str
+    start: datetime
+    end: datetime
+    views: int
+    likes: int
+    comments: int
+    shares: int
+    saves: int
+
+    @property
+    def engagement(self) -> int:
+        return self.likes + self.comments + self.shares + self.saves
+
+    @property
+    def hours(self) -> float:
+        return (self.end - self.start).total_seconds() / 3600.0
+
+    @property
+    def velocity(self) -> float:
+        """
+        engagements per hour over the interval, 0.0 for a zero-length one
+        """
+        hours = self.hours
+        if hours <= 0:
+            return 0.0
+        return self.engagement / hours
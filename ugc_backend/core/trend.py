@@ -5,6 +5,10 @@ from ugc_backend.core.cluster import Cluster
 from ugc_backend.core.metrics import calculate_validation_confidence
 
 
+def signal_id_for(cluster_id: str) -> str:
+    return f"signal_{cluster_id}"
+
+
 class TrendSignal:
     def __init__(
         self,
@@ -26,11 +30,11 @@ class TrendSignal:
 
     @property
     def creator_replication_count(self) -> int:
-        return len(self.cluster.unique_creators)
+        return self.cluster.creator_count
 
     @property
     def post_count(self) -> int:
-        return len(self.cluster.posts)
+        return self.cluster.post_count
 
     @property
     def platforms(self) -> Set[Platform]:
@@ -90,7 +94,7 @@ class TrendValidator:
         if health.health_score < 0.5:
             status = TrendStatus.emerging
         else:
-            creator_count = len(cluster.unique_creators)
+            creator_count = cluster.creator_count
             region_count = len(cluster.regions)
             platform_count = len(cluster.platforms)
 
@@ -110,7 +114,7 @@ class TrendValidator:
             else:
                 status = TrendStatus.emerging
 
-        signal_id = f"signal_{cluster.cluster_id}"
+        signal_id = signal_id_for(cluster.cluster_id)
         signal = TrendSignal(
             signal_id=signal_id,
             cluster=cluster,
@@ -0,0 +1,162 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class Vocabulary:
+    """
+    string -> dense int id interning with reverse lookup
+    ids are assigned in first-seen order and stay fixed while the token is
+    in use, so a persisted vocabulary reloaded before any interning gives
+    the same ids next run; compact() releases tokens nothing uses any more
+    and their ids are handed out again to new tokens
+    """
+
+    def __init__(self, tokens: Iterable[str] = ()):
+        self._ids: Dict[str, int] = {}
+        self._tokens: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._unused: Set[int] = set()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._saved_version = 0
+        for token in tokens:
+            self.intern(token)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, token: str) -> bool:
+        return token in self._ids
+
+    def intern(self, token: str) -> int:
+        token_id = self._ids.get(token)
+        if token_id is not None:
+            return token_id
+        with self._lock:
+            token_id = self._ids.get(token)
+            if token_id is None:
+                if self._free:
+                    token_id = self._free.pop()
+                    self._tokens[token_id] = token
+                else:
+                    token_id = len(self._tokens)
+                    self._tokens.append(token)
+                self._ids[token] = token_id
+                self._version += 1
+            return token_id
+
+    def intern_many(self, tokens: Iterable[str]) -> List[int]:
+        return [self.intern(token) for token in tokens]
+
+    def get(self, token: str) -> Optional[int]:
+        return self._ids.get(token)
+
+    def lookup(self, token_id: int) -> str:
+        return self._tokens[token_id]
+
+    def lookup_many(self, token_ids: Iterable[int]) -> List[str]:
+        tokens = self._tokens
+        return [tokens[token_id] for token_id in token_ids]
+
+    @property
+    def tokens(self) -> List[Optional[str]]:
+        """
+        tokens by id, None for released ids
+        """
+        return list(self._tokens)
+
+    @property
+    def dirty(self) -> bool:
+        return self._version != self._saved_version
+
+    def extend(self, tokens: Iterable[Optional[str]]):
+        """
+        intern persisted tokens in their stored order, None marking a
+        released id that new tokens may take
+        raises if a token already has a different id, which happens when
+        a vocabulary is loaded after interning has started
+        """
+        released = []
+        for expected_id, token in enumerate(tokens):
+            if token is None:
+                with self._lock:
+                    if expected_id == len(self._tokens):
+                        self._tokens.append(None)
+                        released.append(expected_id)
+                continue
+            token_id = self.intern(token)
+            if token_id != expected_id:
+                raise ValueError(
+                    f"vocabulary id mismatch for {token!r}: stored {expected_id}, assigned {token_id}"
+                )
+        # reusable only once every stored id is back in place
+        self._free.extend(reversed(released))
+        self._saved_version = self._version
+
+    def compact(self, used_ids: Iterable[int]) -> int:
+        """
+        release tokens whose ids were missing from used_ids at this and the
+        previous compact, returns how many were released
+        the grace period covers ids still held outside whatever used_ids was
+        collected from (e.g. a discovery run's frame), which must not outlive
+        one compaction interval
+        """
+        with self._lock:
+            unused = set(self._ids.values())
+            unused.difference_update(used_ids)
+            released = unused & self._unused
+            for token_id in released:
+                del self._ids[self._tokens[token_id]]
+                self._tokens[token_id] = None
+                self._free.append(token_id)
+            self._unused = unused - released
+            if released:
+                self._version += 1
+            return len(released)
+
+
+hashtag_vocabulary = Vocabulary()
+creator_vocabulary = Vocabulary()
+
+
+def save_vocabularies(path: str) -> bool:
+    """
+    persist the process-wide vocabularies as json
+    written to a temp file and renamed so a crash never leaves a partial file
+    returns False when nothing changed since the last save
+    """
+    if not hashtag_vocabulary.dirty and not creator_vocabulary.dirty:
+        return False
+
+    versions = hashtag_vocabulary._version, creator_vocabulary._version
+    hashtags = hashtag_vocabulary.tokens
+    creators = creator_vocabulary.tokens
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_suffix(target.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"hashtags": hashtags, "creators": creators}, f)
+    os.replace(tmp_path, target)
+
+    hashtag_vocabulary._saved_version, creator_vocabulary._saved_version = versions
+    return True
+
+
+def load_vocabularies(path: str) -> bool:
+    """
+    load persisted vocabularies into the process-wide instances
+    must run before any post is interned so stored ids are kept
+    """
+    if not Path(path).exists():
+        return False
+
+    with open(path, "r") as f:
+        data = json.load(f)
+
+    hashtag_vocabulary.extend(data.get("hashtags", []))
+    creator_vocabulary.extend(data.get("creators", []))
+    return True
@@ -0,0 +1,136 @@
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from ugc_backend.core.models import ContentPost, TrendStatus
+from ugc_backend.db.models import (
+    PostModel,
+    ClusterModel,
+    TrendModel,
+    ProofTileModel,
+)
+from ugc_backend.db.repository import (
+    FRAME_COLUMNS,
+    TILE_COLUMNS,
+    PostRepository,
+    tiles_page_select,
+    window_posts_select,
+)
+
+
+class AsyncPostRepository:
+    """
+    PostRepository over an AsyncSession
+    writes and sql aggregations reuse the sync implementation through
+    run_sync (same statements, async driver underneath); window reads
+    stream with AsyncSession.stream so chunks arrive without blocking
+    """
+
+    def __init__(self, session: AsyncSession, chunk_size: int = 500):
+        self.session = session
+        self.chunk_size = chunk_size
+
+    async def save_posts(self, posts: List[ContentPost]) -> Dict[str, int]:
+        return await self.session.run_sync(
+            lambda session: PostRepository(session, self.chunk_size).save_posts(posts)
+        )
+
+    async def stream_posts_by_window(
+        self,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = 5000,
+        columns: Sequence[str] = FRAME_COLUMNS,
+    ) -> AsyncIterator[List[Row]]:
+        result = await self.session.stream(window_posts_select(start, end, chunk_size, columns))
+        try:
+            async for partition in result.partitions():
+                yield partition
+        finally:
+            await result.close()
+
+    async def get_hashtag_counts(
+        self,
+        start: datetime,
+        end: datetime,
+        min_posts: int = 1,
+        max_posts: Optional[int] = None,
+    ) -> Dict[str, int]:
+        return await self.session.run_sync(
+            lambda session: PostRepository(session).get_hashtag_counts(start, end, min_posts, max_posts)
+        )
+
+    async def get_hashtag_cooccurrence(
+        self,
+        start: datetime,
+        end: datetime,
+        min_shared: int = 2,
+        min_posts: int = 1,
+    ) -> Dict[Tuple[str, str], int]:
+        return await self.session.run_sync(
+            lambda session: PostRepository(session).get_hashtag_cooccurrence(start, end, min_shared, min_posts)
+        )
+
+    async def count_posts(self) -> int:
+        return await self.session.scalar(select(func.count()).select_from(PostModel))
+
+
+class AsyncClusterRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_cluster(self, cluster_id: str) -> Optional[ClusterModel]:
+        return await self.session.scalar(select(ClusterModel).filter_by(cluster_id=cluster_id))
+
+
+class AsyncTrendRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_trend(self, signal_id: str) -> Optional[TrendModel]:
+        return await self.session.scalar(select(TrendModel).filter_by(signal_id=signal_id))
+
+    async def count_active_trends(self) -> int:
+        return await self.session.scalar(
+            select(func.count()).select_from(TrendModel).where(
+                TrendModel.status.in_([TrendStatus.validated.value, TrendStatus.validating.value])
+            )
+        )
+
+
+class AsyncProofTileRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_tiles_by_status(self, status: TrendStatus) -> List[ProofTileModel]:
+        result = await self.session.scalars(select(ProofTileModel).filter_by(status=status.value))
+        return list(result)
+
+    async def get_tiles_by_urgency(self, urgency: str) -> List[ProofTileModel]:
+        result = await self.session.scalars(select(ProofTileModel).filter_by(urgency=urgency))
+        return list(result)
+
+    async def get_tiles_page(
+        self,
+        status: Optional[str] = None,
+        urgency: Optional[str] = None,
+        sort: str = "created_at",
+        limit: int = 50,
+        after: Optional[Tuple] = None,
+        columns: Sequence[str] = TILE_COLUMNS,
+        raw_json: bool = False,
+    ) -> List[Row]:
+        """
+        see tiles_page_select
+        """
+        result = await self.session.execute(
+            tiles_page_select(status, urgency, sort, limit, after, columns, raw_json)
+        )
+        return list(result)
+
+    async def count_tiles(self, status: TrendStatus) -> int:
+        return await self.session.scalar(
+            select(func.count()).select_from(ProofTileModel).filter_by(status=status.value)
+        )
+
@@ -38,6 +38,52 @@ class PostModel(Base):
     )
 
 
+class HashtagModel(Base):
+    __tablename__ = "hashtags"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), unique=True, nullable=False, index=True)
+
+
+class PostHashtagModel(Base):
+    """
+    one row per (post, hashtag), timestamp copied from the post so window
+    queries never touch the posts table
+    """
+    __tablename__ = "post_hashtags"
+
+    post_id = Column(String(255), ForeignKey("posts.post_id"), primary_key=True)
+    hashtag_id = Column(Integer, ForeignKey("hashtags.id"), primary_key=True)
+    timestamp = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_post_hashtag_hashtag_timestamp", "hashtag_id", "timestamp"),
+        Index("idx_post_hashtag_timestamp_hashtag", "timestamp", "hashtag_id"),
+    )
+
+
+class EngagementSnapshotModel(Base):
+    """
+    append-only counter history, one row per capture of a post
+    day (days since epoch of captured_at) is the partition key retention
+    and downsampling work through, see SnapshotRepository.compact
+    """
+    __tablename__ = "engagement_snapshots"
+
+    post_id = Column(String(255), ForeignKey("posts.post_id"), primary_key=True)
+    captured_at = Column(DateTime, primary_key=True)
+    day = Column(Integer, nullable=False)
+    views = Column(Integer, default=0)
+    likes = Column(Integer, default=0)
+    comments = Column(Integer, default=0)
+    shares = Column(Integer, default=0)
+    saves = Column(Integer, default=0)
+
+    __table_args__ = (
+        Index("idx_snapshot_day", "day"),
+    )
+
+
 class ClusterModel(Base):
     __tablename__ = "clusters"
 
@@ -92,3 +138,8 @@ class ProofTileModel(Base):
     updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
 
     trend = relationship("TrendModel", backref="proof_tiles")
+
+    __table_args__ = (
+        Index("idx_tile_status_created", "status", "created_at"),
+        Index("idx_tile_urgency_created", "urgency", "created_at"),
+    )
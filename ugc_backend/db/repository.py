@@ -1,41 +1,235 @@
-from typing import List, Optional
-from datetime import datetime
-from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import Text, and_, bindparam, case, cast, delete, func, literal_column, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased
 from ugc_backend.core.models import ContentPost, TrendStatus
 from ugc_backend.core.cluster import Cluster
 from ugc_backend.core.trend import TrendSignal
-from ugc_backend.core.proof_tile import ProofTile
+from ugc_backend.core.proof_tile import ProofTile, UrgencyLevel
+from ugc_backend.core.snapshot import COUNTERS, EPOCH, EngagementDelta, snapshot_day
 from ugc_backend.db.models import (
     PostModel,
+    HashtagModel,
+    PostHashtagModel,
+    EngagementSnapshotModel,
     ClusterModel,
     TrendModel,
     ProofTileModel,
 )
 
 
+UPSERT_INSERTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+RECAPTURE_COLUMNS = ("views", "likes", "comments", "shares", "saves", "last_captured")
+
+# the posts columns PostFrame.from_rows reads
+FRAME_COLUMNS = (
+    "post_id",
+    "creator_id",
+    "creator_username",
+    "creator_follower_count",
+    "creator_tier",
+    "creator_region",
+    "platform",
+    "content_type",
+    "caption",
+    "hashtags",
+    "timestamp",
+    "views",
+    "likes",
+    "comments",
+    "shares",
+    "saves",
+    "first_seen",
+    "last_captured",
+    "capture_count",
+)
+
+
+def window_posts_select(
+    start: datetime,
+    end: datetime,
+    chunk_size: int = 5000,
+    columns: Sequence[str] = FRAME_COLUMNS,
+):
+    return (
+        select(*(getattr(PostModel, name) for name in columns))
+        .where(PostModel.timestamp >= start, PostModel.timestamp <= end)
+        .execution_options(yield_per=chunk_size)
+    )
+
+
+TILE_SORTS = ("created_at", "urgency", "validation_confidence")
+
+# list views select these and skip the example_posts / creator_samples blobs
+TILE_COLUMNS = (
+    "tile_id",
+    "headline",
+    "urgency",
+    "recommendation",
+    "metrics",
+    "suggested_action",
+    "example_posts",
+    "creator_samples",
+    "status",
+    "created_at",
+    "updated_at",
+)
+
+# json columns read back as their stored text, for splicing into responses
+# without a parse / re-serialize round trip
+TILE_RAW_JSON_COLUMNS = ("example_posts", "creator_samples")
+
+URGENCY_RANK = case({"high": 3, "medium": 2, "low": 1}, value=ProofTileModel.urgency, else_=0)
+
+
+def tiles_page_select(
+    status: Optional[str] = None,
+    urgency: Optional[str] = None,
+    sort: str = "created_at",
+    limit: int = 50,
+    after: Optional[Tuple] = None,
+    columns: Sequence[str] = TILE_COLUMNS,
+    raw_json: bool = False,
+):
+    """
+    one keyset page of proof tiles, highest sort key first
+    rows are (sort_key, created_at, id, *columns); pass the last row's
+    first three values as after to get the next page. sort_key is the
+    urgency rank, the trend's validation_confidence or created_at itself,
+    ties broken by (created_at, id) so pages never overlap or skip
+    filtering on status or urgency walks idx_tile_status_created /
+    idx_tile_urgency_created
+    raw_json returns TILE_RAW_JSON_COLUMNS as json text instead of objects
+    """
+    if sort not in TILE_SORTS:
+        raise ValueError(f"unknown sort: {sort}")
+
+    tile = ProofTileModel
+    if sort == "urgency":
+        sort_key = URGENCY_RANK
+    elif sort == "validation_confidence":
+        sort_key = func.coalesce(TrendModel.validation_confidence, 0.0)
+    else:
+        sort_key = tile.created_at
+
+    stmt = select(
+        sort_key.label("sort_key"),
+        tile.created_at.label("cursor_created_at"),
+        tile.id.label("cursor_id"),
+        *(
+            cast(getattr(tile, name), Text).label(name)
+            if raw_json and name in TILE_RAW_JSON_COLUMNS
+            else getattr(tile, name)
+            for name in columns
+        ),
+    )
+    if sort == "validation_confidence":
+        stmt = stmt.outerjoin(TrendModel, TrendModel.signal_id == tile.trend_id)
+    if status is not None:
+        stmt = stmt.where(tile.status == status)
+    if urgency is not None:
+        stmt = stmt.where(tile.urgency == urgency)
+    if after is not None:
+        stmt = stmt.where(tuple_(sort_key, tile.created_at, tile.id) < tuple_(*after))
+
+    return stmt.order_by(sort_key.desc(), tile.created_at.desc(), tile.id.desc()).limit(limit)
+
+
 class PostRepository:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, chunk_size: int = 500):
         self.session = session
+        self.chunk_size = chunk_size
 
-    def save_posts(self, posts: List[ContentPost]) -> int:
+    def save_posts(self, posts: List[ContentPost]) -> Dict[str, int]:
+        """
+        insert new posts and refresh the counters of stored ones
+        postgres / sqlite run one INSERT .. ON CONFLICT (post_id) DO UPDATE
+        per chunk, other dialects fall back to the per-row loop
+        a post repeated within the batch is stored once, last copy wins
+        returns inserted / updated counts
+        """
         if not posts:
-            return 0
-        
-        saved_count = 0
+            return {"inserted": 0, "updated": 0}
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in UPSERT_INSERTS:
+            return self._save_posts_per_row(posts)
+
+        unique_posts = list({post.post_id: post for post in posts}.values())
+        inserted = 0
+        try:
+            for start in range(0, len(unique_posts), self.chunk_size):
+                chunk = unique_posts[start:start + self.chunk_size]
+                new_posts = self._upsert_chunk(chunk, dialect)
+                self._save_post_hashtags(new_posts)
+                self._save_snapshots(chunk)
+                inserted += len(new_posts)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return {"inserted": inserted, "updated": len(unique_posts) - inserted}
+
+    def _upsert_chunk(self, posts: List[ContentPost], dialect: str) -> List[ContentPost]:
+        """
+        returns the posts of the chunk that were inserted
+        postgres reports it per row (xmax is 0 only for freshly inserted
+        tuples), sqlite has no equivalent so existing ids are selected first
+        """
+        stmt = UPSERT_INSERTS[dialect](PostModel.__table__)
+        updates = {name: stmt.excluded[name] for name in RECAPTURE_COLUMNS}
+        updates["capture_count"] = PostModel.__table__.c.capture_count + 1
+        updates["updated_at"] = datetime.now()
+        stmt = stmt.on_conflict_do_update(index_elements=["post_id"], set_=updates)
+
+        # executemany keeps one cached compiled statement, sqlalchemy batches
+        # the rows into multi-row VALUES on both dialects
+        rows = [self._post_to_row(post) for post in posts]
+
+        if dialect == "postgresql":
+            stmt = stmt.returning(PostModel.post_id, literal_column("xmax = 0").label("inserted"))
+            inserted = set(post_id for post_id, is_new in self.session.execute(stmt, rows) if is_new)
+            return [post for post in posts if post.post_id in inserted]
+
+        existing = set(self.session.execute(
+            select(PostModel.post_id).where(PostModel.post_id.in_([post.post_id for post in posts]))
+        ).scalars())
+        self.session.execute(stmt, rows)
+        return [post for post in posts if post.post_id not in existing]
+
+    def _save_posts_per_row(self, posts: List[ContentPost]) -> Dict[str, int]:
+        inserted = 0
+        updated = 0
+        pending = {}
+        new_posts = []
         try:
             for post in posts:
-                existing = self.session.query(PostModel).filter_by(post_id=post.post_id).first()
+                existing = pending.get(post.post_id)
+                if existing is None:
+                    existing = self.session.query(PostModel).filter_by(post_id=post.post_id).first()
                 if existing:
                     self._update_post_model(existing, post)
+                    updated += 1
                 else:
                     model = self._post_to_model(post)
                     self.session.add(model)
-                    saved_count += 1
+                    pending[post.post_id] = model
+                    new_posts.append(post)
+                    inserted += 1
+            self.session.flush()
+            self._save_post_hashtags(new_posts)
+            self._save_snapshots(posts)
             self.session.commit()
-        except Exception as e:
+        except Exception:
             self.session.rollback()
             raise
-        return saved_count
+        return {"inserted": inserted, "updated": updated}
 
     def get_posts_by_window(self, start: datetime, end: datetime) -> List[PostModel]:
         return (
@@ -44,11 +238,175 @@ class PostRepository:
             .all()
         )
 
+    def stream_posts_by_window(
+        self,
+        start: datetime,
+        end: datetime,
+        chunk_size: int = 5000,
+        columns: Sequence[str] = FRAME_COLUMNS,
+    ) -> Iterator[List[Row]]:
+        """
+        posts in [start, end] as chunks of at most chunk_size plain rows
+        only the given columns are selected and no ORM objects are built;
+        yield_per makes postgres use a server-side cursor, so memory is
+        bounded by one chunk instead of the whole window
+        """
+        result = self.session.execute(window_posts_select(start, end, chunk_size, columns))
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
+    def get_hashtag_counts(
+        self,
+        start: datetime,
+        end: datetime,
+        min_posts: int = 1,
+        max_posts: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        hashtag -> number of posts in [start, end] carrying it, counted in sql
+        hashtags outside [min_posts, max_posts] never leave the database
+        """
+        post_count = func.count().label("post_count")
+        counts = (
+            select(PostHashtagModel.hashtag_id, post_count)
+            .where(PostHashtagModel.timestamp >= start, PostHashtagModel.timestamp <= end)
+            .group_by(PostHashtagModel.hashtag_id)
+            .having(post_count >= min_posts)
+        )
+        if max_posts is not None:
+            counts = counts.having(post_count <= max_posts)
+        counts = counts.subquery()
+
+        stmt = select(HashtagModel.name, counts.c.post_count).join(
+            counts, HashtagModel.id == counts.c.hashtag_id
+        )
+        return dict(self.session.execute(stmt).all())
+
+    def get_hashtag_cooccurrence(
+        self,
+        start: datetime,
+        end: datetime,
+        min_shared: int = 2,
+        min_posts: int = 1,
+    ) -> Dict[Tuple[str, str], int]:
+        """
+        (hashtag, hashtag) -> posts in [start, end] carrying both, counted in
+        sql with a self join of post_hashtags. pairs are name-sorted, only
+        pairs shared by >= min_shared posts are returned, and hashtags on
+        fewer than min_posts posts are dropped before the join
+        """
+        in_window = (PostHashtagModel.timestamp >= start, PostHashtagModel.timestamp <= end)
+        tagged = select(PostHashtagModel.post_id, PostHashtagModel.hashtag_id).where(*in_window)
+        if min_posts > 1:
+            frequent = (
+                select(PostHashtagModel.hashtag_id)
+                .where(*in_window)
+                .group_by(PostHashtagModel.hashtag_id)
+                .having(func.count() >= min_posts)
+            )
+            tagged = tagged.where(PostHashtagModel.hashtag_id.in_(frequent))
+
+        first = tagged.subquery("first_tagged")
+        second = tagged.subquery("second_tagged")
+        shared = func.count().label("shared")
+        pairs = (
+            select(first.c.hashtag_id.label("first_id"), second.c.hashtag_id.label("second_id"), shared)
+            .join(second, and_(
+                first.c.post_id == second.c.post_id,
+                first.c.hashtag_id < second.c.hashtag_id,
+            ))
+            .group_by(first.c.hashtag_id, second.c.hashtag_id)
+            .having(shared >= min_shared)
+            .subquery()
+        )
+
+        first_tag = aliased(HashtagModel)
+        second_tag = aliased(HashtagModel)
+        stmt = (
+            select(first_tag.name, second_tag.name, pairs.c.shared)
+            .join(first_tag, first_tag.id == pairs.c.first_id)
+            .join(second_tag, second_tag.id == pairs.c.second_id)
+        )
+        return {
+            tuple(sorted((tag1, tag2))): count
+            for tag1, tag2, count in self.session.execute(stmt)
+        }
+
+    def get_post_ids_by_hashtag(self, hashtag: str, start: datetime, end: datetime) -> List[str]:
+        stmt = (
+            select(PostHashtagModel.post_id)
+            .join(HashtagModel, HashtagModel.id == PostHashtagModel.hashtag_id)
+            .where(
+                HashtagModel.name == hashtag,
+                PostHashtagModel.timestamp >= start,
+                PostHashtagModel.timestamp <= end,
+            )
+        )
+        return list(self.session.execute(stmt).scalars())
+
+    def backfill_post_hashtags(self) -> int:
+        """
+        populate post_hashtags for posts stored before the table existed
+        returns how many posts were scanned
+        """
+        stmt = select(PostModel.post_id, PostModel.hashtags, PostModel.timestamp).execution_options(
+            yield_per=self.chunk_size
+        )
+        scanned = 0
+        try:
+            for chunk in self.session.execute(stmt).partitions():
+                self._save_post_hashtags(chunk)
+                scanned += len(chunk)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return scanned
+
+    def _save_post_hashtags(self, posts: Iterable):
+        """
+        posts only need post_id, hashtags and timestamp; existing rows are kept
+        """
+        posts = [post for post in posts if post.hashtags]
+        if not posts:
+            return
+
+        names = sorted(set(tag for post in posts for tag in post.hashtags))
+        insert_missing(self.session, HashtagModel, [{"name": name} for name in names], ["name"], self.chunk_size)
+
+        hashtag_ids = {}
+        for start in range(0, len(names), self.chunk_size):
+            chunk = names[start:start + self.chunk_size]
+            hashtag_ids.update(self.session.execute(
+                select(HashtagModel.name, HashtagModel.id).where(HashtagModel.name.in_(chunk))
+            ).all())
+
+        rows = [
+            {"post_id": post.post_id, "hashtag_id": hashtag_ids[tag], "timestamp": post.timestamp}
+            for post in posts
+            for tag in set(post.hashtags)
+        ]
+        insert_missing(self.session, PostHashtagModel, rows, ["post_id", "hashtag_id"], self.chunk_size)
+
+    def _save_snapshots(self, posts: Iterable[ContentPost]):
+        """
+        one engagement snapshot per capture; re-sending a capture with the
+        same last_captured is a no-op
+        """
+        rows = [snapshot_row(post) for post in posts]
+        insert_missing(self.session, EngagementSnapshotModel, rows, ["post_id", "captured_at"], self.chunk_size)
+
     def get_posts_by_ids(self, post_ids: List[str]) -> List[PostModel]:
         return self.session.query(PostModel).filter(PostModel.post_id.in_(post_ids)).all()
 
     def _post_to_model(self, post: ContentPost) -> PostModel:
-        return PostModel(
+        return PostModel(**self._post_to_row(post))
+
+    def _post_to_row(self, post: ContentPost) -> dict:
+        return dict(
             post_id=post.post_id,
             creator_id=post.creator.creator_id,
             creator_username=post.creator.username,
@@ -77,7 +435,172 @@ class PostRepository:
         model.shares = post.shares
         model.saves = post.saves
         model.last_captured = post.last_captured
-        model.capture_count = post.capture_count
+        model.capture_count = (model.capture_count or 0) + 1
+
+
+def snapshot_row(post: ContentPost) -> dict:
+    return dict(
+        post_id=post.post_id,
+        captured_at=post.last_captured,
+        day=snapshot_day(post.last_captured),
+        views=post.views,
+        likes=post.likes,
+        comments=post.comments,
+        shares=post.shares,
+        saves=post.saves,
+    )
+
+
+class SnapshotRepository:
+    def __init__(self, session: Session, chunk_size: int = 500):
+        self.session = session
+        self.chunk_size = chunk_size
+
+    def record(self, posts: List[ContentPost]):
+        """
+        append snapshots for posts already stored; save_posts does this on
+        every ingest and recapture
+        """
+        rows = [snapshot_row(post) for post in posts]
+        try:
+            insert_missing(self.session, EngagementSnapshotModel, rows, ["post_id", "captured_at"], self.chunk_size)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+    def get_snapshots(self, post_id: str) -> List[EngagementSnapshotModel]:
+        return (
+            self.session.query(EngagementSnapshotModel)
+            .filter(EngagementSnapshotModel.post_id == post_id)
+            .order_by(EngagementSnapshotModel.captured_at)
+            .all()
+        )
+
+    def get_deltas(
+        self,
+        start: datetime,
+        end: datetime,
+        post_ids: Optional[Iterable[str]] = None,
+    ) -> Dict[str, EngagementDelta]:
+        """
+        per-post counter growth between the first and last snapshot captured
+        in [start, end]; posts with fewer than two snapshots there are left out
+        """
+        if post_ids is None:
+            return self._deltas(start, end, None)
+
+        post_ids = sorted(set(post_ids))
+        deltas = {}
+        for offset in range(0, len(post_ids), self.chunk_size):
+            deltas.update(self._deltas(start, end, post_ids[offset:offset + self.chunk_size]))
+        return deltas
+
+    def _deltas(self, start: datetime, end: datetime, post_ids: Optional[List[str]]) -> Dict[str, EngagementDelta]:
+        snapshot = EngagementSnapshotModel
+        conditions = [
+            snapshot.day >= snapshot_day(start),
+            snapshot.day <= snapshot_day(end),
+            snapshot.captured_at >= start,
+            snapshot.captured_at <= end,
+        ]
+        if post_ids is not None:
+            conditions.append(snapshot.post_id.in_(post_ids))
+
+        bounds = (
+            select(
+                snapshot.post_id,
+                func.min(snapshot.captured_at).label("first_captured"),
+                func.max(snapshot.captured_at).label("last_captured"),
+            )
+            .where(*conditions)
+            .group_by(snapshot.post_id)
+            .having(func.count() >= 2)
+            .subquery("bounds")
+        )
+        first = aliased(snapshot, name="first_snapshot")
+        last = aliased(snapshot, name="last_snapshot")
+        stmt = (
+            select(
+                bounds.c.post_id,
+                bounds.c.first_captured,
+                bounds.c.last_captured,
+                *(getattr(first, name) for name in COUNTERS),
+                *(getattr(last, name) for name in COUNTERS),
+            )
+            .join(first, and_(first.post_id == bounds.c.post_id, first.captured_at == bounds.c.first_captured))
+            .join(last, and_(last.post_id == bounds.c.post_id, last.captured_at == bounds.c.last_captured))
+        )
+
+        deltas = {}
+        width = len(COUNTERS)
+        for row in self.session.execute(stmt):
+            post_id, first_captured, last_captured = row[:3]
+            before = row[3:3 + width]
+            after = row[3 + width:]
+            deltas[post_id] = EngagementDelta(
+                post_id,
+                first_captured,
+                last_captured,
+                *((after[i] or 0) - (before[i] or 0) for i in range(width)),
+            )
+        return deltas
+
+    def compact(
+        self,
+        now: Optional[datetime] = None,
+        retention_days: int = 14,
+        full_resolution_days: int = 2,
+        resolution: timedelta = timedelta(hours=1),
+    ) -> Dict[str, int]:
+        """
+        retention / downsampling policy, run periodically:
+        - day partitions older than retention_days are dropped
+        - in older days past full_resolution_days only the last snapshot
+          per post per resolution bucket is kept
+        the newest days keep every recapture; returns deleted row counts
+        """
+        if now is None:
+            now = datetime.now()
+        today = snapshot_day(now)
+        snapshot = EngagementSnapshotModel
+        table = snapshot.__table__
+        bucket_seconds = resolution.total_seconds()
+
+        drop_stmt = delete(table).where(
+            table.c.post_id == bindparam("b_post_id"),
+            table.c.captured_at == bindparam("b_captured_at"),
+        )
+
+        try:
+            expired = self.session.execute(
+                delete(table).where(table.c.day < today - retention_days)
+            ).rowcount or 0
+
+            downsampled = 0
+            for day in range(today - retention_days, today - full_resolution_days):
+                rows = self.session.execute(
+                    select(snapshot.post_id, snapshot.captured_at)
+                    .where(snapshot.day == day)
+                    .order_by(snapshot.post_id, snapshot.captured_at)
+                )
+                drop = []
+                previous = None
+                for post_id, captured_at in rows:
+                    key = (post_id, int((captured_at - EPOCH).total_seconds() // bucket_seconds))
+                    if previous is not None and previous[0] == key:
+                        drop.append({"b_post_id": post_id, "b_captured_at": previous[1]})
+                    previous = (key, captured_at)
+
+                for offset in range(0, len(drop), self.chunk_size):
+                    self.session.execute(drop_stmt, drop[offset:offset + self.chunk_size])
+                downsampled += len(drop)
+
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return {"expired": expired, "downsampled": downsampled}
 
 
 class ClusterRepository:
@@ -85,11 +608,20 @@ class ClusterRepository:
         self.session = session
 
     def save_cluster(self, cluster: Cluster) -> ClusterModel:
+        model = ClusterModel(**self._cluster_to_row(cluster))
+        self.session.add(model)
+        self.session.commit()
+        return model
+
+    def get_cluster(self, cluster_id: str) -> Optional[ClusterModel]:
+        return self.session.query(ClusterModel).filter_by(cluster_id=cluster_id).first()
+
+    def _cluster_to_row(self, cluster: Cluster) -> dict:
         health = cluster.calculate_health()
-        model = ClusterModel(
+        return dict(
             cluster_id=cluster.cluster_id,
             primary_hashtags=cluster.primary_hashtags,
-            post_ids=[post.post_id for post in cluster.posts],
+            post_ids=cluster.post_ids,
             platforms=list(cluster.platforms),
             regions=list(cluster.regions),
             health_score=health.health_score,
@@ -97,15 +629,9 @@ class ClusterRepository:
             engagement_strength=health.engagement_strength,
             velocity_score=health.velocity_score,
             detection_confidence=health.detection_confidence,
-            post_count=len(cluster.posts),
-            creator_count=len(cluster.unique_creators),
+            post_count=cluster.post_count,
+            creator_count=cluster.creator_count,
         )
-        self.session.add(model)
-        self.session.commit()
-        return model
-
-    def get_cluster(self, cluster_id: str) -> Optional[ClusterModel]:
-        return self.session.query(ClusterModel).filter_by(cluster_id=cluster_id).first()
 
 
 class TrendRepository:
@@ -113,7 +639,13 @@ class TrendRepository:
         self.session = session
 
     def save_trend(self, signal: TrendSignal) -> TrendModel:
-        model = TrendModel(
+        model = TrendModel(**self._trend_to_row(signal))
+        self.session.add(model)
+        self.session.commit()
+        return model
+
+    def _trend_to_row(self, signal: TrendSignal) -> dict:
+        return dict(
             signal_id=signal.signal_id,
             cluster_id=signal.cluster.cluster_id,
             status=signal.status.value,
@@ -121,13 +653,23 @@ class TrendRepository:
             last_updated=signal.last_updated,
             validation_confidence=signal.validation_confidence,
         )
-        self.session.add(model)
-        self.session.commit()
-        return model
 
     def get_trend(self, signal_id: str) -> Optional[TrendModel]:
         return self.session.query(TrendModel).filter_by(signal_id=signal_id).first()
 
+    def get_first_detected(self, signal_ids: Iterable[str], chunk_size: int = 500) -> Dict[str, datetime]:
+        """
+        signal_id -> stored first_detected for the signals already persisted
+        """
+        signal_ids = list(dict.fromkeys(signal_ids))
+        found = {}
+        for start in range(0, len(signal_ids), chunk_size):
+            stmt = select(TrendModel.signal_id, TrendModel.first_detected).where(
+                TrendModel.signal_id.in_(signal_ids[start:start + chunk_size])
+            )
+            found.update((signal_id, detected) for signal_id, detected in self.session.execute(stmt))
+        return found
+
     def get_trends_by_status(self, status: TrendStatus) -> List[TrendModel]:
         return self.session.query(TrendModel).filter_by(status=status.value).all()
 
@@ -150,21 +692,24 @@ class ProofTileRepository:
         self.session = session
 
     def save_tile(self, tile: ProofTile) -> ProofTileModel:
-        model = ProofTileModel(
+        model = ProofTileModel(**self._tile_to_row(tile))
+        self.session.add(model)
+        self.session.commit()
+        return model
+
+    def _tile_to_row(self, tile: ProofTile) -> dict:
+        return dict(
             tile_id=tile.tile_id,
             trend_id=tile.trend_id,
             headline=tile.headline,
-            urgency=tile.urgency.value,
+            urgency=UrgencyLevel(tile.urgency).value,
             recommendation=tile.recommendation,
-            status=tile.status.value,
+            status=TrendStatus(tile.status).value,
             metrics=tile.metrics,
             suggested_action=tile.suggested_action,
             example_posts=tile.example_posts,
             creator_samples=tile.creator_samples,
         )
-        self.session.add(model)
-        self.session.commit()
-        return model
 
     def get_tile(self, tile_id: str) -> Optional[ProofTileModel]:
         return self.session.query(ProofTileModel).filter_by(tile_id=tile_id).first()
@@ -174,3 +719,130 @@ class ProofTileRepository:
 
     def get_tiles_by_urgency(self, urgency: str) -> List[ProofTileModel]:
         return self.session.query(ProofTileModel).filter_by(urgency=urgency).all()
+
+
+def insert_missing(session: Session, model, rows: List[dict], keys: List[str], chunk_size: int = 500):
+    """
+    insert rows whose keys are not stored yet, without committing
+    INSERT .. ON CONFLICT DO NOTHING on postgres / sqlite, a lookup per row
+    on other dialects
+    """
+    if not rows:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        for row in rows:
+            key = {name: row[name] for name in keys}
+            if session.query(model).filter_by(**key).first() is None:
+                session.add(model(**row))
+                session.flush()
+        return
+
+    stmt = UPSERT_INSERTS[dialect](model.__table__).on_conflict_do_nothing(index_elements=keys)
+    for start in range(0, len(rows), chunk_size):
+        session.execute(stmt, rows[start:start + chunk_size])
+
+
+def upsert_rows(
+    session: Session,
+    model,
+    rows: List[dict],
+    key: str,
+    chunk_size: int = 500,
+    keep: Sequence[str] = (),
+):
+    """
+    insert rows or overwrite the stored row with the same key, without
+    committing; columns in keep (e.g. first_detected) are only written on
+    insert and keep their stored value on conflict
+    postgres / sqlite use INSERT .. ON CONFLICT (key) DO UPDATE as an
+    executemany per chunk, other dialects load and update per row
+    """
+    if not rows:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        key_column = getattr(model, key)
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            existing = {
+                getattr(stored, key): stored
+                for stored in session.query(model).filter(key_column.in_([row[key] for row in chunk]))
+            }
+            for row in chunk:
+                stored = existing.get(row[key])
+                if stored is None:
+                    session.add(model(**row))
+                else:
+                    for name, value in row.items():
+                        if name not in keep:
+                            setattr(stored, name, value)
+        session.flush()
+        return
+
+    stmt = UPSERT_INSERTS[dialect](model.__table__)
+    updates = {name: stmt.excluded[name] for name in rows[0] if name != key and name not in keep}
+    updates["updated_at"] = datetime.now()
+    stmt = stmt.on_conflict_do_update(index_elements=[key], set_=updates)
+    for start in range(0, len(rows), chunk_size):
+        session.execute(stmt, rows[start:start + chunk_size])
+
+
+class DiscoveryWriter:
+    """
+    unit of work for one discovery run
+    collects clusters, trends and tiles and writes them in one transaction
+    (clusters, then trends, then tiles for the foreign keys), upserting on
+    cluster_id / signal_id / tile_id so re-running discovery refreshes the
+    rows of the same trends (ids are content derived, see
+    content_cluster_id) instead of failing on the unique constraints;
+    a trend's first_detected and every row's created_at are never rewritten
+    """
+
+    def __init__(self, session: Session, chunk_size: int = 500):
+        self.session = session
+        self.chunk_size = chunk_size
+        self.cluster_repo = ClusterRepository(session)
+        self.trend_repo = TrendRepository(session)
+        self.tile_repo = ProofTileRepository(session)
+        self.clusters: Dict[str, dict] = {}
+        self.trends: Dict[str, dict] = {}
+        self.tiles: Dict[str, dict] = {}
+
+    def add(self, cluster: Cluster, signal: TrendSignal, tile: ProofTile):
+        self.clusters[cluster.cluster_id] = self.cluster_repo._cluster_to_row(cluster)
+        self.trends[signal.signal_id] = self.trend_repo._trend_to_row(signal)
+        self.tiles[tile.tile_id] = self.tile_repo._tile_to_row(tile)
+
+    def flush(self) -> Dict[str, int]:
+        """
+        write everything collected so far and commit once
+        returns how many rows of each kind were written
+        """
+        written = {
+            "clusters": len(self.clusters),
+            "trends": len(self.trends),
+            "tiles": len(self.tiles),
+        }
+        try:
+            upsert_rows(self.session, ClusterModel, list(self.clusters.values()), "cluster_id", self.chunk_size)
+            upsert_rows(
+                self.session,
+                TrendModel,
+                list(self.trends.values()),
+                "signal_id",
+                self.chunk_size,
+                keep=("first_detected",),
+            )
+            upsert_rows(self.session, ProofTileModel, list(self.tiles.values()), "tile_id", self.chunk_size)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        self.clusters.clear()
+        self.trends.clear()
+        self.tiles.clear()
+        return written
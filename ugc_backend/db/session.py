@@ -1,16 +1,78 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, Session
 from typing import Generator
 from ugc_backend.db.models import Base
 
 
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """
+    swap the sync driver for its async counterpart
+    postgresql://... -> postgresql+asyncpg://..., sqlite://... -> sqlite+aiosqlite://...
+    """
+    scheme, sep, rest = database_url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"no async driver for database url scheme: {scheme}")
+    return f"{ASYNC_DRIVERS[backend]}{sep}{rest}"
+
+
+def enable_sqlite_wal(engine):
+    """
+    sqlite's default rollback journal makes a writer wait for every open
+    reader, so a discovery run streaming the window would stall ingest
+    commits. WAL lets readers and one writer proceed together
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_journal_mode(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
+
+
 class Database:
     def __init__(self, database_url: str):
         self.engine = create_engine(database_url, echo=False)
+        enable_sqlite_wal(self.engine)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
 
     def init_db(self):
+        """
+        create missing tables, and missing indexes on tables that already
+        existed (create_all only indexes the tables it creates)
+        """
         Base.metadata.create_all(bind=self.engine)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
 
     def get_session(self):
         return self.SessionLocal()
+
+
+class AsyncDatabase:
+    def __init__(self, database_url: str):
+        self.engine = create_async_engine(async_database_url(database_url), echo=False)
+        enable_sqlite_wal(self.engine.sync_engine)
+        self.SessionLocal = async_sessionmaker(
+            self.engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+
+    async def init_db(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    def get_session(self) -> AsyncSession:
+        return self.SessionLocal()
@@ -0,0 +1,330 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from ugc_backend.core.cluster import ClusteringEngine
+from ugc_backend.core.incremental import LiveClusterState
+from ugc_backend.core.window import WindowManager, WindowType
+from ugc_backend.db.session import Database
+from ugc_backend.discovery.pipeline import STAGES, DiscoveryPipeline
+from ugc_backend.utils.logging import get_logger
+from ugc_backend.utils.metrics import DISCOVERY_CLUSTERS, DISCOVERY_JOBS, DISCOVERY_STAGE_DURATION, STORE
+from ugc_backend.utils.profiling import StageProfiler
+
+logger = get_logger("ugc_backend.discovery")
+
+
+JOB_STATUSES = ("queued", "running", "completed", "failed")
+
+_worker_database: Optional[Database] = None
+_worker_progress = None
+
+
+def _init_worker(database_url: str, progress_queue):
+    global _worker_database, _worker_progress
+    _worker_database = Database(database_url)
+    _worker_progress = progress_queue
+
+
+def _run_job(
+    job_id: str,
+    window_type: str,
+    min_confidence: float,
+    window_hours: Dict[str, int],
+    clustering: Dict,
+    profile_path: Optional[str] = None,
+) -> Dict:
+    """
+    worker process entry point
+    progress goes to the parent as it happens; the full stage log is also
+    returned so the final job state never depends on queue timing
+    """
+    stages: Dict[str, Dict] = {}
+
+    def progress(stage: str, status: str, items: int):
+        event = _stage_event(stages, stage, status, items)
+        _worker_progress.put((job_id, stage, event))
+
+    session = _worker_database.get_session()
+    try:
+        pipeline = DiscoveryPipeline(
+            session,
+            window_manager=WindowManager(**window_hours),
+            clustering_engine=ClusteringEngine(**clustering),
+            progress=progress,
+            profiler=_profiler(profile_path),
+        )
+        result = pipeline.run(WindowType(window_type), min_confidence)
+    finally:
+        session.close()
+    return {"result": result, "stages": stages}
+
+
+def _profiler(profile_path: Optional[str]) -> StageProfiler:
+    """
+    profile runs trace allocations and dump a cProfile to profile_path,
+    every other run only records the cheap per-stage timings
+    """
+    if profile_path is None:
+        return StageProfiler()
+    os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+    return StageProfiler(trace_memory=True, profile_path=profile_path)
+
+
+def _stage_event(stages: Dict[str, Dict], stage: str, status: str, items: int) -> Dict:
+    event = stages.setdefault(stage, {"started_at": None, "finished_at": None})
+    now = time.time()
+    if status == "running":
+        event["started_at"] = event["started_at"] or now
+    else:
+        event["started_at"] = event["started_at"] or now
+        event["finished_at"] = now
+    event["status"] = status
+    event["items"] = items
+    return dict(event)
+
+
+class DiscoveryJob:
+    def __init__(
+        self,
+        job_id: str,
+        key: Tuple,
+        window_type: WindowType,
+        min_confidence: float,
+        profile: bool = False,
+    ):
+        self.job_id = job_id
+        self.key = key
+        self.window_type = window_type
+        self.min_confidence = min_confidence
+        self.profile = profile
+        self.status = "queued"
+        self.stages: Dict[str, Dict] = {
+            stage: {"status": "pending", "items": 0, "started_at": None, "finished_at": None}
+            for stage in STAGES
+        }
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def update_stage(self, stage: str, event: Dict):
+        self.stages[stage] = event
+        if self.status == "queued":
+            self.status = "running"
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "window_type": self.window_type.value,
+            "min_confidence": self.min_confidence,
+            "stages": [
+                {
+                    "stage": stage,
+                    "status": event["status"],
+                    "items": event["items"],
+                    "started_at": _from_timestamp(event["started_at"]),
+                    "finished_at": _from_timestamp(event["finished_at"]),
+                }
+                for stage, event in self.stages.items()
+            ],
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+def _from_timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+class DiscoveryJobQueue:
+    """
+    runs discovery as background jobs
+    - jobs run on a spawn-based process pool so clustering gets real cores
+      and never competes with the api's event loop for the gil
+    - with incremental clustering enabled the clusters live in this process,
+      so jobs run on a thread against the live state instead
+    - a submit matching an active job's window and min_confidence returns
+      that job instead of starting another; runs cover every platform
+    - finished jobs are kept for polling, oldest dropped past max_finished_jobs
+    - on_complete(job, result) runs on the finishing thread once a job
+      succeeds, before pollers can see it completed
+    - every job's result carries per-stage timings, logged when it finishes;
+      profile jobs also write discovery_{job_id}.prof under profile_dir
+    """
+
+    def __init__(
+        self,
+        database_url: str,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_workers: int = 2,
+        window_hours: Optional[Dict[str, int]] = None,
+        clustering: Optional[Dict] = None,
+        live_state: Optional[LiveClusterState] = None,
+        max_finished_jobs: int = 1000,
+        on_complete: Optional[Callable[[DiscoveryJob, Dict], None]] = None,
+        profile_dir: str = "logs/profiles",
+    ):
+        self.session_factory = session_factory
+        self.profile_dir = profile_dir
+        self.on_complete = on_complete
+        self.window_hours = window_hours or {}
+        self.clustering = clustering or {}
+        self.live_state = live_state
+        self.max_finished_jobs = max_finished_jobs
+
+        self._jobs: "OrderedDict[str, DiscoveryJob]" = OrderedDict()
+        self._active: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+        if live_state is None:
+            context = multiprocessing.get_context("spawn")
+            self._progress = context.Queue()
+            self._executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(database_url, self._progress),
+            )
+            self._listener = threading.Thread(target=self._drain_progress, daemon=True)
+            self._listener.start()
+        else:
+            self._progress = None
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="discovery")
+
+    def submit(
+        self,
+        window_type: WindowType,
+        min_confidence: float,
+        profile: bool = False,
+    ) -> DiscoveryJob:
+        key = (window_type.value, min_confidence, profile)
+        with self._lock:
+            job_id = self._active.get(key)
+            if job_id is not None:
+                return self._jobs[job_id]
+
+            job = DiscoveryJob(uuid.uuid4().hex, key, window_type, min_confidence, profile)
+            self._jobs[job.job_id] = job
+            self._active[key] = job.job_id
+
+        if self.live_state is None:
+            future = self._executor.submit(
+                _run_job,
+                job.job_id,
+                window_type.value,
+                min_confidence,
+                self.window_hours,
+                self.clustering,
+                self._profile_path(job),
+            )
+        else:
+            future = self._executor.submit(self._run_live_job, job)
+        future.add_done_callback(lambda done: self._finish(job, done))
+        return job
+
+    def get(self, job_id: str) -> Optional[DiscoveryJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _profile_path(self, job: DiscoveryJob) -> Optional[str]:
+        if not job.profile:
+            return None
+        return os.path.abspath(os.path.join(self.profile_dir, f"discovery_{job.job_id}.prof"))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._progress is not None:
+            self._progress.put(None)
+
+    def _run_live_job(self, job: DiscoveryJob) -> Dict:
+        stages: Dict[str, Dict] = {}
+
+        def progress(stage: str, status: str, items: int):
+            event = _stage_event(stages, stage, status, items)
+            with self._lock:
+                job.update_stage(stage, event)
+
+        session = self.session_factory()
+        try:
+            pipeline = DiscoveryPipeline(
+                session,
+                window_manager=WindowManager(**self.window_hours),
+                clustering_engine=ClusteringEngine(**self.clustering),
+                progress=progress,
+                profiler=_profiler(self._profile_path(job)),
+            )
+            clusters = self.live_state.clusters(job.window_type)
+            result = pipeline.run(job.window_type, job.min_confidence, clusters=clusters)
+        finally:
+            session.close()
+        return {"result": result, "stages": stages}
+
+    def _drain_progress(self):
+        while True:
+            message = self._progress.get()
+            if message is None:
+                return
+            job_id, stage, event = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is not None and job.active:
+                    job.update_stage(stage, event)
+
+    def _finish(self, job: DiscoveryJob, future: Future):
+        succeeded = not future.cancelled() and future.exception() is None
+        DISCOVERY_JOBS.labels("completed" if succeeded else "failed").inc()
+        if succeeded:
+            result = future.result()["result"]
+            DISCOVERY_CLUSTERS.observe(result["clusters_found"])
+            STORE.active_clusters = result["clusters_found"]
+            STORE.expire()
+            for timing in result.get("timings", []):
+                DISCOVERY_STAGE_DURATION.labels(timing["stage"]).observe(timing["wall_ms"] / 1000.0)
+                logger.info("discovery stage", job_id=job.job_id, **timing)
+            if result.get("hashtag_filter"):
+                logger.info("discovery hashtag filter", job_id=job.job_id, **result["hashtag_filter"])
+            if result.get("profile_path"):
+                logger.info("discovery profile written", job_id=job.job_id, path=result["profile_path"])
+
+        if self.on_complete is not None and succeeded:
+            try:
+                self.on_complete(job, future.result()["result"])
+            except Exception as e:
+                logger.warning("discovery on_complete failed", job_id=job.job_id, error=str(e))
+
+        with self._lock:
+            if future.cancelled():
+                job.status = "failed"
+                job.error = "cancelled"
+            elif future.exception() is not None:
+                job.status = "failed"
+                job.error = str(future.exception())
+            else:
+                outcome = future.result()
+                job.stages.update(outcome["stages"])
+                job.result = outcome["result"]
+                job.status = "completed"
+            job.finished_at = datetime.now()
+
+            if self._active.get(job.key) == job.job_id:
+                del self._active[job.key]
+            self._trim()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,185 @@
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from ugc_backend.core.cluster import Cluster, ClusteringEngine, calculate_cluster_healths, content_cluster_id
+from ugc_backend.core.frame import PostFrame
+from ugc_backend.core.proof_tile import ProofTileGenerator
+from ugc_backend.core.snapshot import EngagementDelta
+from ugc_backend.core.trend import TrendValidator, signal_id_for
+from ugc_backend.core.window import WindowManager, WindowType
+from ugc_backend.db.repository import PostRepository, SnapshotRepository, TrendRepository, DiscoveryWriter
+from ugc_backend.utils.profiling import StageProfiler, StageRecord
+
+
+STAGES = ("load", "cluster", "validate", "generate", "persist")
+
+# progress(stage, status, items) with status "running" or "completed"
+ProgressCallback = Callable[[str, str, int], None]
+
+
+def _no_progress(stage: str, status: str, items: int):
+    pass
+
+
+def assign_content_ids(clusters: List[Cluster], window_type: WindowType):
+    """
+    replace the clusterers' per-run ids with content_cluster_id, a suffix
+    keeps clusters with the same primary hashtags apart within a run
+    """
+    seen: Dict[str, int] = {}
+    for cluster in clusters:
+        cluster_id = content_cluster_id(window_type.value, cluster.primary_hashtags)
+        seen[cluster_id] = seen.get(cluster_id, 0) + 1
+        if seen[cluster_id] > 1:
+            cluster_id = f"{cluster_id}_{seen[cluster_id]}"
+        cluster.cluster_id = cluster_id
+
+
+class DiscoveryPipeline:
+    """
+    one discovery run over a time window:
+    1. load the window's posts into a PostFrame and its hashtag document
+       frequencies from post_hashtags (skipped when clusters are given), and
+       the last 24h of snapshot deltas
+    2. cluster them, after dropping rare / ubiquitous / stoplisted hashtags,
+       scoring velocity on the deltas (given clusters are copied and rescored)
+    3. key every cluster by window type and primary hashtags, validate it
+       (keeping a stored trend's first_detected), keep signals >= min_confidence
+    4. generate a proof tile per kept signal, growth from the same deltas
+    5. persist clusters, trends and tiles in one transaction
+    each stage reports running / completed with its item count, and the
+    profiler records wall / cpu time, items and peak memory per stage;
+    load is split into load.query (fetching row chunks), load.hashtag_counts,
+    load.deltas and load.frame (building the PostFrame), ClusteringEngine
+    adds cluster.* substages
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        window_manager: Optional[WindowManager] = None,
+        clustering_engine: Optional[ClusteringEngine] = None,
+        validator: Optional[TrendValidator] = None,
+        tile_generator: Optional[ProofTileGenerator] = None,
+        progress: ProgressCallback = _no_progress,
+        profiler: Optional[StageProfiler] = None,
+    ):
+        self.session = session
+        self.window_manager = window_manager or WindowManager()
+        self.clustering_engine = clustering_engine or ClusteringEngine()
+        self.validator = validator or TrendValidator()
+        self.tile_generator = tile_generator or ProofTileGenerator()
+        self.progress = progress
+        self.profiler = profiler or StageProfiler()
+
+    def run(
+        self,
+        window_type: WindowType,
+        min_confidence: float,
+        clusters: Optional[List[Cluster]] = None,
+    ) -> Dict:
+        """
+        returns the run's counts, tile ids and per-stage timings
+        """
+        profiler = self.profiler
+        with profiler.activate():
+            result = self._run(profiler, window_type, min_confidence, clusters)
+        result["timings"] = profiler.timings()
+        if profiler.profile_path:
+            result["profile_path"] = profiler.profile_path
+        return result
+
+    def _run(
+        self,
+        profiler: StageProfiler,
+        window_type: WindowType,
+        min_confidence: float,
+        clusters: Optional[List[Cluster]],
+    ) -> Dict:
+        engine = self.clustering_engine
+        if clusters is None:
+            self.progress("load", "running", 0)
+            with profiler.stage("load") as load:
+                window = self.window_manager.create_window(window_type)
+                repo = PostRepository(self.session)
+                chunks = repo.stream_posts_by_window(window.start, window.end)
+                query = StageRecord("load.query")
+                frame = PostFrame.from_chunks(profiler.timed_iter(query, chunks))
+                with profiler.stage("load.hashtag_counts") as counts:
+                    document_frequency = repo.get_hashtag_counts(window.start, window.end)
+                    counts.items = len(document_frequency)
+                with profiler.stage("load.deltas") as loaded_deltas:
+                    deltas = self._recent_deltas()
+                    loaded_deltas.items = len(deltas)
+                load.items = len(frame)
+            profiler.remainder("load.frame", load, query, counts, loaded_deltas)
+            self.progress("load", "completed", len(frame))
+
+            self.progress("cluster", "running", len(frame))
+            with profiler.stage("cluster", len(frame)):
+                clusters = engine.cluster_frame(frame, document_frequency, deltas)
+            hashtag_filter = engine.last_filter_stats
+        else:
+            # given clusters are shared (live state), re-key and rescore copies
+            clusters = [cluster.copy() for cluster in clusters]
+            hashtag_filter = None
+            with profiler.stage("load.deltas") as loaded_deltas:
+                deltas = self._recent_deltas()
+                loaded_deltas.items = len(deltas)
+            self.progress("load", "completed", 0)
+            self.progress("cluster", "running", 0)
+            if deltas:
+                # live clusters were scored on lifetime averages as they changed
+                with profiler.stage("cluster.health", len(clusters)):
+                    calculate_cluster_healths(
+                        clusters,
+                        engine.creator_diversity_weight,
+                        engine.engagement_strength_weight,
+                        engine.velocity_weight,
+                        deltas,
+                    )
+        self.progress("cluster", "completed", len(clusters))
+
+        self.progress("validate", "running", len(clusters))
+        with profiler.stage("validate", len(clusters)):
+            assign_content_ids(clusters, window_type)
+            first_detected = TrendRepository(self.session).get_first_detected(
+                signal_id_for(cluster.cluster_id) for cluster in clusters
+            )
+            now = datetime.now()
+            signals = []
+            for cluster in clusters:
+                detected = first_detected.get(signal_id_for(cluster.cluster_id), now)
+                signal = self.validator.validate_cluster(cluster, detected)
+                if signal.validation_confidence >= min_confidence:
+                    signals.append(signal)
+        self.progress("validate", "completed", len(signals))
+
+        self.progress("generate", "running", len(signals))
+        with profiler.stage("generate", len(signals)):
+            tiles = [self.tile_generator.generate(signal, deltas) for signal in signals]
+        self.progress("generate", "completed", len(tiles))
+
+        self.progress("persist", "running", len(tiles))
+        with profiler.stage("persist", len(tiles)):
+            writer = DiscoveryWriter(self.session)
+            for signal, tile in zip(signals, tiles):
+                writer.add(signal.cluster, signal, tile)
+            writer.flush()
+        self.progress("persist", "completed", len(tiles))
+
+        return {
+            "clusters_found": len(clusters),
+            "trends_validated": len(signals),
+            "proof_tiles_generated": len(tiles),
+            "tile_ids": [tile.tile_id for tile in tiles],
+            "hashtag_filter": hashtag_filter,
+        }
+
+    def _recent_deltas(self) -> Dict[str, EngagementDelta]:
+        """
+        24h snapshot growth of every recaptured post, shared by cluster
+        health (velocity_score) and the tiles' growth_rate_24h
+        """
+        now = datetime.now()
+        return SnapshotRepository(self.session).get_deltas(now - timedelta(hours=24), now)
@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC, abstractmethod
 from typing import List
 from ugc_backend.core.models import ContentPost
@@ -11,6 +12,13 @@ class PlatformAdapter(ABC):
         """
         pass
 
+    async def discover_keyword(self, keyword: str, time_window: str = "48h") -> List[ContentPost]:
+        """
+        discover posts for a single keyword, the unit IngestionManager fans
+        out; blocking adapters run in a worker thread
+        """
+        return await asyncio.to_thread(self.discover_posts, [keyword], time_window)
+
     @abstractmethod
     def monitor_watchlist(self, creator_ids: List[str]) -> List[ContentPost]:
         """
@@ -24,3 +32,10 @@ class PlatformAdapter(ABC):
         re-check posts to measure growth
         """
         pass
+
+    async def arecapture_posts(self, post_ids: List[str]) -> List[ContentPost]:
+        """
+        recapture_posts for async callers, blocking adapters run in a
+        worker thread
+        """
+        return await asyncio.to_thread(self.recapture_posts, post_ids)
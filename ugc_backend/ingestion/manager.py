@@ -1,4 +1,5 @@
-from typing import List, Dict
+import asyncio
+from typing import List, Dict, AsyncIterator
 from ugc_backend.core.models import ContentPost, Platform
 from ugc_backend.ingestion.base import PlatformAdapter
 from ugc_backend.ingestion.tiktok import TikTokAdapter
@@ -6,8 +7,13 @@ from ugc_backend.ingestion.xiaohongshu import XiaohongshuAdapter
 
 
 class IngestionManager:
-    def __init__(self, adapters: Dict[Platform, PlatformAdapter]):
+    def __init__(self, adapters: Dict[Platform, PlatformAdapter], max_concurrency: int = 4):
+        """
+        max_concurrency bounds in-flight keyword fetches per platform in
+        stream_posts; request pacing is left to each adapter's rate limiter
+        """
         self.adapters = adapters
+        self.max_concurrency = max_concurrency
 
     def discover_posts(
         self,
@@ -28,6 +34,47 @@ class IngestionManager:
 
         return all_posts
 
+    async def stream_posts(
+        self,
+        platforms: List[Platform],
+        keywords: List[str],
+        time_window: str = "48h",
+    ) -> AsyncIterator[ContentPost]:
+        """
+        concurrent discover_posts: every (platform, keyword) pair is fetched
+        as its own task and posts are yielded as each fetch completes, so
+        wall time tracks the slowest platform rather than the sum of calls
+        """
+        semaphores = {}
+        tasks = []
+        for platform in platforms:
+            if platform not in self.adapters:
+                continue
+            adapter = self.adapters[platform]
+            semaphore = semaphores.setdefault(platform, asyncio.Semaphore(self.max_concurrency))
+            for keyword in keywords:
+                tasks.append(asyncio.create_task(
+                    self._discover_keyword(adapter, semaphore, keyword, time_window)
+                ))
+
+        try:
+            for completed in asyncio.as_completed(tasks):
+                for post in await completed:
+                    yield post
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _discover_keyword(
+        self,
+        adapter: PlatformAdapter,
+        semaphore: asyncio.Semaphore,
+        keyword: str,
+        time_window: str,
+    ) -> List[ContentPost]:
+        async with semaphore:
+            return await adapter.discover_keyword(keyword, time_window)
+
     def monitor_watchlist(
         self,
         platform: Platform,
@@ -55,3 +102,33 @@ class IngestionManager:
         
         adapter = self.adapters[platform]
         return adapter.recapture_posts(post_ids)
+
+    async def arecapture_posts(
+        self,
+        platform: Platform,
+        post_ids: List[str],
+    ) -> List[ContentPost]:
+        """
+        recapture_posts for callers on an event loop (the app's recapture task)
+        """
+        if platform not in self.adapters:
+            return []
+
+        adapter = self.adapters[platform]
+        return await adapter.arecapture_posts(post_ids)
+
+
+def create_ingestion_manager(settings) -> IngestionManager:
+    """
+    adapters configured from Settings (platforms: section of config.yaml)
+    """
+    return IngestionManager({
+        Platform.tiktok: TikTokAdapter(
+            api_key=settings.tiktok_api_key or None,
+            rate_limit=settings.tiktok_rate_limit,
+        ),
+        Platform.xiaohongshu: XiaohongshuAdapter(
+            scraper_enabled=settings.xiaohongshu_enabled,
+            rate_limit=settings.xiaohongshu_rate_limit,
+        ),
+    })
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+from ugc_backend.utils.metrics import RATE_LIMIT_WAIT
+
+
+class TokenBucket:
+    def __init__(
+        self,
+        rate: float,
+        per: float = 60.0,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "default",
+    ):
+        """
+        token bucket refilling `rate` tokens every `per` seconds
+        adapter rate_limit values are requests per minute, so per defaults
+        to 60; burst caps how many requests may go out back to back and
+        defaults to one, spacing requests evenly
+        a rate <= 0 disables limiting
+        waits are reported under name in ugc_rate_limit_wait_seconds
+        """
+        self.rate = rate
+        self.per = per
+        self.capacity = max(1.0, burst if burst is not None else 1.0)
+        self.clock = clock
+        self.name = name
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        take tokens now, returning how long the caller must wait before using
+        them; the balance may go negative so concurrent callers queue up in
+        reservation order instead of racing for the next refill
+        """
+        if not self.enabled:
+            return 0.0
+
+        fill_rate = self.rate / self.per
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * fill_rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / fill_rate
+
+    def acquire(self, tokens: float = 1.0):
+        wait = self.reserve(tokens)
+        RATE_LIMIT_WAIT.labels(self.name).observe(wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        wait = self.reserve(tokens)
+        RATE_LIMIT_WAIT.labels(self.name).observe(wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
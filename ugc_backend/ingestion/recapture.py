@@ -0,0 +1,184 @@
+import asyncio
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from ugc_backend.core.models import ContentPost, Platform
+
+
+@dataclass
+class RecaptureEntry:
+    post_id: str
+    platform: Platform
+    first_seen: datetime
+    last_captured: datetime
+    engagement: int
+    velocity: float
+    clustered: bool = False
+    failures: int = 0
+    retry_after: Optional[datetime] = None
+
+
+class RecaptureScheduler:
+    def __init__(
+        self,
+        budgets: Dict[Platform, int],
+        cluster_weight: float = 1.0,
+        min_interval_minutes: float = 30.0,
+        staleness_horizon_hours: float = 24.0,
+        max_age_hours: float = 168.0,
+        max_failures: int = 3,
+    ):
+        """
+        budgets: recapture requests allowed per platform per cycle
+        a post's priority is its expected engagement change since the last
+        capture: velocity * hours since last_captured (capped at the
+        staleness horizon), scaled by 1 + cluster_weight while the post
+        belongs to a live cluster
+        posts captured within min_interval_minutes are skipped, posts older
+        than max_age_hours or failing max_failures recaptures in a row are
+        dropped
+        """
+        self.budgets = budgets
+        self.cluster_weight = cluster_weight
+        self.min_interval = timedelta(minutes=min_interval_minutes)
+        self.staleness_horizon_hours = staleness_horizon_hours
+        self.max_age = timedelta(hours=max_age_hours)
+        self.max_failures = max_failures
+        self.entries: Dict[str, RecaptureEntry] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, post_id: str) -> bool:
+        return post_id in self.entries
+
+    def track(self, posts: Iterable[ContentPost]):
+        """
+        add posts or record a fresh capture of tracked ones; with two
+        captures velocity is the engagement delta between them, otherwise
+        the lifetime average since first_seen
+        """
+        for post in posts:
+            entry = self.entries.get(post.post_id)
+            engagement = post.total_engagement
+            captured = post.last_captured
+            if entry is None:
+                hours = (captured - post.first_seen).total_seconds() / 3600.0
+                velocity = engagement / hours if hours > 0 else 0.0
+                self.entries[post.post_id] = RecaptureEntry(
+                    post_id=post.post_id,
+                    platform=post.platform,
+                    first_seen=post.first_seen,
+                    last_captured=captured,
+                    engagement=engagement,
+                    velocity=velocity,
+                )
+                continue
+
+            hours = (captured - entry.last_captured).total_seconds() / 3600.0
+            if hours > 0:
+                entry.velocity = max(engagement - entry.engagement, 0) / hours
+            entry.engagement = engagement
+            entry.last_captured = max(captured, entry.last_captured)
+            entry.failures = 0
+            entry.retry_after = None
+
+    def mark_clustered(self, post_ids: Iterable[str]):
+        """
+        replace cluster membership, e.g. with the live clusters' post ids
+        """
+        post_ids = set(post_ids)
+        for post_id, entry in self.entries.items():
+            entry.clustered = post_id in post_ids
+
+    def priority(self, entry: RecaptureEntry, now: datetime) -> float:
+        staleness = (now - entry.last_captured).total_seconds() / 3600.0
+        expected_change = entry.velocity * min(staleness, self.staleness_horizon_hours)
+        if entry.clustered:
+            expected_change *= 1.0 + self.cluster_weight
+        return expected_change
+
+    def next_batch(self, platform: Platform, now: Optional[datetime] = None) -> List[str]:
+        """
+        highest priority due post ids on a platform, at most its budget
+        priorities depend on now, so the queue is heapified per cycle
+        rather than kept across cycles
+        """
+        if now is None:
+            now = datetime.now()
+        budget = self.budgets.get(platform, 0)
+        if budget <= 0:
+            return []
+
+        self._expire(now)
+        due = now - self.min_interval
+        queue = [
+            (self.priority(entry, now), entry.post_id)
+            for entry in self.entries.values()
+            if entry.platform == platform
+            and entry.last_captured <= due
+            and (entry.retry_after is None or entry.retry_after <= now)
+        ]
+        return [post_id for _, post_id in heapq.nlargest(budget, queue)]
+
+    def plan(self, now: Optional[datetime] = None) -> Dict[Platform, List[str]]:
+        if now is None:
+            now = datetime.now()
+        return {platform: self.next_batch(platform, now) for platform in self.budgets}
+
+    async def run_cycle(self, manager, now: Optional[datetime] = None) -> List[ContentPost]:
+        """
+        recapture one cycle's batches through an IngestionManager, every
+        platform concurrently, and feed the results back into the queue;
+        requested posts that come back empty count as failures and wait
+        min_interval before the next try
+        """
+        if now is None:
+            now = datetime.now()
+
+        batches = [(platform, post_ids) for platform, post_ids in self.plan(now).items() if post_ids]
+        results = await asyncio.gather(*(
+            manager.arecapture_posts(platform, post_ids) for platform, post_ids in batches
+        ))
+
+        recaptured = []
+        for (platform, post_ids), posts in zip(batches, results):
+            self.track(posts)
+            recaptured.extend(posts)
+
+            returned = {post.post_id for post in posts}
+            for post_id in post_ids:
+                if post_id not in returned:
+                    self._record_failure(post_id, now)
+
+        return recaptured
+
+    def _record_failure(self, post_id: str, now: datetime):
+        entry = self.entries.get(post_id)
+        if entry is None:
+            return
+        entry.failures += 1
+        if entry.failures >= self.max_failures:
+            del self.entries[post_id]
+        else:
+            entry.retry_after = now + self.min_interval
+
+    def _expire(self, now: datetime):
+        cutoff = now - self.max_age
+        expired = [post_id for post_id, entry in self.entries.items() if entry.first_seen < cutoff]
+        for post_id in expired:
+            del self.entries[post_id]
+
+
+def recapture_budgets(settings) -> Dict[Platform, int]:
+    """
+    per-cycle budgets: the share of each platform's per-minute rate limit
+    set aside for recaptures, over one recapture interval
+    """
+    minutes = settings.recapture_interval_minutes
+    share = settings.recapture_share
+    return {
+        Platform.tiktok: int(settings.tiktok_rate_limit * minutes * share),
+        Platform.xiaohongshu: int(settings.xiaohongshu_rate_limit * minutes * share),
+    }
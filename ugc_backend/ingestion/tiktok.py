@@ -1,4 +1,8 @@
-from typing import List, Optional
+import asyncio
+import copy
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 import httpx
 from datetime import datetime, timedelta
 from ugc_backend.core.models import (
@@ -10,82 +14,178 @@ from ugc_backend.core.models import (
     CreatorTier,
 )
 from ugc_backend.ingestion.base import PlatformAdapter
+from ugc_backend.ingestion.ratelimit import TokenBucket
+from ugc_backend.utils.metrics import ADAPTER_REQUEST_LATENCY
 
 
 class TikTokAdapter(PlatformAdapter):
-    def __init__(self, api_key: Optional[str] = None, rate_limit: int = 100):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        rate_limit: int = 100,
+        base_url: str = "https://api.tiktok.com/v1",
+        max_concurrency: int = 8,
+        timeout: float = 10.0,
+        http2: bool = True,
+    ):
+        """
+        requests share one pooled httpx.AsyncClient per event loop, are
+        paced by a token bucket at rate_limit requests per minute and capped
+        at max_concurrency in flight
+        the sync methods run their async counterparts on a private copy of
+        the adapter under asyncio.run (in a worker thread when the calling
+        thread already runs a loop), so their connections are pooled across
+        one call and never disturb the client of a loop awaiting this
+        adapter; long-running services should await the async methods
+        """
         self.api_key = api_key
         self.rate_limit = rate_limit
-        self.base_url = "https://api.tiktok.com/v1"
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.http2 = http2
+        self.limiter = TokenBucket(rate_limit, name="tiktok")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
     def discover_posts(self, keywords: List[str], time_window: str = "48h") -> List[ContentPost]:
         """
         fetch posts from tiktok api matching keywords
         converts to normalized contentpost format
         """
-        posts = []
-        
-        for keyword in keywords:
-            try:
-                response = self._api_request(
-                    "hashtag/posts",
-                    params={"hashtag": keyword, "count": 100},
-                )
-                
-                for item in response.get("data", []):
-                    post = self._convert_to_content_post(item)
-                    if post:
-                        posts.append(post)
-            except Exception as e:
-                continue
-
-        return posts
+        return self._run_sync("adiscover_posts", keywords, time_window)
 
     def monitor_watchlist(self, creator_ids: List[str]) -> List[ContentPost]:
-        posts = []
-        
-        for creator_id in creator_ids:
-            try:
-                response = self._api_request(
-                    f"user/{creator_id}/posts",
-                    params={"count": 50},
-                )
-                
-                for item in response.get("data", []):
-                    post = self._convert_to_content_post(item)
-                    if post:
-                        posts.append(post)
-            except Exception:
-                continue
-
-        return posts
+        return self._run_sync("amonitor_watchlist", creator_ids)
 
     def recapture_posts(self, post_ids: List[str]) -> List[ContentPost]:
-        posts = []
-        
-        for post_id in post_ids:
-            try:
-                response = self._api_request(f"post/{post_id}")
-                post = self._convert_to_content_post(response.get("data"))
-                if post:
-                    post.capture_count += 1
-                    post.last_captured = datetime.now()
-                    posts.append(post)
-            except Exception:
-                continue
+        return self._run_sync("arecapture_posts", post_ids)
 
-        return posts
+    async def adiscover_posts(self, keywords: List[str], time_window: str = "48h") -> List[ContentPost]:
+        results = await asyncio.gather(*(self.discover_keyword(keyword, time_window) for keyword in keywords))
+        return [post for posts in results for post in posts]
+
+    async def discover_keyword(self, keyword: str, time_window: str = "48h") -> List[ContentPost]:
+        try:
+            response = await self._api_request(
+                "hashtag/posts",
+                params={"hashtag": keyword, "count": 100},
+            )
+        except Exception:
+            return []
+        return self._convert_items(response.get("data", []))
+
+    async def amonitor_watchlist(self, creator_ids: List[str]) -> List[ContentPost]:
+        results = await asyncio.gather(*(self._creator_posts(creator_id) for creator_id in creator_ids))
+        return [post for posts in results for post in posts]
+
+    async def arecapture_posts(self, post_ids: List[str]) -> List[ContentPost]:
+        results = await asyncio.gather(*(self._recapture_post(post_id) for post_id in post_ids))
+        return [post for post in results if post]
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._loop = self._client = self._semaphore = None
+
+    async def _creator_posts(self, creator_id: str) -> List[ContentPost]:
+        try:
+            response = await self._api_request(
+                f"user/{creator_id}/posts",
+                params={"count": 50},
+            )
+        except Exception:
+            return []
+        return self._convert_items(response.get("data", []))
 
-    def _api_request(self, endpoint: str, params: Optional[dict] = None) -> dict:
-        url = f"{self.base_url}/{endpoint}"
-        headers = {}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
+    async def _recapture_post(self, post_id: str) -> Optional[ContentPost]:
+        try:
+            response = await self._api_request(f"post/{post_id}")
+        except Exception:
+            return None
+        post = self._convert_to_content_post(response.get("data"))
+        if post:
+            post.capture_count += 1
+            post.last_captured = datetime.now()
+        return post
 
-        with httpx.Client() as client:
-            response = client.get(url, headers=headers, params=params or {}, timeout=10.0)
-            response.raise_for_status()
-            return response.json()
+    def _run_sync(self, method: str, *args):
+        """
+        run an async method to completion for a sync caller
+        asyncio.run raises inside a running loop (e.g. called from a route
+        or a background task), so there the call moves to a worker thread;
+        it still blocks the caller, which should await the method instead
+        """
+        worker = copy.copy(self)
+        worker._loop = worker._client = worker._semaphore = None
+        coroutine = worker._run(getattr(worker, method)(*args))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
+
+    async def _run(self, coroutine):
+        """
+        run a sync entry point's coroutine, closing the loop's client after
+        """
+        try:
+            return await coroutine
+        finally:
+            await self.aclose()
+
+    def _convert_items(self, items: List[dict]) -> List[ContentPost]:
+        posts = []
+        for item in items:
+            post = self._convert_to_content_post(item)
+            if post:
+                posts.append(post)
+        return posts
+
+    def _session(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """
+        client and concurrency bound for the running loop; a client's pooled
+        connections belong to the loop that opened them, so a new loop gets
+        a fresh pair
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            headers = {}
+            if self.api_key:
+                headers["Authorization"] = f"Bearer {self.api_key}"
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client, self._semaphore
+
+    async def _api_request(self, endpoint: str, params: Optional[dict] = None) -> dict:
+        client, semaphore = self._session()
+        async with semaphore:
+            # rate limiter waits are reported on their own, see TokenBucket
+            await self.limiter.acquire_async()
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                response = await client.get(f"/{endpoint}", params=params or {})
+                response.raise_for_status()
+                outcome = "ok"
+                return response.json()
+            finally:
+                # label by the endpoint's first segment, ids stay out of labels
+                ADAPTER_REQUEST_LATENCY.labels(
+                    "tiktok", endpoint.split("/", 1)[0], outcome
+                ).observe(time.perf_counter() - start)
 
     def _convert_to_content_post(self, item: dict) -> Optional[ContentPost]:
         if not item:
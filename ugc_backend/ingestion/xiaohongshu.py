@@ -9,12 +9,14 @@ from ugc_backend.core.models import (
     CreatorTier,
 )
 from ugc_backend.ingestion.base import PlatformAdapter
+from ugc_backend.ingestion.ratelimit import TokenBucket
 
 
 class XiaohongshuAdapter(PlatformAdapter):
     def __init__(self, scraper_enabled: bool = True, rate_limit: int = 60):
         self.scraper_enabled = scraper_enabled
         self.rate_limit = rate_limit
+        self.limiter = TokenBucket(rate_limit, name="xiaohongshu")
 
     def discover_posts(self, keywords: List[str], time_window: str = "48h") -> List[ContentPost]:
         """
@@ -28,6 +30,7 @@ class XiaohongshuAdapter(PlatformAdapter):
 
         for keyword in keywords:
             try:
+                self.limiter.acquire()
                 scraped_data = self._scrape_search_results(keyword)
                 for item in scraped_data:
                     post = self._convert_to_content_post(item)
@@ -43,6 +46,7 @@ class XiaohongshuAdapter(PlatformAdapter):
         
         for creator_id in creator_ids:
             try:
+                self.limiter.acquire()
                 scraped_data = self._scrape_creator_posts(creator_id)
                 for item in scraped_data:
                     post = self._convert_to_content_post(item)
@@ -58,6 +62,7 @@ class XiaohongshuAdapter(PlatformAdapter):
         
         for post_id in post_ids:
             try:
+                self.limiter.acquire()
                 item = self._scrape_post_details(post_id)
                 post = self._convert_to_content_post(item)
                 if post:
@@ -0,0 +1,151 @@
+import threading
+import time
+from typing import Callable, Optional
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+
+REGISTRY = CollectorRegistry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0)
+
+REQUEST_LATENCY = Histogram(
+    "ugc_http_request_duration_seconds",
+    "api request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+INGEST_BATCH_SIZE = Histogram(
+    "ugc_ingest_batch_size",
+    "posts per ingest request",
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000, 50000),
+    registry=REGISTRY,
+)
+INGEST_ROWS_PER_SECOND = Histogram(
+    "ugc_ingest_rows_per_second",
+    "ingest write throughput per request",
+    buckets=(10, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000),
+    registry=REGISTRY,
+)
+INGEST_ROWS = Counter(
+    "ugc_ingest_rows",
+    "ingested posts by outcome",
+    ["outcome"],
+    registry=REGISTRY,
+)
+DISCOVERY_JOBS = Counter(
+    "ugc_discovery_jobs",
+    "finished discovery jobs by status",
+    ["status"],
+    registry=REGISTRY,
+)
+DISCOVERY_STAGE_DURATION = Histogram(
+    "ugc_discovery_stage_duration_seconds",
+    "discovery pipeline stage wall time",
+    ["stage"],
+    buckets=DURATION_BUCKETS,
+    registry=REGISTRY,
+)
+DISCOVERY_CLUSTERS = Histogram(
+    "ugc_discovery_clusters",
+    "clusters found per discovery run",
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+    registry=REGISTRY,
+)
+ADAPTER_REQUEST_LATENCY = Histogram(
+    "ugc_adapter_request_duration_seconds",
+    "platform api request latency, excluding rate limit waits (ugc_rate_limit_wait_seconds)",
+    ["platform", "endpoint", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+RATE_LIMIT_WAIT = Histogram(
+    "ugc_rate_limit_wait_seconds",
+    "time spent waiting on a token bucket per acquire",
+    ["limiter"],
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+    registry=REGISTRY,
+)
+
+
+class StoreCounters:
+    def __init__(self, max_age: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        row counts the health endpoint reports, kept in process so reads are
+        o(1); ingest bumps posts as it inserts, discovery runs mark the
+        counts stale, and a stale or older than max_age snapshot is
+        recounted once by the next reader (other writers, e.g. scripts,
+        show up within max_age)
+        active_clusters is the cluster count of the latest discovery run
+        """
+        self.max_age = max_age
+        self.clock = clock
+        self.posts = 0
+        self.trends = 0
+        self.tiles = 0
+        self.active_clusters = 0
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def stale(self) -> bool:
+        refreshed_at = self._refreshed_at
+        return refreshed_at is None or self.clock() - refreshed_at > self.max_age
+
+    def update(self, posts: int, trends: int, tiles: int):
+        with self._lock:
+            self.posts = posts
+            self.trends = trends
+            self.tiles = tiles
+            self._refreshed_at = self.clock()
+
+    def add_posts(self, count: int):
+        with self._lock:
+            self.posts += count
+
+    def expire(self):
+        self._refreshed_at = None
+
+
+STORE = StoreCounters()
+
+Gauge("ugc_stored_posts", "posts in the store", registry=REGISTRY).set_function(lambda: STORE.posts)
+Gauge("ugc_active_trends", "validated or validating trends", registry=REGISTRY).set_function(lambda: STORE.trends)
+Gauge("ugc_validated_tiles", "validated proof tiles", registry=REGISTRY).set_function(lambda: STORE.tiles)
+Gauge("ugc_active_clusters", "clusters found by the latest discovery run", registry=REGISTRY).set_function(
+    lambda: STORE.active_clusters
+)
+
+
+class MetricsMiddleware:
+    """
+    asgi middleware timing every http request, labelled by the matched
+    route's path template so ids in urls don't explode label cardinality
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,186 @@
+import cProfile
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_current: ContextVar[Optional["StageProfiler"]] = ContextVar("stage_profiler", default=None)
+
+
+def _process_peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macos bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _rss_mb() -> Optional[float]:
+    """
+    the process' current resident set, None where /proc is not available
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+def _add_growth(record: "StageRecord", start: Optional[float]):
+    end = _rss_mb()
+    if start is None or end is None:
+        return
+    record.rss_growth_mb = (record.rss_growth_mb or 0.0) + end - start
+
+
+class StageRecord:
+    def __init__(self, stage: str, items: int = 0):
+        self.stage = stage
+        self.items = items
+        self.wall_ms = 0.0
+        self.cpu_ms = 0.0
+        self.rss_growth_mb: Optional[float] = None
+        self.process_peak_rss_mb = 0.0
+        self.peak_alloc_mb: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "stage": self.stage,
+            "wall_ms": round(self.wall_ms, 3),
+            "cpu_ms": round(self.cpu_ms, 3),
+            "items": self.items,
+            "rss_growth_mb": None if self.rss_growth_mb is None else round(self.rss_growth_mb, 3),
+            "process_peak_rss_mb": round(self.process_peak_rss_mb, 3),
+            "peak_alloc_mb": None if self.peak_alloc_mb is None else round(self.peak_alloc_mb, 3),
+        }
+
+
+class StageProfiler:
+    def __init__(self, trace_memory: bool = False, profile_path: Optional[str] = None):
+        """
+        per-stage wall time, cpu time (of the running thread), item count and
+        how much the resident set grew over the stage (None off linux)
+        process_peak_rss_mb is the process' lifetime high-water mark once the
+        stage ends, not the stage's own peak: it never goes down, so in a
+        reused worker it carries over from earlier stages and jobs
+        trace_memory adds each stage's peak python allocation via tracemalloc
+        (slow, meant for profile runs); profile_path dumps a cProfile of
+        everything run under activate() there
+        stages may nest, a parent's numbers include its children
+        """
+        self.trace_memory = trace_memory
+        self.profile_path = profile_path
+        self.records: List[StageRecord] = []
+        self._active: List[StageRecord] = []
+
+    @contextmanager
+    def activate(self) -> Iterator["StageProfiler"]:
+        """
+        make this the profiler profile_stage() reports to in this context
+        """
+        token = _current.set(self)
+        profile = cProfile.Profile() if self.profile_path else None
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield self
+        finally:
+            if profile is not None:
+                profile.disable()
+                profile.dump_stats(self.profile_path)
+            if started_tracing:
+                tracemalloc.stop()
+            _current.reset(token)
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0) -> Iterator[StageRecord]:
+        record = StageRecord(name, items)
+        self.records.append(record)
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            # tracemalloc has one peak counter, fold it into the enclosing
+            # stages before resetting it for this one
+            self._fold_alloc_peak()
+            record.peak_alloc_mb = 0.0
+            tracemalloc.reset_peak()
+        self._active.append(record)
+        rss = _rss_mb()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield record
+        finally:
+            record.wall_ms += (time.perf_counter() - wall) * 1000.0
+            record.cpu_ms += (time.thread_time() - cpu) * 1000.0
+            _add_growth(record, rss)
+            record.process_peak_rss_mb = _process_peak_rss_mb()
+            if tracing:
+                self._fold_alloc_peak()
+            self._active.pop()
+
+    def _fold_alloc_peak(self):
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        for active in self._active:
+            active.peak_alloc_mb = max(active.peak_alloc_mb or 0.0, peak)
+
+    def timed_iter(self, record: StageRecord, iterable: Iterable) -> Iterator:
+        """
+        yield from iterable, charging only the time spent producing each
+        item (e.g. fetching db chunks) to record
+        """
+        self.records.append(record)
+        iterator = iter(iterable)
+        while True:
+            rss = _rss_mb()
+            wall = time.perf_counter()
+            cpu = time.thread_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                record.wall_ms += (time.perf_counter() - wall) * 1000.0
+                record.cpu_ms += (time.thread_time() - cpu) * 1000.0
+                _add_growth(record, rss)
+                record.process_peak_rss_mb = _process_peak_rss_mb()
+            record.items += len(item) if hasattr(item, "__len__") else 1
+            yield item
+
+    def remainder(self, name: str, parent: StageRecord, *parts: StageRecord) -> StageRecord:
+        """
+        record what parent spent outside parts as its own stage
+        """
+        record = StageRecord(name, parent.items)
+        record.wall_ms = max(parent.wall_ms - sum(part.wall_ms for part in parts), 0.0)
+        record.cpu_ms = max(parent.cpu_ms - sum(part.cpu_ms for part in parts), 0.0)
+        if parent.rss_growth_mb is not None:
+            record.rss_growth_mb = parent.rss_growth_mb - sum(part.rss_growth_mb or 0.0 for part in parts)
+        record.process_peak_rss_mb = parent.process_peak_rss_mb
+        record.peak_alloc_mb = parent.peak_alloc_mb
+        self.records.append(record)
+        return record
+
+    def timings(self) -> List[Dict]:
+        return [record.to_dict() for record in self.records]
+
+
+def current_profiler() -> Optional[StageProfiler]:
+    return _current.get()
+
+
+@contextmanager
+def profile_stage(name: str, items: int = 0) -> Iterator[Optional[StageRecord]]:
+    """
+    record a stage on the active profiler, a no-op outside StageProfiler.activate()
+    """
+    profiler = _current.get()
+    if profiler is None:
+        yield None
+        return
+    with profiler.stage(name, items) as record:
+        yield record